@@ -14,6 +14,7 @@ License: MIT
 import sys
 import os
 import json
+import argparse
 from datetime import datetime
 
 # Add src directory to path
@@ -178,6 +179,17 @@ def main():
     """
     Main execution function for the quick start demo
     """
+    parser = argparse.ArgumentParser(description='Professional Web Scraper Toolkit - Quick Start Demo')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile each stage and write flame-graph output to data/')
+    args = parser.parse_args()
+    
+    profiler = None
+    if args.profile:
+        from profiling import Profiler
+        profiler = Profiler('quick_start')
+        profiler.start()
+    
     print("🚀 Professional Web Scraper Toolkit - Quick Start Demo")
     print("=" * 60)
     print("Enterprise-grade data extraction and business intelligence")
@@ -190,6 +202,10 @@ def main():
     results.append(demo_lead_generation())
     results.append(demo_price_monitoring())
     
+    if profiler:
+        profiler.stop()
+        profiler.write()
+    
     # Generate summary
     generate_executive_summary()
     
@@ -81,12 +81,23 @@ setup(
             "aiohttp>=3.8",
             "asyncio>=3.4",
         ],
+        "fast-json": [
+            "orjson>=3.9",
+        ],
+        "compression": [
+            "brotli>=1.0",
+            "zstandard>=0.20",
+        ],
+        "fast-text": [
+            "pyahocorasick>=2.0",
+        ],
     },
     entry_points={
         "console_scripts": [
             "job-scraper=src.job_scraper:main",
             "lead-scraper=src.lead_scraper:main",
             "price-monitor=src.price_monitor:main",
+            "scrape-orchestrator=src.orchestrator:main",
             "web-scraper-demo=examples.quick_start:main",
         ],
     },
@@ -0,0 +1,308 @@
+import asyncio
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Dict, List, Tuple
+
+import requests
+
+ALERT_TYPES = {
+    'price_drop': 'price_drop_alerts',
+    'price_increase': 'price_increase_alerts',
+    'stock_change': 'stock_availability_alerts',
+    'new_product': 'new_product_alerts'
+}
+
+
+def describe_alert(alert):
+    """One-line human readable summary of an alert"""
+    name = f"{alert['product_name']} @ {alert['site']}"
+    repeats = f" ({alert['occurrences']}x)" if alert.get('occurrences', 1) > 1 else ''
+
+    if alert['type'] in ('price_drop', 'price_increase'):
+        arrow = '📉' if alert['type'] == 'price_drop' else '📈'
+        return (f"{arrow} {name}: ${alert['old_price']:.2f} → ${alert['new_price']:.2f} "
+                f"({alert['change_percent']:+.1f}%){repeats}")
+    if alert['type'] == 'stock_change':
+        status = 'back in stock' if alert.get('availability') else 'out of stock'
+        return f"📦 {name}: {status}{repeats}"
+    return f"🆕 {name}: now listed at ${alert['new_price']:.2f}"
+
+
+class WebhookChannel:
+    """POST alert batches as JSON to a webhook"""
+
+    name = 'webhook'
+
+    def __init__(self, url, batch_size=100, timeout=10):
+        self.url = url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, batch):
+        response = self.session.post(self.url, json={'alerts': batch}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class SlackChannel:
+    """Post alert batches as a single Slack incoming-webhook message"""
+
+    name = 'slack'
+
+    def __init__(self, webhook_url, batch_size=50, timeout=10):
+        self.webhook_url = webhook_url
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, batch):
+        text = f"*{len(batch)} price alerts*\n" + '\n'.join(describe_alert(alert) for alert in batch)
+        response = self.session.post(self.webhook_url, json={'text': text}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class EmailChannel:
+    """Send alert batches as one digest email over SMTP"""
+
+    name = 'email'
+
+    def __init__(self, smtp_host, smtp_port, sender, recipients, username=None, password=None,
+                 use_tls=False, batch_size=500, timeout=10):
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.sender = sender
+        self.recipients = recipients
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def send(self, batch):
+        message = EmailMessage()
+        message['Subject'] = f"Price Monitor: {len(batch)} alerts"
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content('\n'.join(describe_alert(alert) for alert in batch))
+
+        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or '')
+            smtp.send_message(message)
+
+
+def build_channels(alert_config):
+    """Create delivery channels for the configured notification methods"""
+    destinations = alert_config.get('destinations', {})
+    batch_size = alert_config.get('batch_size', 100)
+    channels = []
+
+    for method in alert_config.get('notification_methods', []):
+        settings = destinations.get(method, {})
+        if method == 'webhook' and settings.get('url'):
+            channels.append(WebhookChannel(settings['url'], settings.get('batch_size', batch_size)))
+        elif method == 'slack' and settings.get('webhook_url'):
+            channels.append(SlackChannel(settings['webhook_url'], settings.get('batch_size', 50)))
+        elif method == 'email' and settings.get('to'):
+            channels.append(EmailChannel(
+                settings.get('smtp_host', 'localhost'), settings.get('smtp_port', 25),
+                settings.get('from', 'alerts@localhost'), settings['to'],
+                username=settings.get('username'), password=settings.get('password'),
+                use_tls=settings.get('use_tls', False), batch_size=settings.get('batch_size', 500)
+            ))
+        else:
+            print(f"⚠️  Alert method '{method}' has no destination configured, skipping")
+
+    return channels
+
+
+class AlertDispatcher:
+    """Coalescing, batched alert delivery on a background asyncio loop"""
+
+    def __init__(self, channels, coalesce_window=60, max_concurrency=4, retry_attempts=3,
+                 backoff_seconds=1.0, enabled_types=None, metrics=None):
+        """
+        Initialize dispatcher
+
+        Alerts for the same (type, product, site) submitted within one
+        coalesce_window are merged into a single alert. At the end of each window
+        the pending alerts are split into per-channel batches and delivered with
+        at most max_concurrency sends in flight.
+        """
+        self.channels = channels
+        self.coalesce_window = coalesce_window
+        self.max_concurrency = max_concurrency
+        self.retry_attempts = max(1, retry_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.enabled_types = set(enabled_types) if enabled_types is not None else set(ALERT_TYPES)
+        self.metrics = metrics
+
+        self.pending: Dict[Tuple[str, str, str], dict] = {}
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+        self._runner = None
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, alert_config, metrics=None):
+        """Build a dispatcher from the alert_system config section"""
+        enabled_types = [
+            alert_type for alert_type, flag in ALERT_TYPES.items()
+            if alert_config.get(flag, True)
+        ]
+        return cls(
+            build_channels(alert_config),
+            coalesce_window=alert_config.get('coalesce_window_seconds', 60),
+            max_concurrency=alert_config.get('max_concurrency', 4),
+            retry_attempts=alert_config.get('retry_attempts', 3),
+            enabled_types=enabled_types,
+            metrics=metrics
+        )
+
+    def start(self):
+        """Start the delivery loop in a daemon thread"""
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='alerts')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._stopping = asyncio.run_coroutine_threadsafe(self._create_stop_event(), self._loop).result()
+        self._runner = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    async def _create_stop_event(self):
+        return asyncio.Event()
+
+    def submit(self, alert):
+        """Queue an alert without blocking; repeats within the window are coalesced"""
+        if alert['type'] not in self.enabled_types:
+            return
+
+        key = (alert['type'], alert['product_name'], alert['site'])
+        with self._lock:
+            existing = self.pending.get(key)
+            if existing is None:
+                self.pending[key] = dict(alert, occurrences=1)
+            else:
+                # Keep the first old price so the merged alert spans the whole window
+                existing.update({k: v for k, v in alert.items() if k != 'old_price'})
+                existing['occurrences'] += 1
+                if 'old_price' in existing and existing['old_price']:
+                    existing['change_percent'] = round(
+                        (existing['new_price'] - existing['old_price']) / existing['old_price'] * 100, 1)
+
+        if self.metrics is not None:
+            self.metrics.increment('alerts_submitted_total', site=alert['site'], type=alert['type'])
+
+    async def _run(self):
+        # Always flush at least once, even when stop() comes before the first wait
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.coalesce_window)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush_pending()
+            if self._stopping.is_set():
+                return
+
+    async def _flush_pending(self):
+        with self._lock:
+            alerts = list(self.pending.values())
+            self.pending.clear()
+        if not alerts or not self.channels:
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        deliveries = [
+            self._deliver(channel, alerts[start:start + channel.batch_size], semaphore)
+            for channel in self.channels
+            for start in range(0, len(alerts), channel.batch_size)
+        ]
+        await asyncio.gather(*deliveries)
+
+    async def _deliver(self, channel, batch: List[dict], semaphore):
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            for attempt in range(self.retry_attempts):
+                try:
+                    await loop.run_in_executor(self._executor, channel.send, batch)
+                    self.sent += len(batch)
+                    self._count('alerts_sent_total', len(batch), channel=channel.name)
+                    return
+                except Exception as e:
+                    last_error = e
+                    if attempt < self.retry_attempts - 1:
+                        await asyncio.sleep(self.backoff_seconds * (2 ** attempt))
+
+        self.failed += len(batch)
+        self._count('alerts_failed_total', len(batch), channel=channel.name)
+        print(f"⚠️  Failed to deliver {len(batch)} alerts via {channel.name}: {last_error}")
+
+    def _count(self, name, amount, **labels):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount, **labels)
+
+    def flush(self, timeout=60):
+        """Deliver everything pending now and wait for it to finish"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._flush_pending(), self._loop).result(timeout)
+
+    def stop(self, timeout=60):
+        """Deliver pending alerts, then shut the delivery loop down"""
+        if self._loop is None:
+            return
+        # The delivery loop performs a final flush before it returns
+        self._loop.call_soon_threadsafe(self._stopping.set)
+        self._runner.result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        print(f"🔔 Alerts delivered: {self.sent}, failed: {self.failed}")
+
+
+def price_alerts(product, site, previous_price, previous_availability, record,
+                 threshold_percent=5.0, minimum_change=1.0, is_new=False):
+    """Derive alerts from a new price record compared with the previous observation"""
+    alerts = []
+    now = datetime.now().isoformat()
+    base = {
+        'product_name': product['name'],
+        'category': product.get('category'),
+        'site': site,
+        'new_price': record['current_price'],
+        'url': record.get('url'),
+        'created_at': now
+    }
+
+    if previous_price is None:
+        if is_new:
+            alerts.append(dict(base, type='new_product'))
+        return alerts
+
+    change = record['current_price'] - previous_price
+    change_percent = change / previous_price * 100 if previous_price else 0.0
+    if abs(change) >= minimum_change and abs(change_percent) >= threshold_percent:
+        alerts.append(dict(
+            base,
+            type='price_drop' if change < 0 else 'price_increase',
+            old_price=previous_price,
+            change_percent=round(change_percent, 1)
+        ))
+
+    if previous_availability is not None and previous_availability != record['availability']:
+        alerts.append(dict(base, type='stock_change', availability=record['availability']))
+
+    return alerts
@@ -0,0 +1,165 @@
+import mmap
+import re
+import tempfile
+import threading
+
+_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+_HEADER_CHARSET = re.compile(r'charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+
+# How far into a page a <meta charset> declaration is looked for
+CHARSET_SNIFF_BYTES = 2048
+
+
+def header_charset(content_type):
+    """Charset named in a Content-Type header value, or None"""
+    match = _HEADER_CHARSET.search(content_type or '')
+    return match.group(1).lower() if match else None
+
+
+def _exported(buffer):
+    """Whether a slice of the bytearray is still held somewhere, so it must not be reused"""
+    try:
+        buffer.append(0)
+    except BufferError:
+        return True
+    buffer.pop()
+    return False
+
+
+class BufferPool:
+    """Thread-safe pool of reusable bytearrays for response bodies"""
+
+    def __init__(self, buffer_size=256 * 1024, max_buffers=16, max_pooled_size=4 * 1024 * 1024):
+        """Buffers start at buffer_size; grown buffers up to max_pooled_size are pooled too"""
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self.max_pooled_size = max_pooled_size
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        if len(buffer) > self.max_pooled_size:
+            return
+        with self._lock:
+            if len(self._free) < self.max_buffers:
+                self._free.append(buffer)
+
+
+class ResponseBody:
+    """Response body held in a pooled buffer, or in a memory-mapped temp file once it grows large"""
+
+    def __init__(self, pool, spill_bytes=None):
+        """Bodies beyond spill_bytes are written to a temp file and mapped instead of held on the heap"""
+        self.pool = pool
+        self.spill_bytes = spill_bytes
+        self.size = 0
+        self.response = None
+        self.declared_encoding = None
+        self._buffer = pool.acquire()
+        self._file = None
+        self._mmap = None
+        self._view = None
+
+    @property
+    def url(self):
+        return self.response.url if self.response is not None else None
+
+    @property
+    def spilled(self):
+        return self._file is not None
+
+    def write(self, data):
+        """Append a chunk of body bytes"""
+        end = self.size + len(data)
+        if self._file is not None:
+            self._file.write(data)
+        elif self.spill_bytes and end > self.spill_bytes:
+            self._file = tempfile.TemporaryFile()
+            self._file.write(memoryview(self._buffer)[:self.size])
+            self._file.write(data)
+            self.pool.release(self._buffer)
+            self._buffer = None
+        else:
+            if end > len(self._buffer):
+                grown = bytearray(max(end, len(self._buffer) * 2))
+                grown[:self.size] = memoryview(self._buffer)[:self.size]
+                self.pool.release(self._buffer)
+                self._buffer = grown
+            # Same-length slice assignment copies into the buffer without reallocating it
+            self._buffer[self.size:end] = data
+        self.size = end
+
+    @property
+    def view(self):
+        """Read-only memoryview of the body, without copying it"""
+        if self._view is None:
+            if self._file is not None:
+                self._file.flush()
+                if self.size:
+                    self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._view = memoryview(self._mmap)
+                else:
+                    self._view = memoryview(b'')
+            else:
+                self._view = memoryview(self._buffer)[:self.size].toreadonly()
+        return self._view
+
+    @property
+    def encoding(self):
+        """Charset from the Content-Type header, else from a <meta> tag near the top, else None"""
+        if self.declared_encoding:
+            return self.declared_encoding
+        match = _CHARSET_PATTERN.search(self.view, 0, CHARSET_SNIFF_BYTES)
+        return match.group(1).decode('ascii').lower() if match else None
+
+    def text(self):
+        """Decode the body once, straight from the buffer"""
+        encoding = self.encoding
+        if encoding:
+            try:
+                return str(self.view, encoding, 'replace')
+            except LookupError:
+                pass
+        try:
+            return str(self.view, 'utf-8')
+        except UnicodeDecodeError:
+            return str(self.view, 'windows-1252', 'replace')
+
+    def tobytes(self):
+        """Copy the body out as bytes"""
+        return self.view.tobytes()
+
+    def release(self):
+        """Return the buffer to the pool, or unmap and delete the spill file"""
+        try:
+            if self._view is not None:
+                self._view.release()
+        except BufferError:
+            # A caller still holds the view; it keeps the memory alive until it is collected
+            pass
+        finally:
+            self._view = None
+            if self._mmap is not None:
+                try:
+                    self._mmap.close()
+                except BufferError:
+                    pass
+                self._mmap = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._buffer is not None and not _exported(self._buffer):
+                self.pool.release(self._buffer)
+            self._buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
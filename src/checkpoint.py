@@ -0,0 +1,137 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from jsonl_io import JsonLinesWriter, read_jsonl
+
+
+class Checkpoint:
+    """Periodic, atomic checkpoint of a run's records, work-list position and seen state"""
+
+    def __init__(self, name, directory='data/checkpoints', every_records=50, every_seconds=30):
+        """
+        Initialize checkpoint files for a scraper
+
+        Records are appended to <name>.records.jsonl as they are produced. Every
+        every_records records or every_seconds seconds, the log is synced and
+        <name>.checkpoint.json is atomically replaced with the position, the
+        scraper's seen state and the log length that goes with them.
+        """
+        self.name = name
+        self.directory = directory
+        self.every_records = every_records
+        self.every_seconds = every_seconds
+        self.records_path = os.path.join(directory, f"{name}.records.jsonl")
+        self.state_path = os.path.join(directory, f"{name}.checkpoint.json")
+
+        self.position = 0
+        self._writer = None
+        self._records = 0
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._run_key = None
+
+    def begin(self, run_key, resume=False):
+        """
+        Start checkpointing a run
+
+        With resume, and a checkpoint left by a run with the same run_key,
+        returns (records, position, state) as of that checkpoint; records
+        written after it are discarded. Otherwise starts empty: ([], 0, {}).
+        """
+        self._run_key = json.loads(json.dumps(run_key, default=str))
+        saved = self._load_state() if resume else None
+        if saved is not None and saved.get('run_key') != self._run_key:
+            print(f"⚠️  Checkpoint {self.state_path} belongs to a different run, starting over")
+            saved = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        if saved is not None and saved['records_bytes'] > os.path.getsize(self.records_path):
+            print(f"⚠️  Checkpoint {self.state_path} is ahead of its record log, starting over")
+            saved = None
+
+        if saved is None:
+            # A checkpoint from an earlier run must not outlive the log this one truncates
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            self._writer = JsonLinesWriter(self.records_path)
+            self._records = 0
+            self.position = 0
+            return [], 0, {}
+
+        # Drop anything appended after the last checkpoint; it will be produced again
+        with open(self.records_path, 'ab') as f:
+            f.truncate(saved['records_bytes'])
+        records = list(read_jsonl(self.records_path))
+
+        self._writer = JsonLinesWriter(self.records_path, append=True)
+        self._records = len(records)
+        self.position = saved['position']
+        print(f"♻️  Resuming {self.name} from checkpoint at position {self.position} "
+              f"({len(records)} records, saved {saved['saved_at']})")
+        return records, self.position, saved.get('state', {})
+
+    def _load_state(self):
+        if not (os.path.exists(self.state_path) and os.path.exists(self.records_path)):
+            return None
+        with open(self.state_path, 'r') as f:
+            return json.load(f)
+
+    @property
+    def running(self):
+        """Whether begin() has been called and the run is not finished"""
+        return self._writer is not None
+
+    def add(self, record):
+        """Append a produced record to the log"""
+        self._writer.write(record)
+        self._records += 1
+        self._unsaved += 1
+
+    def update(self, position, state=None, force=False):
+        """
+        Record progress and save a checkpoint when one is due
+
+        state is a callable returning the JSON-serializable seen state; it is
+        only called when a checkpoint is actually written. Returns True if saved.
+        """
+        self.position = position
+        due = (self._unsaved >= self.every_records
+               or time.monotonic() - self._last_save >= self.every_seconds)
+        if not (force or due):
+            return False
+        self.save(state() if state is not None else {})
+        return True
+
+    def save(self, state):
+        """Sync the record log and atomically replace the checkpoint file"""
+        self._writer.flush(sync=True)
+        checkpoint = {
+            'run_key': self._run_key,
+            'position': self.position,
+            'records': self._records,
+            'records_bytes': self._writer.tell(),
+            'state': state,
+            'saved_at': datetime.now().isoformat()
+        }
+
+        temp_file = f"{self.state_path}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.state_path)
+
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+    def finish(self):
+        """Remove the checkpoint once the run's results are safely exported"""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        for path in (self.state_path, self.records_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+
+
+class HostLimit:
+    """Adaptive in-flight limit and recent latencies for one host"""
+
+    __slots__ = ('limit', 'in_flight', 'latencies', 'round_trip', 'baseline_p95', 'last_decrease',
+                 'since_check', 'increases', 'decreases')
+
+    def __init__(self, limit, window):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.round_trip = 0.0
+        self.baseline_p95 = None
+        self.last_decrease = float('-inf')
+        self.since_check = 0
+        self.increases = 0
+        self.decreases = 0
+
+
+class AdaptiveConcurrency:
+    """Per-host AIMD concurrency limits driven by throttling, timeouts and latency"""
+
+    THROTTLE_STATUS_CODES = {429, 503}
+
+    def __init__(self, initial_limit=2, min_limit=1, max_limit=32, additive_increase=1.0,
+                 decrease_factor=0.5, latency_tolerance=2.0, window=50, ceiling=None, clock=time.monotonic):
+        """
+        Initialize controller
+
+        Each successful response raises the host's limit by additive_increase
+        divided by the limit, about additive_increase per round of requests.
+        A 429/503 or timeout, or a p95 latency over the last window responses
+        above latency_tolerance times the host's usual p95, multiplies it by
+        decrease_factor, at most once per round trip. Limits stay between
+        min_limit and max_limit; ceiling(host), when given, returns a tighter
+        upper bound such as what the host's rate limit can feed, or None.
+        """
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.window = window
+        self.ceiling = ceiling
+        self.clock = clock
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, settings, ceiling=None):
+        """Build a controller from an adaptive_concurrency config section, or None when disabled"""
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            initial_limit=settings.get('initial_limit', 2),
+            min_limit=settings.get('min_limit', 1),
+            max_limit=settings.get('max_limit', 32),
+            additive_increase=settings.get('additive_increase', 1.0),
+            decrease_factor=settings.get('decrease_factor', 0.5),
+            latency_tolerance=settings.get('latency_tolerance', 2.0),
+            window=settings.get('latency_window', 50),
+            ceiling=ceiling
+        )
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostLimit(
+                min(max(self.initial_limit, self.min_limit), self._upper(host)), self.window)
+        return state
+
+    def _upper(self, host):
+        upper = self.max_limit
+        if self.ceiling is not None:
+            bound = self.ceiling(host)
+            if bound is not None:
+                upper = min(upper, bound)
+        return max(self.min_limit, upper)
+
+    def acquire(self, host):
+        """Wait until host has fewer requests in flight than its current limit, then take a slot"""
+        with self._condition:
+            state = self._host(host)
+            while state.in_flight >= int(state.limit):
+                self._condition.wait()
+            state.in_flight += 1
+
+    def release(self, host, status=None, latency=None, timed_out=False):
+        """
+        Free a slot and adapt the host's limit to the request's outcome
+
+        status is the HTTP status code, or None when the request failed;
+        latency is its time to first byte. Returns the host's new limit.
+        """
+        with self._condition:
+            state = self._host(host)
+            state.in_flight -= 1
+            now = self.clock()
+
+            congested = timed_out or status in self.THROTTLE_STATUS_CODES
+            if not congested and status is not None and latency is not None:
+                state.latencies.append(latency)
+                state.round_trip = latency if not state.round_trip else (
+                    state.round_trip + 0.2 * (latency - state.round_trip))
+                congested = self._latency_rising(state)
+
+            if congested:
+                # One cut per round trip; responses already in flight reflect the old limit
+                if now - state.last_decrease >= state.round_trip:
+                    state.limit = max(self.min_limit, state.limit * self.decrease_factor)
+                    state.last_decrease = now
+                    state.decreases += 1
+            elif status is not None and status < 500:
+                state.limit = min(self._upper(host), state.limit + self.additive_increase / state.limit)
+                state.increases += 1
+
+            self._condition.notify_all()
+            return state.limit
+
+    def _latency_rising(self, state):
+        # Re-evaluated every fifth of a window, once a full window has been seen
+        state.since_check += 1
+        if len(state.latencies) < self.window or state.since_check < max(1, self.window // 5):
+            return False
+        state.since_check = 0
+
+        ordered = sorted(state.latencies)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        if state.baseline_p95 is None:
+            state.baseline_p95 = p95
+            return False
+        if p95 > state.baseline_p95 * self.latency_tolerance:
+            # Start over so the same slow samples do not trigger another cut
+            state.latencies.clear()
+            return True
+        state.baseline_p95 += 0.1 * (p95 - state.baseline_p95)
+        return False
+
+    def limits(self):
+        """Current {host: (limit, in_flight)}"""
+        with self._condition:
+            return {host: (round(state.limit, 2), state.in_flight) for host, state in self._hosts.items()}
@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+from fetcher import Fetcher, InstrumentedAdapter, RateLimiter
+from jsonl_io import JsonLinesWriter, read_jsonl
+
+# Per-CRM bulk endpoint, records per request and request spacing. Salesforce
+# sObject Collections take 200 records per call and HubSpot batch endpoints
+# 100; Pipedrive has no batch create, so each person is its own request and
+# throughput comes from running them in parallel within its rate limit.
+CRM_PROFILES = {
+    'salesforce': {
+        'endpoint': '/services/data/v59.0/composite/sobjects',
+        'object_type': 'Lead',
+        'max_batch_size': 200,
+        'rate_limit': 0.0,
+        'field_mapping': {
+            'FirstName': 'first_name',
+            'LastName': 'last_name',
+            'Company': 'company_name',
+            'Title': 'title',
+            'Email': 'email',
+            'Phone': 'phone',
+            'Industry': 'industry',
+            'Website': 'website',
+            'City': 'location'
+        }
+    },
+    'hubspot': {
+        'endpoint': '/crm/v3/objects/contacts/batch/create',
+        'max_batch_size': 100,
+        'rate_limit': 0.1,
+        'field_mapping': {
+            'firstname': 'first_name',
+            'lastname': 'last_name',
+            'company': 'company_name',
+            'jobtitle': 'title',
+            'email': 'email',
+            'phone': 'phone',
+            'industry': 'industry',
+            'website': 'website',
+            'city': 'location'
+        }
+    },
+    'pipedrive': {
+        'endpoint': '/api/v1/persons',
+        'max_batch_size': 1,
+        'rate_limit': 0.025,
+        'field_mapping': {
+            'name': 'contact_name',
+            'email': 'email',
+            'phone': 'phone',
+            'job_title': 'title'
+        }
+    }
+}
+
+
+def crm_payload(crm, records, object_type=None):
+    """Request body for one batch of mapped records in the CRM's bulk format"""
+    if crm == 'salesforce':
+        attributes = {'type': object_type or CRM_PROFILES['salesforce']['object_type']}
+        return {'allOrNone': False, 'records': [{'attributes': attributes, **record} for record in records]}
+    if crm == 'hubspot':
+        return {'inputs': [{'properties': record} for record in records]}
+    return records[0]
+
+
+def failed_records(crm, body):
+    """Records a CRM rejected inside an accepted batch, from its response body"""
+    if crm == 'salesforce' and isinstance(body, list):
+        return sum(1 for result in body if not result.get('success', True))
+    if crm == 'hubspot' and isinstance(body, dict):
+        return body.get('numErrors', len(body.get('errors', [])))
+    if isinstance(body, dict) and body.get('success') is False:
+        return 1
+    return 0
+
+
+def map_fields(leads, mapping):
+    """
+    Rename and select lead columns for a CRM in one DataFrame pass
+
+    mapping is {crm_field: lead_field}. first_name and last_name are split
+    from contact_name when the leads do not carry them; a contact with a
+    single name uses it as last name, which most CRMs require. Missing
+    values become None.
+    """
+    frame = pd.DataFrame(leads)
+    sources = set(mapping.values())
+    if 'contact_name' in frame and {'first_name', 'last_name'} & sources - set(frame.columns):
+        names = frame['contact_name'].fillna('').astype(str).str.strip().str.rsplit(n=1, expand=True)
+        single = names[1].isna() if 1 in names else pd.Series(True, index=frame.index)
+        frame['first_name'] = names[0].where(~single, '')
+        frame['last_name'] = names[1].where(~single, names[0]) if 1 in names else names[0]
+
+    present = {field: source for field, source in mapping.items() if source in frame}
+    mapped = frame[list(present.values())]
+    mapped.columns = list(present)
+    mapped = mapped.astype(object).where(mapped.notna(), None)
+    return mapped.to_dict('records')
+
+
+class CRMExporter:
+    """Batched, parallel and resumable upload of leads to a CRM bulk API"""
+
+    def __init__(self, crm, base_url, field_mapping=None, batch_size=None, max_concurrency=4,
+                 progress_dir='data/crm_progress', token=None, object_type=None, rate_limit=None,
+                 timeout=60, retry_attempts=4, backoff_seconds=1.0, session=None, metrics=None):
+        """
+        Initialize exporter for one CRM
+
+        field_mapping entries override the CRM's default {crm_field: lead_field}
+        mapping; a field mapped to None is left out. Batches hold batch_size
+        records at most, never more than the CRM accepts per request, and up
+        to max_concurrency of them are in flight at once, rate_limit seconds
+        apart. Each batch is sent with an Idempotency-Key derived from the
+        record_key() of its records, so a batch retried after a lost response,
+        or re-sent after an interrupted run, is not created twice. Records of
+        accepted batches are logged to <progress_dir>/<crm>.progress.jsonl and
+        skipped on the next run.
+        """
+        if crm not in CRM_PROFILES:
+            raise ValueError(f"Unknown CRM {crm!r}, expected one of {', '.join(CRM_PROFILES)}")
+        profile = CRM_PROFILES[crm]
+        self.crm = crm
+        self.url = base_url.rstrip('/') + profile['endpoint']
+        mapping = {**profile['field_mapping'], **(field_mapping or {})}
+        self.field_mapping = {field: source for field, source in mapping.items() if source}
+        self.email_field = next((field for field, source in self.field_mapping.items() if source == 'email'), None)
+        self.batch_size = min(batch_size or profile['max_batch_size'], profile['max_batch_size'])
+        self.max_concurrency = max(1, max_concurrency)
+        self.progress_path = os.path.join(progress_dir, f"{crm}.progress.jsonl")
+        self.token = token
+        self.object_type = object_type
+        self.metrics = metrics
+
+        if session is None:
+            session = requests.Session()
+            adapter = InstrumentedAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.fetcher = Fetcher(
+            session, metrics=metrics, timeout=timeout, retry_attempts=retry_attempts,
+            backoff_seconds=backoff_seconds,
+            rate_limiter=RateLimiter(profile['rate_limit'] if rate_limit is None else rate_limit),
+            max_in_flight=self.max_concurrency
+        )
+
+    @classmethod
+    def from_config(cls, crm, settings, base_url=None, session=None, metrics=None):
+        """Build an exporter from a crm_integration config section, or None when the CRM is not enabled"""
+        if not settings.get(f"{crm}_ready", False):
+            return None
+        target = settings.get('targets', {}).get(crm, {})
+        token_env = target.get('token_env')
+        return cls(
+            crm,
+            base_url or target.get('base_url') or settings.get('base_url', 'http://127.0.0.1:8765'),
+            field_mapping=target.get('field_mapping') if settings.get('custom_mapping', False) else None,
+            batch_size=target.get('batch_size'),
+            max_concurrency=target.get('max_concurrency', settings.get('max_concurrency', 4)),
+            progress_dir=settings.get('progress_dir', 'data/crm_progress'),
+            token=os.environ.get(token_env) if token_env else None,
+            object_type=target.get('object_type'),
+            rate_limit=target.get('rate_limit'),
+            timeout=settings.get('timeout', 60),
+            retry_attempts=settings.get('retry_attempts', 4),
+            session=session,
+            metrics=metrics
+        )
+
+    def map_records(self, leads):
+        """Leads converted to CRM field names"""
+        return map_fields(leads, self.field_mapping)
+
+    def record_key(self, record):
+        """Stable identity of a mapped record: the CRM and its normalized email, else all its fields"""
+        email = record.get(self.email_field) if self.email_field else None
+        if isinstance(email, str) and email.strip():
+            identity = 'email:' + email.strip().lower()
+        else:
+            identity = json.dumps(record, sort_keys=True, default=str)
+        return hashlib.blake2b(f"{self.crm}\x1f{identity}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def batches(self, records, skip=()):
+        """
+        [(idempotency_key, body, record_keys)] for mapped records not in skip
+
+        Records are ordered by record_key(). Once a batch is half full, it
+        closes after any record whose key falls on a boundary (about one in
+        half a batch), or when it is full. Boundaries belong to records rather
+        than positions, so adding, removing or reordering leads changes only
+        the batches around them; every other batch keeps its records and its
+        key. Records sharing a key are sent once.
+        """
+        keyed = {}
+        for record in records:
+            keyed.setdefault(self.record_key(record), record)
+        ordered = sorted(key for key in keyed if key not in skip)
+
+        half = max(1, self.batch_size // 2)
+        batches, chunk = [], []
+        for index, key in enumerate(ordered):
+            chunk.append(key)
+            if (len(chunk) >= self.batch_size or (len(chunk) >= half and int(key[:8], 16) % half == 0)
+                    or index == len(ordered) - 1):
+                body = json.dumps(crm_payload(self.crm, [keyed[record_key] for record_key in chunk], self.object_type),
+                                  default=str).encode('utf-8')
+                batch_key = hashlib.blake2b('\x1f'.join([self.crm] + chunk).encode('utf-8'), digest_size=16)
+                batches.append((batch_key.hexdigest(), body, chunk))
+                chunk = []
+        return batches
+
+    def completed(self):
+        """Record keys of records in batches accepted by earlier runs"""
+        if not os.path.exists(self.progress_path):
+            return set()
+        return {key for entry in read_jsonl(self.progress_path) for key in entry.get('record_keys', [])}
+
+    def _send(self, key, body):
+        headers = {'Content-Type': 'application/json', 'Idempotency-Key': key}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        response = self.fetcher.fetch(self.url, site=self.crm, method='POST', data=body, headers=headers)
+        if response.status_code >= 300:
+            raise requests.HTTPError(f"HTTP {response.status_code} from {self.crm}: {response.text[:200]}",
+                                     response=response)
+        try:
+            return failed_records(self.crm, response.json())
+        except ValueError:
+            return 0
+
+    def _count(self, name, amount=1, **labels):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount, crm=self.crm, **labels)
+
+    def upload(self, leads, resume=True):
+        """
+        Upload leads and return a summary of the run
+
+        With resume, records logged as accepted by an earlier run are
+        skipped; without, the progress log starts over. Batches that still
+        fail after retries are reported and left for the next run. Returns
+        {batches, skipped, uploaded, failed_batches, records, rejected, seconds},
+        where skipped counts records.
+        """
+        start = time.perf_counter()
+        done = self.completed() if resume else set()
+        if self.metrics is not None:
+            with self.metrics.time_stage('crm_mapping', site=self.crm):
+                pending = self.batches(self.map_records(leads), skip=done)
+        else:
+            pending = self.batches(self.map_records(leads), skip=done)
+
+        queued = sum(len(batch[2]) for batch in pending)
+        summary = {'batches': len(pending), 'skipped': len(leads) - queued, 'uploaded': 0,
+                   'failed_batches': 0, 'records': 0, 'rejected': 0, 'seconds': 0.0}
+        if summary['skipped']:
+            print(f"♻️  Skipping {summary['skipped']} {self.crm} records already uploaded or duplicated")
+        print(f"📤 Uploading {queued} records to {self.crm} "
+              f"in {len(pending)} batches of up to {self.batch_size}, {self.max_concurrency} at a time")
+
+        os.makedirs(os.path.dirname(self.progress_path) or '.', exist_ok=True)
+        log = JsonLinesWriter(self.progress_path, append=resume)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            futures = {executor.submit(self._send, key, body): (key, record_keys) for key, body, record_keys in pending}
+            for future in as_completed(futures):
+                key, record_keys = futures[future]
+                count = len(record_keys)
+                try:
+                    rejected = future.result()
+                except requests.RequestException as e:
+                    summary['failed_batches'] += 1
+                    self._count('crm_batches_total', status='failed')
+                    print(f"⚠️  {self.crm} batch {key[:8]} failed: {e}")
+                    continue
+                log.write({'key': key, 'records': count, 'rejected': rejected,
+                           'uploaded_at': datetime.now().isoformat(timespec='seconds'),
+                           'record_keys': record_keys})
+                log.flush()
+                summary['uploaded'] += 1
+                summary['records'] += count - rejected
+                summary['rejected'] += rejected
+                self._count('crm_batches_total', status='uploaded')
+                self._count('crm_records_total', count - rejected, outcome='created')
+                if rejected:
+                    self._count('crm_records_total', rejected, outcome='rejected')
+        finally:
+            # On an interrupt, drop queued batches; the progress log already has the finished ones
+            executor.shutdown(wait=True, cancel_futures=True)
+            log.close()
+
+        summary['seconds'] = round(time.perf_counter() - start, 2)
+        rate = summary['records'] / summary['seconds'] if summary['seconds'] else 0
+        print(f"✅ {self.crm}: {summary['records']} records created in {summary['uploaded']} batches "
+              f"({summary['seconds']}s, {rate:.0f} records/s)")
+        if summary['rejected']:
+            print(f"⚠️  {self.crm} rejected {summary['rejected']} records")
+        if summary['failed_batches']:
+            print(f"❌ {summary['failed_batches']} batches failed; run again to retry them")
+        return summary
+
+    def write_import_file(self, leads, filename):
+        """Write mapped leads as a CSV in the CRM's import column names"""
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        pd.DataFrame(self.map_records(leads), columns=list(self.field_mapping)).to_csv(filename, index=False)
+        print(f"💾 {self.crm} import file written to: {filename}")
+        return filename
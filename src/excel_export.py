@@ -0,0 +1,131 @@
+import itertools
+import math
+import os
+from datetime import date, datetime
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+# Rows per worksheet in the .xlsx format, header row included
+EXCEL_MAX_ROWS = 1048576
+
+
+def _cell(value):
+    """Coerce a record value into something a worksheet cell can hold"""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class StreamingExcelWriter:
+    """Constant-memory .xlsx writer that rolls over to a new sheet at Excel's row limit"""
+
+    def __init__(self, filename, columns, sheet_name='Data', max_rows=EXCEL_MAX_ROWS):
+        """
+        Initialize writer
+
+        Rows are flushed to disk as they are written (xlsxwriter constant_memory,
+        or openpyxl write_only when xlsxwriter is not installed), so memory use
+        does not grow with the number of rows.
+        """
+        if xlsxwriter is None and Workbook is None:
+            raise ImportError("Excel export requires xlsxwriter or openpyxl")
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.filename = filename
+        self.columns = list(columns)
+        self.sheet_name = sheet_name
+        self.rows_per_sheet = max_rows - 1
+        self.rows_written = 0
+        self.sheets = 0
+        self._sheet = None
+        self._sheet_rows = 0
+
+        if xlsxwriter is not None:
+            self._workbook = xlsxwriter.Workbook(filename, {
+                'constant_memory': True,
+                # Scraped URLs would otherwise become hyperlinks, capped at 65,530 per sheet
+                'strings_to_urls': False,
+                'strings_to_formulas': False
+            })
+        else:
+            self._workbook = Workbook(write_only=True)
+
+    def _append(self, sheet, row_index, values):
+        if xlsxwriter is not None:
+            sheet.write_row(row_index, 0, values)
+        else:
+            sheet.append(values)
+
+    def _add_sheet(self, title):
+        if xlsxwriter is not None:
+            return self._workbook.add_worksheet(title)
+        return self._workbook.create_sheet(title)
+
+    def _next_sheet(self):
+        self.sheets += 1
+        title = self.sheet_name if self.sheets == 1 else f"{self.sheet_name} {self.sheets}"
+        self._sheet = self._add_sheet(title)
+        self._append(self._sheet, 0, self.columns)
+        self._sheet_rows = 0
+
+    def write(self, record):
+        """Append one record (a dict) as a row"""
+        if self._sheet is None or self._sheet_rows >= self.rows_per_sheet:
+            self._next_sheet()
+        self._sheet_rows += 1
+        self._append(self._sheet, self._sheet_rows, [_cell(record.get(column)) for column in self.columns])
+        self.rows_written += 1
+
+    def add_summary(self, rows, title='Summary'):
+        """Add a sheet of (metric, value) rows, such as report aggregates"""
+        sheet = self._add_sheet(title)
+        self._append(sheet, 0, ['Metric', 'Value'])
+        for index, (label, value) in enumerate(rows, start=1):
+            self._append(sheet, index, [label, _cell(value)])
+
+    def close(self):
+        """Finish the workbook"""
+        if self._sheet is None:
+            self._next_sheet()
+        if xlsxwriter is not None:
+            self._workbook.close()
+        else:
+            self._workbook.save(self.filename)
+
+
+def write_excel(records, filename, columns=None, summary=None, sheet_name='Data', max_rows=EXCEL_MAX_ROWS):
+    """
+    Stream an iterable of record dicts into an .xlsx file
+
+    Columns default to the keys of the first record. summary, a list of
+    (metric, value) pairs, is written to its own sheet. Returns the writer.
+    """
+    records = iter(records)
+    if columns is None:
+        first = next(records, None)
+        columns = list(first.keys()) if first is not None else []
+        if first is not None:
+            records = itertools.chain([first], records)
+
+    writer = StreamingExcelWriter(filename, columns, sheet_name, max_rows)
+    for record in records:
+        writer.write(record)
+    if summary:
+        writer.add_summary(summary)
+    writer.close()
+    return writer
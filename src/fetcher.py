@@ -0,0 +1,569 @@
+import hashlib
+import socket
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+from buffers import BufferPool, ResponseBody, header_charset
+from concurrency import AdaptiveConcurrency
+from profiling import profile_stage
+from proxies import ProxyPool
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Advertise only the content codings this installation can decode
+ACCEPT_ENCODING = ', '.join(
+    ['gzip', 'deflate'] + (['br'] if brotli is not None else []) + (['zstd'] if zstandard is not None else [])
+)
+
+DECODE_ERRORS = (zlib.error,) + ((brotli.error,) if brotli is not None else ()) + (
+    (zstandard.ZstdError,) if zstandard is not None else ())
+
+BODY_CHUNK_SIZE = 16 * 1024
+
+# Metrics context for the request running on the current thread
+_request_context = threading.local()
+
+
+def _record_connection_timing(stage, seconds):
+    metrics = getattr(_request_context, 'metrics', None)
+    if metrics is not None:
+        metrics.observe('request_seconds', seconds, site=_request_context.site, stage=stage)
+
+
+class _TimedConnectionMixin:
+    """Split new-connection time into DNS resolution and TCP connect"""
+
+    def _new_conn(self):
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            # Let urllib3 raise its own NameResolutionError
+            return super()._new_conn()
+        resolved = time.perf_counter()
+
+        self._dns_host = address
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+
+        _record_connection_timing('dns', resolved - start)
+        _record_connection_timing('connect', time.perf_counter() - resolved)
+        return sock
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections report DNS and connect timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+
+class BodyTooLarge(requests.RequestException):
+    """Response body exceeded the configured maximum size"""
+
+
+class _DeflateDecoder:
+    """Deflate bodies arrive zlib-wrapped or, from some servers, raw"""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+        self._buffered = b''
+
+    def __call__(self, chunk):
+        if self._buffered is None:
+            return self._obj.decompress(chunk)
+        self._buffered += chunk
+        try:
+            decoded = self._obj.decompress(chunk)
+        except zlib.error:
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            decoded = self._obj.decompress(self._buffered)
+        if decoded:
+            self._buffered = None
+        return decoded
+
+    def flush(self):
+        """Decoded tail held back at end of stream; raises zlib.error if the stream was cut short"""
+        tail = self._obj.flush()
+        if not self._obj.eof:
+            raise zlib.error('deflate stream ended early')
+        return tail
+
+
+class _StreamDecoder:
+    """Chunk-by-chunk decoder around a gzip, brotli or zstd decompressor"""
+
+    def __init__(self, decompressor, decompress=None):
+        self._obj = decompressor
+        self._decompress = decompress or decompressor.decompress
+
+    def __call__(self, chunk):
+        return self._decompress(chunk)
+
+    def flush(self):
+        """Decoded tail held back at end of stream; raises zlib.error if the stream was cut short"""
+        tail = self._obj.flush() if hasattr(self._obj, 'flush') else b''
+        finished = getattr(self._obj, 'eof', None)
+        if finished is None and hasattr(self._obj, 'is_finished'):
+            finished = self._obj.is_finished()
+        if finished is False:
+            raise zlib.error('compressed stream ended early')
+        return tail or b''
+
+
+def content_decoder(encoding):
+    """Incremental decoder for one content coding, or None if it is not supported"""
+    if encoding in ('gzip', 'x-gzip'):
+        return _StreamDecoder(zlib.decompressobj(16 + zlib.MAX_WBITS))
+    if encoding == 'deflate':
+        return _DeflateDecoder()
+    if encoding == 'br' and brotli is not None:
+        decompressor = brotli.Decompressor()
+        return _StreamDecoder(decompressor, getattr(decompressor, 'process', None))
+    if encoding == 'zstd' and zstandard is not None:
+        return _StreamDecoder(zstandard.ZstdDecompressor().decompressobj())
+    return None
+
+
+class RateLimiter:
+    """Thread-safe minimum spacing between requests to the same host"""
+
+    def __init__(self, default_interval=0.0, intervals=None, parent=None):
+        """
+        Intervals are seconds between requests, per host or by default
+
+        A limiter created with a parent keeps its own intervals but books slots
+        in the parent's schedule, so scrapers sharing a parent never hit the
+        same host closer together than the spacing each of them asks for.
+        """
+        self.default_interval = default_interval
+        self.intervals = dict(intervals or {})
+        self._next_slot = parent._next_slot if parent is not None else {}
+        self._lock = parent._lock if parent is not None else threading.Lock()
+
+    def interval_for(self, host):
+        """Configured spacing for a host"""
+        return self.intervals.get(host, self.default_interval)
+
+    def acquire(self, host, egress=None):
+        """
+        Reserve the host's next request slot and sleep until it arrives
+
+        Requests leaving through different egress proxies are spaced
+        separately, since the host sees them from different addresses.
+        """
+        interval = self.interval_for(host)
+        if interval <= 0:
+            return
+        key = (host, egress) if egress else host
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(key, now))
+            self._next_slot[key] = slot + interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Query parameters that number pages directly, and ones that count results
+PAGE_PARAMETERS = ('page', 'p', 'pn', 'pg', 'pagenum', 'page_number')
+OFFSET_PARAMETERS = ('start', 'offset', 'from', 'skip', 'first')
+
+
+def page_url(url, index, page_size=10):
+    """URL of the page index steps after url, or None if its pagination is not predictable"""
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+
+    for position, (name, value) in enumerate(params):
+        lowered = name.lower()
+        if lowered in PAGE_PARAMETERS or lowered in OFFSET_PARAMETERS:
+            try:
+                current = int(value)
+            except ValueError:
+                continue
+            step = 1 if lowered in PAGE_PARAMETERS else page_size
+            params[position] = (name, str(current + index * step))
+            return urlunparse(parsed._replace(query=urlencode(params)))
+    return None
+
+
+def _release_prefetched(future):
+    """Hand the buffer of a speculative page nobody will parse back to the pool"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().release()
+
+
+class Fetcher:
+    """Shared HTTP fetch layer with rate limiting, retries and per-site request metrics"""
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, session=None, headers_factory=None, metrics=None,
+                 timeout=30, retry_attempts=3, backoff_seconds=1.0, rate_limiter=None,
+                 max_body_bytes=None, max_in_flight=None, buffer_pool=None, spill_bytes=None,
+                 proxy_pool=None, adaptive_concurrency=None):
+        """
+        Initialize fetcher around a requests session
+
+        Bodies are decompressed as they stream in; a body larger than
+        max_body_bytes once decoded aborts the download with BodyTooLarge.
+        max_in_flight caps this fetcher's concurrent requests, e.g. its share
+        of a connection pool used by several scrapers. Bodies are streamed into
+        buffers from buffer_pool; ones larger than spill_bytes go to a
+        memory-mapped temp file instead. With a proxy_pool, each request goes
+        out through a proxy from the pool, and 403 responses are retried
+        through another one. adaptive_concurrency is an adaptive_concurrency
+        config section; when enabled, each host's in-flight requests are
+        capped by an AIMD limit no higher than its rate limit can feed.
+        """
+        self.session = session or requests.Session()
+        self.headers_factory = headers_factory
+        self.metrics = metrics
+        self.timeout = timeout
+        self.retry_attempts = max(1, retry_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_body_bytes = max_body_bytes
+        self.buffer_pool = buffer_pool or BufferPool()
+        self.spill_bytes = spill_bytes
+        self.proxy_pool = proxy_pool
+        self.concurrency = AdaptiveConcurrency.from_config(adaptive_concurrency or {}, ceiling=self.rate_ceiling)
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else nullcontext()
+
+        # A session shared between scrapers keeps the pool it was set up with
+        if not isinstance(self.session.get_adapter('https://'), InstrumentedAdapter):
+            adapter = InstrumentedAdapter()
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+
+    @staticmethod
+    def site_for(url):
+        """Site label used for metrics: the URL's host name"""
+        return urlparse(url).hostname or 'unknown'
+
+    def fetch(self, url, site=None, method='GET', buffered=False, **kwargs):
+        """
+        Fetch a URL with retries, recording TTFB, download time, bytes and status
+
+        With buffered, the body is left in response.body (a ResponseBody) rather
+        than copied into response.content; the caller must release it.
+        """
+        site = site or self.site_for(url)
+        kwargs.setdefault('timeout', self.timeout)
+        headers = self.headers_factory() if self.headers_factory is not None else {}
+        kwargs['headers'] = {'Accept-Encoding': ACCEPT_ENCODING, **headers, **kwargs.get('headers', {})}
+        # A block on one egress address says nothing about the next one
+        retry_codes = self.RETRY_STATUS_CODES | (ProxyPool.THROTTLE_STATUS_CODES if self.proxy_pool else set())
+
+        last_error = None
+        for attempt in range(self.retry_attempts):
+            if attempt:
+                self._count('retries_total', site=site)
+                time.sleep(self.backoff_seconds * (2 ** (attempt - 1)))
+
+            try:
+                if self.metrics is not None:
+                    timer = self.metrics.time_stage('fetch', site=site)
+                else:
+                    timer = profile_stage('fetch')
+                with timer:
+                    response = self._timed_request(method, url, site, buffered, **kwargs)
+            except BodyTooLarge:
+                # The same page will be just as large on a retry
+                self._count('oversized_bodies_total', site=site)
+                raise
+            except requests.RequestException as e:
+                last_error = e
+                self._count('errors_total', site=site, error=type(e).__name__)
+                continue
+
+            if response.status_code in retry_codes and attempt < self.retry_attempts - 1:
+                last_error = requests.HTTPError(f"HTTP {response.status_code} for {url}", response=response)
+                if buffered:
+                    response.body.release()
+                continue
+
+            return response
+
+        raise last_error
+
+    def fetch_body(self, url, site=None, **kwargs):
+        """
+        Fetch a URL into a pooled buffer and return its ResponseBody
+
+        The body's bytes are never copied into a bytes object; use it as a
+        context manager so its buffer goes back to the pool after parsing.
+        """
+        return self.fetch(url, site=site, buffered=True, **kwargs).body
+
+    def rate_ceiling(self, host):
+        """
+        Most requests to a host worth having in flight, or None when it is not rate limited
+
+        Requests beyond what the host's rate budget allows within one round
+        trip would only queue on the rate limiter. Each healthy proxy has a
+        budget of its own.
+        """
+        interval = self.rate_limiter.interval_for(host)
+        if interval <= 0:
+            return None
+
+        round_trip = 1.0
+        if self.metrics is not None:
+            histogram = self.metrics.histogram('request_seconds', site=host, stage='ttfb')
+            if histogram is not None and histogram.count:
+                round_trip = histogram.quantile(0.5)
+        egress = self.proxy_pool.healthy_count() if self.proxy_pool is not None else 1
+        return (int(round_trip / interval) + 1) * max(1, egress)
+
+    def speculation_depth(self, url, requested):
+        """
+        How many pages to keep in flight for a host, capped by its rate budget
+
+        The cap is what the rate budget keeps busy within one round trip plus
+        one page waiting on the rate limiter, so the host's next slot is used as
+        soon as it opens. Even a host whose rate_limit exceeds its round trip
+        gets one page of prefetch.
+        """
+        ceiling = self.rate_ceiling(self.site_for(url))
+        return max(1, min(requested, ceiling + 1 if ceiling is not None else requested))
+
+    def paginate(self, url, parse_page, max_pages=10, prefetch=3, page_size=10, item_key=None, site=None):
+        """
+        Yield (page_url, items) for consecutive result pages starting at url
+
+        When the URL has a page or offset parameter, up to prefetch next pages
+        are requested speculatively while the current one is parsed.
+        parse_page(body) receives the page's ResponseBody, which is released
+        once it returns, and returns the page's items, or None when the page
+        should be skipped without ending pagination; skipped pages are not
+        yielded. Pagination stops at the first empty page, a page repeating
+        an earlier one, or max_pages. A page that cannot be fetched raises its
+        fetch error. Pages whose URL cannot be predicted are fetched one at a
+        time.
+        """
+        site = site or self.site_for(url)
+        predictable = page_url(url, 1, page_size) is not None
+        depth = self.speculation_depth(url, prefetch + 1) if predictable else 1
+        max_pages = max_pages if predictable else 1
+
+        executor = ThreadPoolExecutor(max_workers=depth, thread_name_prefix='prefetch')
+        futures = {}
+
+        def submit(index):
+            if index < max_pages and index not in futures:
+                target = url if index == 0 else page_url(url, index, page_size)
+                futures[index] = (target, executor.submit(self.fetch_body, target, site=site))
+
+        seen_pages = set()
+        try:
+            for index in range(depth):
+                submit(index)
+
+            for index in range(max_pages):
+                target, future = futures.pop(index)
+                with future.result() as body:
+                    items = parse_page(body)
+
+                if items is not None:
+                    if not items:
+                        break
+                    if item_key is not None:
+                        signature = frozenset(item_key(item) for item in items)
+                    else:
+                        signature = hashlib.blake2b(repr(items).encode('utf-8'), digest_size=16).digest()
+                    if signature in seen_pages:
+                        break
+                    seen_pages.add(signature)
+                    yield target, items
+                submit(index + depth)
+        finally:
+            wasted = 0
+            for _, future in futures.values():
+                if not future.cancel():
+                    wasted += 1
+                    future.add_done_callback(_release_prefetched)
+            executor.shutdown(wait=False)
+            if wasted and self.metrics is not None:
+                self.metrics.increment('speculative_pages_wasted_total', wasted, site=site)
+
+    def _timed_request(self, method, url, site, buffered=False, **kwargs):
+        host = self.site_for(url)
+        if self.concurrency is not None:
+            self.concurrency.acquire(host)
+        status = latency = error = proxy = None
+        _request_context.metrics = self.metrics
+        _request_context.site = site
+        try:
+            proxy = self.proxy_pool.acquire(host) if self.proxy_pool is not None else None
+            if proxy is not None:
+                kwargs['proxies'] = proxy.proxies
+            self.rate_limiter.acquire(host, proxy.url if proxy is not None else None)
+            with self._slots:
+                start = time.perf_counter()
+                response = self.session.request(method, url, stream=True, **kwargs)
+                headers_received = time.perf_counter()
+                status, latency = response.status_code, headers_received - start
+                body, wire_bytes, decode_seconds, encoding = self._read_body(response, url)
+                finished = time.perf_counter()
+        except BodyTooLarge:
+            raise
+        except requests.RequestException as e:
+            # The response never arrived whole; count it against the proxy and the host limit
+            status, error = None, e
+            raise
+        finally:
+            _request_context.metrics = None
+            if proxy is not None:
+                self._release_proxy(proxy, site, status, latency)
+            if self.concurrency is not None:
+                self._release_host(host, site, status, latency, error)
+
+        body.response = response
+        body.declared_encoding = header_charset(response.headers.get('Content-Type'))
+        decoded_bytes = body.size
+        if buffered:
+            response.body = body
+        else:
+            response._content = body.tobytes()
+            body.release()
+        response._content_consumed = True
+
+        if self.metrics is not None:
+            self.metrics.observe('request_seconds', headers_received - start, site=site, stage='ttfb')
+            self.metrics.observe('request_seconds', finished - headers_received, site=site, stage='download')
+            self.metrics.increment('bytes_total', wire_bytes, site=site)
+            self.metrics.increment('responses_total', site=site, status=response.status_code)
+            if encoding:
+                self.metrics.observe('request_seconds', decode_seconds, site=site, stage='decompress')
+                self.metrics.increment('decoded_bytes_total', decoded_bytes, site=site, encoding=encoding)
+                self.metrics.increment('compressed_bytes_total', wire_bytes, site=site, encoding=encoding)
+        return response
+
+    def _release_proxy(self, proxy, site, status, latency):
+        cooled = self.proxy_pool.release(proxy, status, latency)
+        if self.metrics is not None:
+            self.metrics.increment('proxy_requests_total', proxy=proxy.name,
+                                   status=status if status is not None else 'error')
+            self.metrics.set_gauge('proxy_health', round(proxy.health(), 3), proxy=proxy.name)
+            if cooled:
+                self.metrics.increment('proxy_cooldowns_total', proxy=proxy.name, site=site)
+
+    def _release_host(self, host, site, status, latency, error):
+        # Read timeouts while streaming the body surface as ConnectionError
+        timed_out = isinstance(error, requests.Timeout) or (
+            isinstance(error, requests.ConnectionError) and error.args and isinstance(error.args[0], ReadTimeoutError))
+        limit = self.concurrency.release(host, status, latency, timed_out)
+        if self.metrics is not None:
+            self.metrics.set_gauge('concurrency_limit', round(limit, 2), site=site)
+
+    def _read_body(self, response, url):
+        """
+        Stream the body off the wire, decoding each chunk as it arrives
+
+        Only the decoded body is accumulated, in a pooled ResponseBody.
+        Returns (body, bytes on the wire, seconds spent decoding, content coding).
+        """
+        encodings = [
+            coding.strip().lower() for coding in response.headers.get('Content-Encoding', '').split(',')
+            if coding.strip() and coding.strip().lower() != 'identity'
+        ]
+        # Codings are listed in the order they were applied
+        decoders = [content_decoder(coding) for coding in reversed(encodings)]
+        if None in decoders:
+            decoders = []
+
+        declared = response.headers.get('Content-Length', '')
+        if self.max_body_bytes and not decoders and declared.isdigit() and int(declared) > self.max_body_bytes:
+            response.close()
+            raise BodyTooLarge(f"{url} declares {declared} bytes, limit is {self.max_body_bytes}", response=response)
+
+        body = ResponseBody(self.buffer_pool, self.spill_bytes)
+        wire_bytes = 0
+        decode_seconds = 0.0
+        completed = False
+        try:
+            for chunk in response.raw.stream(BODY_CHUNK_SIZE, decode_content=False):
+                wire_bytes += len(chunk)
+                if decoders:
+                    started = time.perf_counter()
+                    for decoder in decoders:
+                        chunk = decoder(chunk)
+                    decode_seconds += time.perf_counter() - started
+                body.write(chunk)
+                if self.max_body_bytes and body.size > self.max_body_bytes:
+                    raise BodyTooLarge(f"{url} exceeds {self.max_body_bytes} bytes", response=response)
+            if decoders and wire_bytes:
+                # Decompressors hold back a tail until the end, and a truncated stream never reaches eof
+                started = time.perf_counter()
+                tail = b''
+                for decoder in decoders:
+                    tail = (decoder(tail) if tail else b'') + decoder.flush()
+                decode_seconds += time.perf_counter() - started
+                body.write(tail)
+                if self.max_body_bytes and body.size > self.max_body_bytes:
+                    raise BodyTooLarge(f"{url} exceeds {self.max_body_bytes} bytes", response=response)
+            completed = True
+        except DECODE_ERRORS as e:
+            response.close()
+            raise requests.exceptions.ContentDecodingError(e, response=response)
+        # Raw streaming bypasses requests' own wrapping of these
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e, response=response)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e, response=response)
+        finally:
+            response.close()
+            if not completed:
+                body.release()
+
+        return body, wire_bytes, decode_seconds, ','.join(encodings) if decoders else ''
+
+    def _count(self, name, **labels):
+        if self.metrics is not None:
+            self.metrics.increment(name, **labels)
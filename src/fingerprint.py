@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+
+# Markup that never carries listing content; CSRF tokens and nonces live here
+_NOISE_PATTERN = re.compile(rb'<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.DOTALL | re.IGNORECASE)
+_TAG_PATTERN = re.compile(rb'<[^>]*>')
+_WORD_PATTERN = re.compile(rb'\w+')
+
+# Prices must never be absorbed by near-duplicate matching
+PRICE_PATTERN = rb'(?:\$|\xc2\xa3|\xe2\x82\xac)\s?\d[\d,]*(?:\.\d+)?'
+
+# A listing card is identified by its link and the link's text (its title)
+LINK_PATTERN = rb'<a\b[^>]*?\bhref\s*=\s*["\']?([^"\'\s>]+)[^>]*>(.*?)</a\s*>'
+_SPACE_PATTERN = re.compile(rb'\s+')
+
+
+def _compile(pattern, flags=0):
+    if not pattern:
+        return None
+    if isinstance(pattern, str):
+        pattern = pattern.encode('utf-8')
+    return re.compile(pattern, flags)
+
+
+def simhash(tokens, bits=64):
+    """Charikar SimHash of a token sequence as an unsigned integer"""
+    if not tokens:
+        return 0
+
+    digests = b''.join(hashlib.blake2b(token, digest_size=bits // 8).digest() for token in tokens)
+    matrix = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(tokens), bits)
+    votes = matrix.sum(axis=0, dtype=np.int64) * 2 - len(tokens)
+
+    value = 0
+    for bit in votes > 0:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+class Fingerprinter:
+    """Cheap byte-level fingerprint of the relevant region of a page"""
+
+    def __init__(self, region_pattern=None, exact_pattern=None, key_pattern=None, shingle_size=3, max_distance=3):
+        """
+        Initialize fingerprinter
+
+        region_pattern matches the opening tag of the element that matters, with
+        the tag name as its first group; the region runs to that element's
+        matching closing tag. Tokens of the region's text matching exact_pattern,
+        such as prices, and matches of key_pattern in its markup, such as each
+        listing card's link and title, are hashed exactly, so changing, adding
+        or removing one is always a change. The rest of the text is compared
+        with SimHash and may differ by up to max_distance bits.
+        """
+        self.region_pattern = _compile(region_pattern, re.DOTALL | re.IGNORECASE)
+        self.exact_pattern = _compile(exact_pattern)
+        self.key_pattern = _compile(key_pattern, re.DOTALL | re.IGNORECASE)
+        self.shingle_size = shingle_size
+        self.max_distance = max_distance
+
+    def region(self, body):
+        """Return the relevant element of the page, or the whole page"""
+        if self.region_pattern is None:
+            return body
+        match = self.region_pattern.search(body)
+        if not match:
+            return body
+        if not match.groups():
+            return match.group(0)
+
+        # Balance opening and closing tags of the same name to find the element's end
+        tags = re.compile(rb'<(/?)' + re.escape(match.group(1)) + rb'\b[^>]*>', re.IGNORECASE)
+        depth = 1
+        for tag in tags.finditer(body, match.end()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                return body[match.end():tag.start()]
+        return body[match.end():]
+
+    def keys(self, region):
+        """Sorted distinct exact keys (key_pattern matches, tags and spacing removed) of a region"""
+        if self.key_pattern is None:
+            return []
+        keys = set()
+        for match in self.key_pattern.finditer(region):
+            parts = match.groups() or (match.group(0),)
+            text = b'\x1f'.join(_SPACE_PATTERN.sub(b' ', _TAG_PATTERN.sub(b' ', part or b'')).strip() for part in parts)
+            keys.add(text)
+        return sorted(keys)
+
+    def fingerprint(self, body):
+        """Return (simhash, exact digest) for a page body given as str or any bytes-like object"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        region = _NOISE_PATTERN.sub(b' ', self.region(body))
+        text = _TAG_PATTERN.sub(b' ', region)
+        words = _WORD_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        shingles = [b' '.join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))] if words else []
+
+        exact = ''
+        if self.exact_pattern is not None or self.key_pattern is not None:
+            tokens = self.exact_pattern.findall(text) if self.exact_pattern is not None else []
+            exact = hashlib.blake2b(b'|'.join(tokens) + b'\x1e' + b'\x1e'.join(self.keys(region)),
+                                    digest_size=16).hexdigest()
+
+        return simhash(shingles), exact
+
+    def same(self, previous, current):
+        """Whether two fingerprints describe the same content"""
+        return previous[1] == current[1] and hamming_distance(previous[0], current[0]) <= self.max_distance
+
+
+class FingerprintStore:
+    """Per-URL fingerprints persisted as JSON between runs"""
+
+    def __init__(self, path, fingerprinter=None):
+        """Load stored fingerprints from path if it exists"""
+        self.path = path
+        self.fingerprinter = fingerprinter or Fingerprinter()
+        self.entries = {}
+        self.skipped = 0
+        self._dirty = False
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def check(self, url, body):
+        """
+        Fingerprint a page and remember it
+
+        Returns True when the page changed (or is new) and should be parsed,
+        False when it matches the stored fingerprint.
+        """
+        current = self.fingerprinter.fingerprint(body)
+        entry = self.entries.get(url)
+        now = datetime.now().isoformat()
+
+        if entry is not None and self.fingerprinter.same((entry['simhash'], entry['exact']), current):
+            entry['last_checked'] = now
+            self.skipped += 1
+            self._dirty = True
+            return False
+
+        self.entries[url] = {
+            'simhash': current[0],
+            'exact': current[1],
+            'last_changed': now,
+            'last_checked': now
+        }
+        self._dirty = True
+        return True
+
+    def forget(self, url):
+        """Drop a URL so that its next check is treated as changed"""
+        if self.entries.pop(url, None) is not None:
+            self._dirty = True
+
+    def save(self):
+        """Atomically write fingerprints back to disk"""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_file, self.path)
+        self._dirty = False
@@ -0,0 +1,350 @@
+import bisect
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict
+
+# ISO code: (name, other ways of writing it)
+COUNTRIES = {
+    'US': ('United States', ('usa', 'us', 'united states of america', 'america')),
+    'CA': ('Canada', ()),
+    'GB': ('United Kingdom', ('uk', 'great britain', 'britain')),
+    'IE': ('Ireland', ()),
+    'DE': ('Germany', ('deutschland',)),
+    'FR': ('France', ()),
+    'NL': ('Netherlands', ('the netherlands', 'holland')),
+    'ES': ('Spain', ('espana',)),
+    'IT': ('Italy', ('italia',)),
+    'SE': ('Sweden', ()),
+    'CH': ('Switzerland', ()),
+    'PL': ('Poland', ()),
+    'PT': ('Portugal', ()),
+    'IN': ('India', ()),
+    'AU': ('Australia', ()),
+    'NZ': ('New Zealand', ()),
+    'SG': ('Singapore', ()),
+    'JP': ('Japan', ()),
+    'KR': ('South Korea', ('korea',)),
+    'CN': ('China', ()),
+    'AE': ('United Arab Emirates', ('uae',)),
+    'IL': ('Israel', ()),
+    'BR': ('Brazil', ('brasil',)),
+    'MX': ('Mexico', ()),
+    'AR': ('Argentina', ()),
+    'ZA': ('South Africa', ())
+}
+
+# (country, GeoNames admin1 code): (name, abbreviation)
+REGIONS = {
+    ('US', 'AL'): ('Alabama', 'AL'), ('US', 'AK'): ('Alaska', 'AK'), ('US', 'AZ'): ('Arizona', 'AZ'),
+    ('US', 'AR'): ('Arkansas', 'AR'), ('US', 'CA'): ('California', 'CA'), ('US', 'CO'): ('Colorado', 'CO'),
+    ('US', 'CT'): ('Connecticut', 'CT'), ('US', 'DE'): ('Delaware', 'DE'), ('US', 'DC'): ('District of Columbia', 'DC'),
+    ('US', 'FL'): ('Florida', 'FL'), ('US', 'GA'): ('Georgia', 'GA'), ('US', 'HI'): ('Hawaii', 'HI'),
+    ('US', 'ID'): ('Idaho', 'ID'), ('US', 'IL'): ('Illinois', 'IL'), ('US', 'IN'): ('Indiana', 'IN'),
+    ('US', 'IA'): ('Iowa', 'IA'), ('US', 'KS'): ('Kansas', 'KS'), ('US', 'KY'): ('Kentucky', 'KY'),
+    ('US', 'LA'): ('Louisiana', 'LA'), ('US', 'ME'): ('Maine', 'ME'), ('US', 'MD'): ('Maryland', 'MD'),
+    ('US', 'MA'): ('Massachusetts', 'MA'), ('US', 'MI'): ('Michigan', 'MI'), ('US', 'MN'): ('Minnesota', 'MN'),
+    ('US', 'MS'): ('Mississippi', 'MS'), ('US', 'MO'): ('Missouri', 'MO'), ('US', 'MT'): ('Montana', 'MT'),
+    ('US', 'NE'): ('Nebraska', 'NE'), ('US', 'NV'): ('Nevada', 'NV'), ('US', 'NH'): ('New Hampshire', 'NH'),
+    ('US', 'NJ'): ('New Jersey', 'NJ'), ('US', 'NM'): ('New Mexico', 'NM'), ('US', 'NY'): ('New York', 'NY'),
+    ('US', 'NC'): ('North Carolina', 'NC'), ('US', 'ND'): ('North Dakota', 'ND'), ('US', 'OH'): ('Ohio', 'OH'),
+    ('US', 'OK'): ('Oklahoma', 'OK'), ('US', 'OR'): ('Oregon', 'OR'), ('US', 'PA'): ('Pennsylvania', 'PA'),
+    ('US', 'RI'): ('Rhode Island', 'RI'), ('US', 'SC'): ('South Carolina', 'SC'), ('US', 'SD'): ('South Dakota', 'SD'),
+    ('US', 'TN'): ('Tennessee', 'TN'), ('US', 'TX'): ('Texas', 'TX'), ('US', 'UT'): ('Utah', 'UT'),
+    ('US', 'VT'): ('Vermont', 'VT'), ('US', 'VA'): ('Virginia', 'VA'), ('US', 'WA'): ('Washington', 'WA'),
+    ('US', 'WV'): ('West Virginia', 'WV'), ('US', 'WI'): ('Wisconsin', 'WI'), ('US', 'WY'): ('Wyoming', 'WY'),
+    ('CA', '01'): ('Alberta', 'AB'), ('CA', '02'): ('British Columbia', 'BC'), ('CA', '03'): ('Manitoba', 'MB'),
+    ('CA', '04'): ('New Brunswick', 'NB'), ('CA', '05'): ('Newfoundland and Labrador', 'NL'),
+    ('CA', '07'): ('Nova Scotia', 'NS'), ('CA', '08'): ('Ontario', 'ON'), ('CA', '09'): ('Prince Edward Island', 'PE'),
+    ('CA', '10'): ('Quebec', 'QC'), ('CA', '11'): ('Saskatchewan', 'SK'),
+    ('GB', 'ENG'): ('England', 'ENG'), ('GB', 'SCT'): ('Scotland', 'SCT'),
+    ('GB', 'WLS'): ('Wales', 'WLS'), ('GB', 'NIR'): ('Northern Ireland', 'NIR'),
+    ('AU', '01'): ('Australian Capital Territory', 'ACT'), ('AU', '02'): ('New South Wales', 'NSW'),
+    ('AU', '04'): ('Queensland', 'QLD'), ('AU', '05'): ('South Australia', 'SA'),
+    ('AU', '07'): ('Victoria', 'VIC'), ('AU', '08'): ('Western Australia', 'WA')
+}
+
+REMOTE_WORDS = {'remote', 'anywhere', 'worldwide', 'work from home', 'wfh', 'distributed'}
+# Words that qualify a location without naming it
+_NOISE_WORDS = re.compile(r'\b(?:remote|hybrid|on ?site|in office|greater|metro(?:politan)?|area|region|based)\b|\d+')
+_NON_WORD = re.compile(r'[^\w,]+')
+
+# Shortest partial name the prefix index is consulted for
+MIN_PREFIX_LENGTH = 4
+
+GEO_FIELDS = ['city', 'region', 'country', 'latitude', 'longitude', 'remote']
+
+
+def normalize_place(text):
+    """Lowercase, accent-free, punctuation-free form of a place name; commas are kept"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = _NON_WORD.sub(' ', text.replace('.', '').replace('_', ' '))
+    return ' '.join(text.split()).replace(' ,', ',')
+
+
+def _build_aliases():
+    countries, regions = {}, {}
+    for code, (name, others) in COUNTRIES.items():
+        for alias in (name,) + others:
+            countries[normalize_place(alias)] = code
+    for key, (name, abbreviation) in REGIONS.items():
+        regions.setdefault(normalize_place(name), key)
+        regions.setdefault(normalize_place(abbreviation), key)
+    return countries, regions
+
+
+COUNTRY_ALIASES, REGION_ALIASES = _build_aliases()
+
+
+def _code_countries():
+    """Countries a two- or three-letter code can point to, for codes that point to more than one"""
+    countries = {}
+    for (country, _), (_, abbreviation) in REGIONS.items():
+        countries.setdefault(normalize_place(abbreviation), set()).add(country)
+    for code in COUNTRIES:
+        countries.setdefault(normalize_place(code), set()).add(code)
+    return {code: found for code, found in countries.items() if len(found) > 1}
+
+
+# "IN" is Indiana or India, "CA" California or Canada, "WA" Washington or Western Australia
+AMBIGUOUS_CODES = _code_countries()
+
+
+class Gazetteer:
+    """In-memory place index over a GeoNames-format gazetteer file"""
+
+    def __init__(self, path, min_population=0):
+        """
+        Load populated places from a GeoNames dump (e.g. cities15000.txt)
+
+        Each place is indexed under its name, ASCII name and alternate names,
+        normalized, in a hash index for exact lookups and a sorted key list for
+        prefix lookups. Coordinates and populations are held in typed arrays.
+        """
+        self.names = []
+        self.countries = []
+        self.admin1 = []
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.population = array('q')
+        self.index = {}
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 15 or fields[6] not in ('P', ''):
+                    continue
+                population = int(fields[14] or 0)
+                if population < min_population:
+                    continue
+
+                row = len(self.names)
+                self.names.append(fields[1])
+                self.countries.append(fields[8])
+                self.admin1.append(fields[10])
+                self.latitude.append(float(fields[4]))
+                self.longitude.append(float(fields[5]))
+                self.population.append(population)
+
+                keys = {normalize_place(fields[1]), normalize_place(fields[2])}
+                keys.update(normalize_place(alias) for alias in fields[3].split(',') if alias)
+                for key in keys:
+                    if key:
+                        self.index.setdefault(key, []).append(row)
+
+        self._sorted_keys = sorted(self.index)
+        print(f"🗺️  Gazetteer loaded: {len(self.names)} places, {len(self.index)} names from {path}")
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, name):
+        """Rows for an exact normalized name, else for names it is a prefix of"""
+        rows = self.index.get(name)
+        if rows or len(name) < MIN_PREFIX_LENGTH:
+            return rows or []
+
+        rows = []
+        position = bisect.bisect_left(self._sorted_keys, name)
+        while position < len(self._sorted_keys) and self._sorted_keys[position].startswith(name):
+            rows.extend(self.index[self._sorted_keys[position]])
+            position += 1
+        return rows
+
+    def place(self, row):
+        """Geocoding result for a gazetteer row"""
+        country = self.countries[row]
+        region = REGIONS.get((country, self.admin1[row]))
+        return {
+            'city': self.names[row],
+            'region': region[0] if region else None,
+            'country': country,
+            'latitude': round(self.latitude[row], 5),
+            'longitude': round(self.longitude[row], 5),
+            'remote': False
+        }
+
+
+class Geocoder:
+    """Offline geocoder: gazetteer lookups behind an in-memory LRU and a SQLite cache"""
+
+    def __init__(self, gazetteer_path, cache_path=None, memory_size=10000, min_population=0):
+        """
+        Initialize geocoder
+
+        The gazetteer is only loaded on the first string neither cache knows.
+        Results, misses included, are written to cache_path on save().
+        """
+        self.gazetteer_path = gazetteer_path
+        self.min_population = min_population
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._pending = {}
+        self._gazetteer = None
+        self.lookups = Counter()
+
+        self._cache = None
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+            self._cache.execute('CREATE TABLE IF NOT EXISTS geocode (location TEXT PRIMARY KEY, result TEXT)')
+
+    @classmethod
+    def from_config(cls, settings):
+        """Geocoder for a scraper's geocoding settings, or None when the gazetteer is missing"""
+        gazetteer = settings.get('gazetteer', 'config/gazetteer.tsv')
+        if not os.path.exists(gazetteer):
+            print(f"⚠️  Gazetteer {gazetteer} not found, skipping geocoding")
+            return None
+        return cls(
+            gazetteer,
+            settings.get('cache_file', 'data/geocode_cache.sqlite'),
+            memory_size=settings.get('memory_cache_size', 10000),
+            min_population=settings.get('min_population', 0)
+        )
+
+    @property
+    def gazetteer(self):
+        if self._gazetteer is None:
+            self._gazetteer = Gazetteer(self.gazetteer_path, self.min_population)
+        return self._gazetteer
+
+    def geocode(self, location):
+        """Resolve a free-text location to a place dict, or None when it cannot be placed"""
+        key = normalize_place(location or '')
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.lookups['memory'] += 1
+            return self._memory[key]
+
+        result = self._from_disk(key)
+        if result is False:
+            result = self.resolve(key)
+            self._pending[key] = result
+            self.lookups['gazetteer'] += 1
+        else:
+            self.lookups['disk'] += 1
+
+        self._memory[key] = result
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+        return result
+
+    def _from_disk(self, key):
+        """Cached result for a key, or False when it is not cached"""
+        if key in self._pending:
+            return self._pending[key]
+        if self._cache is None:
+            return False
+        row = self._cache.execute('SELECT result FROM geocode WHERE location = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else False
+
+    def resolve(self, key):
+        """Look a normalized location up in the gazetteer"""
+        if not key:
+            return None
+        remote = key in REMOTE_WORDS or any(word in key for word in REMOTE_WORDS)
+        parts = [part.strip() for part in _NOISE_WORDS.sub(' ', key).split(',')]
+        parts = [' '.join(part.split()) for part in parts if part.strip()]
+        if not parts:
+            return {**dict.fromkeys(GEO_FIELDS), 'remote': True} if remote else None
+
+        # Trailing parts narrow the place down: a region, a country, or both
+        country, region = None, None
+        for qualifier in parts[1:]:
+            if qualifier in COUNTRY_ALIASES and qualifier not in REGION_ALIASES:
+                country = COUNTRY_ALIASES[qualifier]
+            elif qualifier in REGION_ALIASES and region is None:
+                region = REGION_ALIASES[qualifier]
+
+        gazetteer = self.gazetteer
+        candidates = gazetteer.candidates(parts[0])
+        rows = [row for row in candidates if country in (None, gazetteer.countries[row])]
+        if region is not None:
+            in_region = [row for row in rows if (gazetteer.countries[row], gazetteer.admin1[row]) == region]
+            # An ambiguous code may mean another region or a country: try those, and nowhere else
+            codes = [qualifier for qualifier in parts[1:] if REGION_ALIASES.get(qualifier) == region]
+            elsewhere = AMBIGUOUS_CODES.get(codes[0], set()) if codes else set()
+            rows = in_region or [row for row in rows if gazetteer.countries[row] in elsewhere]
+            if not rows:
+                # "Paris, TX" is in Texas even when the gazetteer has no such town
+                return {**dict.fromkeys(GEO_FIELDS), 'region': REGIONS[region][0], 'country': region[0],
+                        'remote': remote}
+        if rows:
+            place = gazetteer.place(max(rows, key=lambda row: gazetteer.population[row]))
+            place['remote'] = remote
+            return place
+
+        # A bare country or region, e.g. "Remote - USA" or "Texas"
+        if len(parts) == 1 and (parts[0] in COUNTRY_ALIASES or parts[0] in REGION_ALIASES):
+            if parts[0] in COUNTRY_ALIASES:
+                country, region_name = COUNTRY_ALIASES[parts[0]], None
+            else:
+                country, region_name = REGION_ALIASES[parts[0]][0], REGIONS[REGION_ALIASES[parts[0]]][0]
+            return {**dict.fromkeys(GEO_FIELDS), 'region': region_name, 'country': country, 'remote': remote}
+        return {**dict.fromkeys(GEO_FIELDS), 'remote': True} if remote else None
+
+    def geocode_records(self, records, field='location'):
+        """
+        Add city, region, country, latitude, longitude and remote to each record
+
+        Each distinct location string is geocoded once. Returns how many
+        records were placed.
+        """
+        places = {value: self.geocode(value) for value in dict.fromkeys(record.get(field) for record in records)}
+        empty = dict.fromkeys(GEO_FIELDS)
+        placed = 0
+        for record in records:
+            place = places[record.get(field)]
+            record.update(place or empty)
+            placed += place is not None
+        return placed
+
+    def save(self):
+        """Write newly resolved locations to the disk cache"""
+        if self._cache is None or not self._pending:
+            return
+        with self._cache:
+            self._cache.executemany(
+                'INSERT OR REPLACE INTO geocode (location, result) VALUES (?, ?)',
+                [(key, json.dumps(result)) for key, result in self._pending.items()]
+            )
+        self._pending.clear()
+
+    def close(self):
+        self.save()
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+
+def place_label(record):
+    """Grouping label for a geocoded record, e.g. 'California, US', 'GB', 'Remote' or 'Unresolved'"""
+    if record.get('country'):
+        return f"{record['region']}, {record['country']}" if record.get('region') else record['country']
+    return 'Remote' if record.get('remote') else 'Unresolved'
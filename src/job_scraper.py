@@ -8,20 +8,107 @@ import argparse
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 import os
+from collections import Counter
 from site_manager import SiteManager
+from metrics import MetricsCollector
+from fetcher import ACCEPT_ENCODING, Fetcher, RateLimiter
+from proxies import ProxyPool
+from profiling import Profiler
+from fingerprint import LINK_PATTERN, Fingerprinter, FingerprintStore
+from query_planner import QueryPlanner
+from excel_export import write_excel
+from checkpoint import Checkpoint
+from jsonl_io import jsonl_path, read_jsonl, write_jsonl
+from salary import SALARY_COLUMNS, annual_salary, parse_salaries, salary_percentiles
+from skills import SkillMatcher
+from geocoding import Geocoder, place_label
+from synthetic import job_batches
+from posting_index import PostingIndex
+from urllib.parse import quote_plus
 
 class JobScraper:
     """Professional job scraping toolkit for market research and lead generation"""
     
-    def __init__(self, config_file='config/job_scraper_config.json'):
+    # Generic job card selectors; override per deployment in extraction_settings.listing_selectors
+    DEFAULT_LISTING_SELECTORS = {
+        'job_card': '[data-job-id], .job-card, .job_seen_beacon, li.job, article.job',
+        'title': 'h2, h3, .job-title, [data-testid="job-title"]',
+        'company': '.company, .company-name, [data-testid="company-name"]',
+        'location': '.location, .job-location, [data-testid="job-location"]',
+        'salary': '.salary, .salary-snippet, [data-testid="salary"]',
+        'description': '.description, .job-snippet, .summary',
+        'job_type': '.job-type, [data-testid="job-type"]'
+    }
+    
+    # Demo and synthetic data vocabularies
+    DEMO_COMPANIES = [
+        "TechCorp Inc", "DataSolutions LLC", "CloudTech Systems", 
+        "InnovateLabs", "DigitalFirst Group", "ScaleUp Technologies",
+        "NextGen Software", "AI Dynamics", "WebFlow Solutions"
+    ]
+    
+    DEMO_TITLES = [
+        "Python Developer", "Full Stack Developer", "Data Analyst",
+        "Software Engineer", "Backend Developer", "DevOps Engineer",
+        "Machine Learning Engineer", "Web Developer", "API Developer"
+    ]
+    
+    DEMO_LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "Austin, TX", 
+                      "Seattle, WA", "Chicago, IL", "Boston, MA", "Denver, CO"]
+    
+    DEMO_SALARY_RANGES = [
+        "$60,000 - $80,000", "$70,000 - $90,000", "$80,000 - $100,000",
+        "$90,000 - $120,000", "$100,000 - $130,000", "$110,000 - $140,000"
+    ]
+    
+    def __init__(self, config_file='config/job_scraper_config.json', session=None, metrics=None,
+                 rate_limiter=None, max_connections=None, proxy_pool=None):
         """Initialize scraper with configuration"""
         self.config = self.load_config(config_file)
         self.scraped_jobs = []
-        self.session = requests.Session()
+        self.session = session or requests.Session()
         
         # Initialize site manager
         self.site_manager = SiteManager(config_file)
         
+        # Performance metrics and shared fetch layer
+        extraction = self.config.get('extraction_settings', {})
+        self.metrics = metrics or MetricsCollector('job_scraper')
+        self.fetcher = Fetcher(
+            self.session, self.get_random_headers, self.metrics,
+            timeout=extraction.get('timeout', 30),
+            retry_attempts=extraction.get('retry_attempts', 3),
+            max_body_bytes=int(extraction.get('max_body_size_mb', 10) * 1024 * 1024),
+            spill_bytes=int(extraction.get('spill_to_disk_mb', 2) * 1024 * 1024),
+            rate_limiter=RateLimiter(extraction.get('rate_limit', 0), parent=rate_limiter),
+            max_in_flight=max_connections,
+            proxy_pool=proxy_pool or ProxyPool.from_config(self.config.get('proxy_pool', {})),
+            adaptive_concurrency=extraction.get('adaptive_concurrency')
+        )
+        
+        # Skip re-parsing listing pages whose result list has not changed
+        fingerprinting = self.config.get('performance_optimization', {}).get('fingerprinting', {})
+        self.fingerprints = None
+        if fingerprinting.get('enabled', False):
+            self.fingerprints = FingerprintStore(
+                fingerprinting.get('store_file', 'data/fingerprints_job_scraper.json'),
+                Fingerprinter(
+                    region_pattern=fingerprinting.get('region_pattern'),
+                    key_pattern=fingerprinting.get('card_key_pattern') or LINK_PATTERN,
+                    max_distance=fingerprinting.get('max_distance', 3)
+                )
+            )
+        
+        # Crash-resume checkpoints, see enable_checkpoints()
+        self.checkpoint = None
+        self.resume = False
+        
+        # Built from the skills taxonomy on first use, see extract_skills()
+        self.skill_matcher = None
+        
+        # Open between dedupe_postings() and commit_postings()
+        self.posting_index = None
+        
         # User agents for rotation
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -53,11 +140,40 @@ class JobScraper:
             'User-Agent': random.choice(self.user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
     
+    def enable_checkpoints(self, resume=False):
+        """Checkpoint scraping progress to disk; with resume, continue from the last checkpoint"""
+        settings = self.config.get('checkpointing', {})
+        self.checkpoint = Checkpoint(
+            'job_scraper', settings.get('directory', 'data/checkpoints'),
+            every_records=settings.get('every_records', 50),
+            every_seconds=settings.get('every_seconds', 30)
+        )
+        self.resume = resume
+    
+    def _begin_checkpoint(self, run_key):
+        """Restore jobs from the last checkpoint of the same run; returns (position, state)"""
+        if self.checkpoint is None:
+            return 0, {}
+        records, position, state = self.checkpoint.begin(run_key, self.resume)
+        self.scraped_jobs.extend(records)
+        return position, state
+    
+    def _checkpoint_job(self, job, position):
+        if self.checkpoint is not None:
+            self.checkpoint.add(job)
+            self.checkpoint.update(position, self._checkpoint_state)
+    
+    def _checkpoint_state(self):
+        # Fingerprints are the scraper's seen state; the store saves itself atomically
+        if self.fingerprints is not None:
+            self.fingerprints.save()
+        return {}
+    
     def scrape_demo_jobs(self, keywords, location, max_results=100):
         """
         Demo function that generates realistic job data
@@ -65,41 +181,31 @@ class JobScraper:
         """
         print(f"🔍 Searching for jobs: {keywords} in {location}")
         
-        # Demo companies and job titles
-        companies = [
-            "TechCorp Inc", "DataSolutions LLC", "CloudTech Systems", 
-            "InnovateLabs", "DigitalFirst Group", "ScaleUp Technologies",
-            "NextGen Software", "AI Dynamics", "WebFlow Solutions"
-        ]
-        
-        job_titles = [
-            "Python Developer", "Full Stack Developer", "Data Analyst",
-            "Software Engineer", "Backend Developer", "DevOps Engineer",
-            "Machine Learning Engineer", "Web Developer", "API Developer"
-        ]
-        
-        locations = ["Remote", "New York, NY", "San Francisco, CA", "Austin, TX", 
-                    "Seattle, WA", "Chicago, IL", "Boston, MA", "Denver, CO"]
+        companies = self.DEMO_COMPANIES
+        job_titles = self.DEMO_TITLES
+        locations = self.DEMO_LOCATIONS
+        salary_ranges = self.DEMO_SALARY_RANGES
         
-        salary_ranges = [
-            "$60,000 - $80,000", "$70,000 - $90,000", "$80,000 - $100,000",
-            "$90,000 - $120,000", "$100,000 - $130,000", "$110,000 - $140,000"
-        ]
-        
-        for i in range(min(max_results, 50)):
-            job = {
-                'title': random.choice(job_titles),
-                'company': random.choice(companies),
-                'location': random.choice(locations),
-                'salary': random.choice(salary_ranges),
-                'description': f"Looking for experienced {random.choice(job_titles).lower()} with {random.randint(2,5)} years experience in {', '.join(random.sample(keywords, min(2, len(keywords))))}.",
-                'posted_date': datetime.now().strftime('%Y-%m-%d'),
-                'job_type': random.choice(['Full-time', 'Part-time', 'Contract', 'Remote']),
-                'experience_level': random.choice(['Entry', 'Mid', 'Senior', 'Lead']),
-                'scraped_at': datetime.now().isoformat()
-            }
+        total = min(max_results, 50)
+        start, _ = self._begin_checkpoint(['demo', keywords, location, total])
+        for i in range(start, total):
+            self.metrics.set_gauge('queue_depth', total - i, site='demo')
+            with self.metrics.time_stage('parse', site='demo'):
+                job = {
+                    'title': random.choice(job_titles),
+                    'company': random.choice(companies),
+                    'location': random.choice(locations),
+                    'salary': random.choice(salary_ranges),
+                    'description': f"Looking for experienced {random.choice(job_titles).lower()} with {random.randint(2,5)} years experience in {', '.join(random.sample(keywords, min(2, len(keywords))))}.",
+                    'posted_date': datetime.now().strftime('%Y-%m-%d'),
+                    'job_type': random.choice(['Full-time', 'Part-time', 'Contract', 'Remote']),
+                    'experience_level': random.choice(['Entry', 'Mid', 'Senior', 'Lead']),
+                    'scraped_at': datetime.now().isoformat()
+                }
             
             self.scraped_jobs.append(job)
+            self.metrics.record_records('demo')
+            self._checkpoint_job(job, i + 1)
             
             # Progress indicator
             if (i + 1) % 10 == 0:
@@ -108,9 +214,275 @@ class JobScraper:
             # Respectful rate limiting
             time.sleep(random.uniform(0.5, 1.5))
         
+        self.metrics.set_gauge('queue_depth', 0, site='demo')
+        if self.checkpoint is not None:
+            self.checkpoint.update(total, self._checkpoint_state, force=True)
         print(f"✅ Successfully scraped {len(self.scraped_jobs)} jobs")
         return self.scraped_jobs
     
+    def generate_synthetic_jobs(self, count, keywords, seed=None):
+        """
+        Generate count synthetic jobs in vectorized batches, without sleeps
+        For load-testing the stages after the fetch at production volumes
+        """
+        print(f"🧪 Generating {count:,} synthetic jobs (seed {seed})")
+        with self.metrics.time_stage('generate', site='synthetic'):
+            for batch in job_batches(count, self.DEMO_COMPANIES, self.DEMO_TITLES, self.DEMO_LOCATIONS,
+                                     self.DEMO_SALARY_RANGES, keywords, seed=seed):
+                self.scraped_jobs.extend(batch)
+                self.metrics.record_records('synthetic', len(batch))
+                print(f"📊 Generated {len(self.scraped_jobs):,} jobs...")
+        
+        print(f"✅ Successfully generated {len(self.scraped_jobs):,} jobs")
+        return self.scraped_jobs
+    
+    def scrape_listing_page(self, url, site=None):
+        """
+        Fetch a job listing page and extract its job cards
+        Returns the new jobs, or an empty list when the result list is unchanged;
+        raises requests.HTTPError when the page still has an error status after retries
+        """
+        site = site or self.fetcher.site_for(url)
+        with self.fetcher.fetch_body(url, site=site) as body:
+            body.response.raise_for_status()
+            jobs = self.parse_listing(body, site) or []
+        self.scraped_jobs.extend(jobs)
+        self.metrics.record_records(site, len(jobs))
+        return jobs
+    
+    def parse_listing(self, body, site=None):
+        """
+        Extract job cards from a fetched listing page's ResponseBody
+        Returns None when the page's result list is unchanged since the last run;
+        the caller decides whether the jobs are kept
+        """
+        url = body.url
+        site = site or self.fetcher.site_for(url)
+        if self.fingerprints is not None and not self.fingerprints.check(url, body.view):
+            self.metrics.increment('pages_unchanged_total', site=site)
+            return None
+        
+        selectors = {**self.DEFAULT_LISTING_SELECTORS,
+                     **self.config.get('extraction_settings', {}).get('listing_selectors', {})}
+        
+        def text_of(card, field):
+            element = card.select_one(selectors[field])
+            return element.get_text(' ', strip=True) if element else ''
+        
+        jobs = []
+        with self.metrics.time_stage('parse', site=site):
+            soup = BeautifulSoup(body.tobytes(), 'html.parser', from_encoding=body.declared_encoding)
+            for card in soup.select(selectors['job_card']):
+                title = text_of(card, 'title')
+                if not title:
+                    continue
+                jobs.append({
+                    'title': title,
+                    'company': text_of(card, 'company'),
+                    'location': text_of(card, 'location'),
+                    'salary': text_of(card, 'salary'),
+                    'description': text_of(card, 'description'),
+                    'posted_date': datetime.now().strftime('%Y-%m-%d'),
+                    'job_type': text_of(card, 'job_type'),
+                    'experience_level': '',
+                    'source_url': url,
+                    'scraped_at': datetime.now().isoformat()
+                })
+        return jobs
+    
+    def scrape_paginated(self, url, max_pages=None, site=None):
+        """
+        Scrape consecutive result pages starting at a listing URL
+        Next pages are prefetched while the current page is parsed
+        """
+        pagination = self.config.get('pagination', {})
+        site = site or self.fetcher.site_for(url)
+        jobs = []
+        
+        pages = self.fetcher.paginate(
+            url, lambda body: self.parse_listing(body, site),
+            max_pages=max_pages or pagination.get('max_pages', 10),
+            prefetch=pagination.get('prefetch_pages', 3),
+            page_size=self.config.get('extraction_settings', {}).get('results_per_page', 10),
+            item_key=lambda job: (job['title'], job['company'], job['location']),
+            site=site
+        )
+        for page_url, page_jobs in pages:
+            jobs.extend(page_jobs)
+        # Only pages pagination kept count; a repeated or empty last page is dropped
+        self.scraped_jobs.extend(jobs)
+        self.metrics.record_records(site, len(jobs))
+        
+        print(f"📄 {len(jobs)} jobs from paginated results at {site}")
+        return jobs
+    
+    def build_search_url(self, fetch):
+        """Build the search URL for a planned fetch from the site's URL template"""
+        host = urlparse(fetch.site).hostname or fetch.site
+        templates = self.config.get('search_url_templates', {})
+        template = templates.get(host, templates.get('default', '{site}/search?q={query}&l={location}&page={page}'))
+        return template.format(
+            site=fetch.site.rstrip('/'),
+            query=quote_plus(fetch.keywords),
+            location=quote_plus(fetch.location),
+            page=fetch.page + 1,
+            offset=fetch.page * self.config.get('extraction_settings', {}).get('results_per_page', 10)
+        )
+    
+    def plan_search_grid(self, keywords=None, locations=None, experience_levels=None, pages_per_query=None):
+        """Plan the keyword x location x experience grid across all active sites"""
+        search = self.config.get('search_parameters', {})
+        planning = self.config.get('query_planning', {})
+        planner = QueryPlanner(
+            self.site_manager.active_sites,
+            max_requests_per_site=planning.get('max_requests_per_site'),
+            pages_per_query=pages_per_query or planning.get('pages_per_query', 1),
+            subsume_narrower=planning.get('subsume_narrower', False)
+        )
+        return planner.plan(
+            keywords or search.get('default_keywords', []),
+            locations or search.get('default_locations', []),
+            experience_levels if experience_levels is not None else search.get('experience_levels')
+        )
+    
+    def run_search_grid(self, keywords=None, locations=None, experience_levels=None, pages_per_query=None):
+        """Execute a planned search grid; returns {query label: matching jobs}"""
+        plan = self.plan_search_grid(keywords, locations, experience_levels, pages_per_query)
+        summary = plan.summary()
+        print(f"🧭 {summary['queries']} queries planned as {summary['planned_requests']} requests "
+              f"(naive grid: {summary['naive_requests']})")
+        
+        # Each successful fetch is a checkpoint position; its jobs are a slice of the record log.
+        # Progress stops at the first failed fetch, so a resumed run fetches it again
+        base = len(self.scraped_jobs)
+        position, state = self._begin_checkpoint(['grid', [repr(fetch) for fetch in plan.fetches]])
+        pages = state.get('pages', [])[:position]
+        fetch_index = iter(range(len(plan.fetches)))
+        failed = []
+        
+        def checkpoint_state():
+            self._checkpoint_state()
+            return {'pages': pages[:self.checkpoint.position]}
+        
+        def fetch_page(fetch):
+            index = next(fetch_index)
+            if index < position:
+                start, end = pages[index]
+                return self.scraped_jobs[base + start:base + end]
+            
+            url = self.build_search_url(fetch)
+            start = len(self.scraped_jobs)
+            try:
+                self.scrape_listing_page(url)
+            except Exception as e:
+                print(f"⚠️  Search failed for {url}: {e}")
+                failed.append(index)
+            jobs = self.scraped_jobs[start:]
+            
+            pages.append([start - base, len(self.scraped_jobs) - base])
+            if self.checkpoint is not None and not failed:
+                for job in jobs:
+                    self.checkpoint.add(job)
+                self.checkpoint.update(index + 1, checkpoint_state)
+            return jobs
+        
+        results = plan.execute(fetch_page)
+        if self.checkpoint is not None:
+            self.checkpoint.update(failed[0] if failed else len(plan.fetches), checkpoint_state, force=True)
+        if failed:
+            print(f"⚠️  {len(failed)} of {len(plan.fetches)} searches failed")
+        print(f"✅ Grid complete: {len(self.scraped_jobs)} jobs across {len(results)} queries")
+        return results
+    
+    def dedupe_postings(self, store_file=None):
+        """
+        Merge cross-board duplicates and keep only postings new or changed since earlier runs
+        Seen postings are tracked in a persistent index, see posting_index.PostingIndex;
+        it is only updated by commit_postings() once the postings are exported.
+        store_file overrides the configured index, e.g. ":memory:" for synthetic runs
+        """
+        settings = self.config.get('posting_index', {})
+        if not self.scraped_jobs or not settings.get('enabled', False):
+            return
+        
+        self.posting_index = PostingIndex(store_file or settings.get('store_file', 'data/posting_index.sqlite'))
+        with self.metrics.time_stage('dedupe'):
+            self.scraped_jobs, counts = self.posting_index.ingest(self.scraped_jobs,
+                                                                  settings.get('emit_unchanged', False))
+        
+        for status in ('new', 'changed', 'unchanged', 'merged'):
+            self.metrics.increment('postings_total', counts[status], status=status)
+        print(f"🆕 {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged postings; "
+              f"{counts['merged']} duplicate listings merged")
+    
+    def commit_postings(self):
+        """Mark this run's postings as seen in the posting index; call after a successful export"""
+        if self.posting_index is None:
+            return
+        with self.metrics.time_stage('dedupe'):
+            self.posting_index.commit()
+        print(f"🗂️  Posting index updated: {len(self.posting_index)} postings indexed")
+        self.posting_index.close()
+        self.posting_index = None
+    
+    def normalize_salaries(self):
+        """Add numeric salary_min, salary_max, salary_currency and salary_period to every job"""
+        if not self.scraped_jobs or not self.config.get('data_processing', {}).get('extract_salary_ranges', False):
+            return
+        
+        with self.metrics.time_stage('normalize'):
+            parsed = parse_salaries([job.get('salary') for job in self.scraped_jobs])
+            parsed = parsed.astype(object).where(parsed.notna(), None)
+            for job, values in zip(self.scraped_jobs, parsed.itertuples(index=False)):
+                job.update(zip(SALARY_COLUMNS, values))
+        
+        found = int(parsed['salary_min'].notna().sum())
+        print(f"💵 Parsed salaries for {found}/{len(self.scraped_jobs)} jobs")
+    
+    def extract_skills(self):
+        """Tag every job with the taxonomy skills named in its title and description"""
+        processing = self.config.get('data_processing', {})
+        if not self.scraped_jobs or not processing.get('categorize_skills', False):
+            return
+        
+        if self.skill_matcher is None:
+            taxonomy = processing.get('skills_taxonomy', 'config/skills_taxonomy.json')
+            if not os.path.exists(taxonomy):
+                print(f"⚠️  Skills taxonomy {taxonomy} not found, skipping skill extraction")
+                return
+            self.skill_matcher = SkillMatcher.from_file(taxonomy)
+        
+        tagged = 0
+        with self.metrics.time_stage('normalize'):
+            for job in self.scraped_jobs:
+                skills = self.skill_matcher.find(f"{job.get('title') or ''}\n{job.get('description') or ''}")
+                job['skills'] = ', '.join(skills)
+                tagged += bool(skills)
+        
+        print(f"🧠 Tagged skills on {tagged}/{len(self.scraped_jobs)} jobs "
+              f"({self.skill_matcher.pattern_count} skill patterns)")
+    
+    def skill_counts(self):
+        """Number of jobs mentioning each tagged skill"""
+        return Counter(
+            skill for job in self.scraped_jobs
+            for skill in (job.get('skills') or '').split(', ') if skill
+        )
+    
+    def geocode_locations(self):
+        """Place every job's location with the offline gazetteer, each distinct location once"""
+        if not self.scraped_jobs or not self.config.get('data_processing', {}).get('geocode_locations', False):
+            return
+        
+        geocoder = Geocoder.from_config(self.config.get('geocoding', {}))
+        if geocoder is None:
+            return
+        with self.metrics.time_stage('normalize'):
+            placed = geocoder.geocode_records(self.scraped_jobs)
+        geocoder.close()
+        print(f"🌍 Geocoded {placed}/{len(self.scraped_jobs)} jobs "
+              f"({sum(geocoder.lookups.values())} distinct locations, {geocoder.lookups['gazetteer']} new)")
+    
     def export_data(self, output_format='csv', filename=None):
         """Export scraped data to specified format"""
         if not self.scraped_jobs:
@@ -121,22 +493,65 @@ class JobScraper:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"data/scraped_jobs_{timestamp}"
         
-        df = pd.DataFrame(self.scraped_jobs)
+        # Excel and JSON Lines rows are streamed from the records; no DataFrame is built for them
+        if output_format.lower() not in ('excel', 'jsonl'):
+            with self.metrics.time_stage('record_build'):
+                df = pd.DataFrame(self.scraped_jobs)
         
-        if output_format.lower() == 'csv':
-            output_file = f"{filename}.csv"
-            df.to_csv(output_file, index=False)
-        elif output_format.lower() == 'json':
-            output_file = f"{filename}.json"
-            df.to_json(output_file, orient='records', indent=2)
-        elif output_format.lower() == 'excel':
-            output_file = f"{filename}.xlsx"
-            df.to_excel(output_file, index=False)
+        with self.metrics.time_stage('export'):
+            if output_format.lower() == 'csv':
+                output_file = f"{filename}.csv"
+                df.to_csv(output_file, index=False)
+            elif output_format.lower() == 'json':
+                output_file = f"{filename}.json"
+                df.to_json(output_file, orient='records', indent=2)
+            elif output_format.lower() == 'jsonl':
+                output_settings = self.config.get('output_settings', {})
+                compression = output_settings.get('jsonl_compression') or (
+                    'gzip' if output_settings.get('compress_output') else None)
+                output_file = jsonl_path(filename, compression)
+                write_jsonl(self.scraped_jobs, output_file, compression)
+            elif output_format.lower() == 'excel':
+                output_file = f"{filename}.xlsx"
+                summary_sheet = self.config.get('output_settings', {}).get('summary_sheet', True)
+                write_excel(self.scraped_jobs, output_file,
+                            summary=self.report_summary() if summary_sheet else None)
         
         print(f"💾 Data exported to: {output_file}")
         print(f"📊 Total records: {len(self.scraped_jobs)}")
         return output_file
     
+    def load_data(self, path):
+        """Append jobs from a previous JSON Lines export, streamed record by record"""
+        before = len(self.scraped_jobs)
+        self.scraped_jobs.extend(read_jsonl(path))
+        print(f"📂 Loaded {len(self.scraped_jobs) - before} jobs from {path}")
+        return self.scraped_jobs
+    
+    def report_summary(self):
+        """Report aggregates as (metric, value) rows for the Excel summary sheet"""
+        companies = Counter(job.get('company') for job in self.scraped_jobs)
+        locations = Counter(job.get('location') for job in self.scraped_jobs)
+        rows = [
+            ('Total jobs scraped', len(self.scraped_jobs)),
+            ('Unique companies', len(companies)),
+            ('Locations covered', len(locations)),
+            ('Job types', ', '.join(sorted({str(job.get('job_type', '')) for job in self.scraped_jobs}))),
+            ('Experience levels', ', '.join(sorted({str(job.get('experience_level', '')) for job in self.scraped_jobs})))
+        ]
+        if self.scraped_jobs and 'salary_min' in self.scraped_jobs[0]:
+            annual = annual_salary(pd.DataFrame(self.scraped_jobs, columns=SALARY_COLUMNS))
+            if annual.notna().any():
+                rows += [(f"Annual salary {label}", round(annual.quantile(q))) for label, q in
+                         (('p25', 0.25), ('median', 0.5), ('p75', 0.75))]
+        rows += [(f"Top company: {name}", count) for name, count in companies.most_common(5)]
+        rows += [(f"Top skill: {name}", count) for name, count in self.skill_counts().most_common(10)]
+        if self.scraped_jobs and 'remote' in self.scraped_jobs[0]:
+            regions = Counter(place_label(job) for job in self.scraped_jobs)
+            rows += [(f"Top region: {name}", count) for name, count in regions.most_common(5)]
+        rows += [(f"Top location: {name}", count) for name, count in locations.most_common(5)]
+        return rows
+    
     def generate_report(self):
         """Generate scraping summary report"""
         if not self.scraped_jobs:
@@ -156,6 +571,27 @@ class JobScraper:
         print(df['company'].value_counts().head().to_string())
         print("\n📍 Top 5 Locations:")
         print(df['location'].value_counts().head().to_string())
+        if self.scraped_jobs and 'remote' in self.scraped_jobs[0]:
+            print("\n🌍 Top 10 Regions:")
+            print(pd.Series([place_label(job) for job in self.scraped_jobs]).value_counts().head(10).to_string())
+        skills = self.skill_counts()
+        if self.config.get('reporting', {}).get('skill_demand_analysis', False) and skills:
+            print("\n🧠 Top 10 Skills:")
+            for skill, count in skills.most_common(10):
+                print(f"{skill:<30} {count:>6}  ({count / len(self.scraped_jobs):.0%} of jobs)")
+            if self.skill_matcher is not None:
+                categories = Counter()
+                for skill, count in skills.items():
+                    categories[self.skill_matcher.categories.get(skill, 'Other')] += count
+                print("\n🗂️  Skill Mentions by Category:")
+                for category, count in categories.most_common():
+                    print(f"{category:<30} {count:>6}")
+        if self.config.get('reporting', {}).get('salary_analysis', False) and 'salary_min' in df:
+            for column, label in (('title', 'Title'), ('location', 'Location'), ('experience_level', 'Experience Level')):
+                table = salary_percentiles(df, column)
+                if not table.empty:
+                    print(f"\n💵 Annual Salary by {label} (top 10):")
+                    print(table.head(10).to_string())
         print("="*50)
 
 def main():
@@ -167,24 +603,81 @@ def main():
                        help='Job location to search')
     parser.add_argument('--max-results', type=int, default=50, 
                        help='Maximum number of results to scrape')
-    parser.add_argument('--output', choices=['csv', 'json', 'excel'], default='csv',
+    parser.add_argument('--output', choices=['csv', 'json', 'jsonl', 'excel'], default='csv',
                        help='Output format')
     parser.add_argument('--config', default='config/job_scraper_config.json',
                        help='Configuration file path')
+    parser.add_argument('--grid', action='store_true',
+                       help='Search the configured keyword x location x experience grid on all active sites')
+    parser.add_argument('--plan-only', action='store_true',
+                       help='With --grid, print the query plan without fetching')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its last checkpoint')
+    parser.add_argument('--load',
+                       help='Re-export and re-report records from a previous .jsonl export instead of scraping')
+    parser.add_argument('--synthetic', type=int, metavar='COUNT',
+                       help='Generate COUNT synthetic records in vectorized batches to load-test the stages after the fetch')
+    parser.add_argument('--seed', type=int,
+                       help='Random seed for --synthetic, for reproducible benchmarks')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port while running')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile each stage and write flame-graph output to data/')
     
     args = parser.parse_args()
     
+    profiler = Profiler('job_scraper') if args.profile else None
+    if profiler:
+        profiler.start()
+    
     # Initialize scraper
     scraper = JobScraper(args.config)
+    if args.resume or scraper.config.get('checkpointing', {}).get('enabled', False):
+        scraper.enable_checkpoints(args.resume)
+    metrics_port = args.metrics_port or scraper.config.get('monitoring', {}).get('metrics_port')
+    if metrics_port:
+        scraper.metrics.start_server(metrics_port)
     
-    # Scrape jobs
-    scraper.scrape_demo_jobs(args.keywords, args.location, args.max_results)
-    
-    # Export data
-    scraper.export_data(args.output)
-    
-    # Generate report
-    scraper.generate_report()
+    try:
+        # Scrape jobs
+        if args.grid and args.plan_only:
+            print(json.dumps(scraper.plan_search_grid().summary(), indent=2))
+            return
+        elif args.load:
+            scraper.load_data(args.load)
+        elif args.synthetic:
+            scraper.generate_synthetic_jobs(args.synthetic, args.keywords, args.seed)
+        elif args.grid:
+            scraper.run_search_grid()
+        else:
+            scraper.scrape_demo_jobs(args.keywords, args.location, args.max_results)
+        
+        # Drop already-seen postings, normalize and export data. Synthetic
+        # postings go through a throwaway index: a rerun with the same seed
+        # should load-test the full volume again, not find it all seen
+        scraper.dedupe_postings(':memory:' if args.synthetic else None)
+        scraper.normalize_salaries()
+        scraper.extract_skills()
+        scraper.geocode_locations()
+        scraper.export_data(args.output)
+        scraper.commit_postings()
+        if scraper.fingerprints is not None:
+            scraper.fingerprints.save()
+        if scraper.checkpoint is not None:
+            scraper.checkpoint.finish()
+        
+        # Generate report
+        with scraper.metrics.time_stage('report'):
+            scraper.generate_report()
+    finally:
+        # Persist performance metrics, also after a --plan-only run
+        if scraper.config.get('monitoring', {}).get('track_performance'):
+            scraper.metrics.write_snapshot()
+        scraper.metrics.stop_server()
+        
+        if profiler:
+            profiler.stop()
+            profiler.write()
     
     print("\n🎉 Job scraping completed successfully!")
 
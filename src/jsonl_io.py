@@ -0,0 +1,172 @@
+import gzip
+import io
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+DECODE_ERRORS = (ValueError,) + ((msgspec.DecodeError,) if msgspec is not None else ())
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+if orjson is not None:
+    def dumps_line(record):
+        """Serialize one record as a JSON line (bytes, newline included)"""
+        return orjson.dumps(record, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+
+    loads_line = orjson.loads
+elif msgspec is not None:
+    _encoder = msgspec.json.Encoder(enc_hook=str)
+    _decoder = msgspec.json.Decoder()
+
+    def dumps_line(record):
+        """Serialize one record as a JSON line (bytes, newline included)"""
+        return _encoder.encode(record) + b'\n'
+
+    loads_line = _decoder.decode
+else:
+    def dumps_line(record):
+        """Serialize one record as a JSON line (bytes, newline included)"""
+        return json.dumps(record, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    loads_line = json.loads
+
+
+def jsonl_path(filename, compression=None):
+    """File name for a JSON Lines export with the given compression"""
+    return f"{filename}.jsonl{COMPRESSION_SUFFIXES.get(compression, '')}"
+
+
+def _compression_for(path):
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return compression
+    return None
+
+
+class JsonLinesWriter:
+    """Append records to a (optionally gzip or zstd compressed) JSON Lines file as they are produced"""
+
+    def __init__(self, path, compression=None, append=False):
+        """
+        Open path for writing
+
+        compression defaults to the one implied by the file suffix (.gz, .zst).
+        With append, new records are added after the existing ones; compressed
+        files gain a new gzip member or zstd frame, which readers handle.
+        """
+        compression = compression or _compression_for(path)
+        if compression == 'zstd' and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.records_written = 0
+        mode = 'ab' if append else 'wb'
+        self._raw = open(path, mode)
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode=mode)
+        elif compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def write(self, record):
+        """Write one record"""
+        self._stream.write(dumps_line(record))
+        self.records_written += 1
+
+    def write_many(self, records):
+        """Write an iterable of records; returns how many were written"""
+        before = self.records_written
+        for record in records:
+            self.write(record)
+        return self.records_written - before
+
+    def flush(self, sync=False):
+        """Push buffered records to the operating system, and with sync to disk"""
+        if self._stream is not self._raw:
+            self._stream.flush()
+        self._raw.flush()
+        if sync:
+            os.fsync(self._raw.fileno())
+
+    def tell(self):
+        """Bytes written to the underlying file so far"""
+        return self._raw.tell()
+
+    def close(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_jsonl(path):
+    """
+    Yield records from a JSON Lines file one at a time
+
+    gzip and zstd files are recognised by their magic bytes and decompressed
+    as they are read. A truncated last line, e.g. from a crashed run, is skipped.
+    """
+    raw = open(path, 'rb')
+    magic = raw.read(4)
+    raw.seek(0)
+
+    if magic.startswith(_GZIP_MAGIC):
+        stream = gzip.GzipFile(fileobj=raw)
+    elif magic == _ZSTD_MAGIC:
+        if zstandard is None:
+            raw.close()
+            raise ImportError("Reading zstd files requires the zstandard package")
+        stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True))
+    else:
+        stream = raw
+
+    try:
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield loads_line(line)
+            except DECODE_ERRORS:
+                if line.endswith(b'\n'):
+                    raise
+    except EOFError:
+        # Compressed stream cut off mid-member; everything before it was yielded
+        pass
+    finally:
+        stream.close()
+        if stream is not raw:
+            raw.close()
+
+
+def write_jsonl(records, path, compression=None):
+    """Write an iterable of records to path; returns the number written"""
+    with JsonLinesWriter(path, compression) as writer:
+        return writer.write_many(records)
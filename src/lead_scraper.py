@@ -7,16 +7,89 @@ import random
 import argparse
 from datetime import datetime
 import os
+from collections import Counter
 import re
+from metrics import MetricsCollector
+from fetcher import ACCEPT_ENCODING, Fetcher, RateLimiter
+from proxies import ProxyPool
+from profiling import Profiler
+from excel_export import write_excel
+from checkpoint import Checkpoint
+from synthetic import lead_batches
+from jsonl_io import jsonl_path, read_jsonl, write_jsonl
+from geocoding import Geocoder, place_label
+from crm_export import CRMExporter
 
 class LeadScraper:
     """Professional lead generation toolkit for B2B sales and marketing"""
     
-    def __init__(self, config_file='config/lead_scraper_config.json'):
+    # Demo and synthetic data vocabularies: companies by industry
+    DEMO_COMPANIES = {
+        "technology": [
+            "TechFlow Solutions", "DataDrive Inc", "CloudSync Systems", 
+            "InnovateTech Labs", "DigitalForward Group", "NextGen Software",
+            "AI Dynamics Corp", "WebScale Technologies", "CodeCraft Solutions"
+        ],
+        "healthcare": [
+            "MedTech Solutions", "HealthCare Innovations", "BioData Systems",
+            "MedFlow Technologies", "HealthSync Solutions", "CareConnect Inc",
+            "MedAnalytics Corp", "HealthTech Partners", "BioInnovate Labs"
+        ],
+        "finance": [
+            "FinTech Solutions", "Capital Analytics", "InvestTech Systems",
+            "MoneyFlow Technologies", "FinanceSync Solutions", "WealthTech Inc",
+            "TradingEdge Corp", "FinanceForward Group", "CryptoTech Labs"
+        ]
+    }
+    
+    # Contact titles and names
+    DEMO_TITLES = [
+        "CEO", "CTO", "VP of Sales", "Marketing Director", "Head of Growth",
+        "VP of Engineering", "Sales Manager", "Business Development Manager",
+        "Chief Marketing Officer", "Head of Operations", "VP of Product"
+    ]
+    DEMO_FIRST_NAMES = ["John", "Sarah", "Michael", "Emily", "David", "Jessica", "Robert", "Amanda"]
+    DEMO_LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"]
+    
+    # Locations by market
+    DEMO_LOCATIONS = {
+        "usa": ["New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA"],
+        "canada": ["Toronto, ON", "Vancouver, BC", "Montreal, QC", "Calgary, AB"],
+        "uk": ["London", "Manchester", "Birmingham", "Edinburgh"]
+    }
+    
+    DEMO_COMPANY_SIZES = {
+        "startup": "1-10 employees",
+        "small": "11-50 employees", 
+        "medium": "51-200 employees",
+        "large": "200+ employees"
+    }
+    
+    def __init__(self, config_file='config/lead_scraper_config.json', session=None, metrics=None,
+                 rate_limiter=None, max_connections=None, proxy_pool=None):
         """Initialize lead scraper with configuration"""
         self.config = self.load_config(config_file)
         self.leads = []
-        self.session = requests.Session()
+        self.session = session or requests.Session()
+        
+        # Performance metrics and shared fetch layer
+        extraction = self.config.get('data_extraction', {})
+        self.metrics = metrics or MetricsCollector('lead_scraper')
+        self.fetcher = Fetcher(
+            self.session, self.get_random_headers, self.metrics,
+            timeout=extraction.get('timeout', 30),
+            retry_attempts=extraction.get('retry_attempts', 3),
+            max_body_bytes=int(extraction.get('max_body_size_mb', 10) * 1024 * 1024),
+            spill_bytes=int(extraction.get('spill_to_disk_mb', 2) * 1024 * 1024),
+            rate_limiter=RateLimiter(extraction.get('rate_limit', 0), parent=rate_limiter),
+            max_in_flight=max_connections,
+            proxy_pool=proxy_pool or ProxyPool.from_config(self.config.get('proxy_pool', {})),
+            adaptive_concurrency=extraction.get('adaptive_concurrency')
+        )
+        
+        # Crash-resume checkpoints, see enable_checkpoints()
+        self.checkpoint = None
+        self.resume = False
         
         # User agents for rotation
         self.user_agents = [
@@ -49,7 +122,7 @@ class LeadScraper:
             'User-Agent': random.choice(self.user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
@@ -59,6 +132,24 @@ class LeadScraper:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
     
+    def enable_checkpoints(self, resume=False):
+        """Checkpoint lead generation progress to disk; with resume, continue from the last checkpoint"""
+        settings = self.config.get('checkpointing', {})
+        self.checkpoint = Checkpoint(
+            'lead_scraper', settings.get('directory', 'data/checkpoints'),
+            every_records=settings.get('every_records', 50),
+            every_seconds=settings.get('every_seconds', 30)
+        )
+        self.resume = resume
+    
+    def _begin_checkpoint(self, run_key):
+        """Restore leads from the last checkpoint of the same run; returns the position to continue from"""
+        if self.checkpoint is None:
+            return 0
+        records, position, _ = self.checkpoint.begin(run_key, self.resume)
+        self.leads.extend(records)
+        return position
+    
     def generate_demo_leads(self, industry, location, max_results=100):
         """
         Generate demo lead data for portfolio demonstration
@@ -66,81 +157,51 @@ class LeadScraper:
         """
         print(f"🔍 Generating leads for {industry} industry in {location}")
         
-        # Demo companies by industry
-        companies_by_industry = {
-            "technology": [
-                "TechFlow Solutions", "DataDrive Inc", "CloudSync Systems", 
-                "InnovateTech Labs", "DigitalForward Group", "NextGen Software",
-                "AI Dynamics Corp", "WebScale Technologies", "CodeCraft Solutions"
-            ],
-            "healthcare": [
-                "MedTech Solutions", "HealthCare Innovations", "BioData Systems",
-                "MedFlow Technologies", "HealthSync Solutions", "CareConnect Inc",
-                "MedAnalytics Corp", "HealthTech Partners", "BioInnovate Labs"
-            ],
-            "finance": [
-                "FinTech Solutions", "Capital Analytics", "InvestTech Systems",
-                "MoneyFlow Technologies", "FinanceSync Solutions", "WealthTech Inc",
-                "TradingEdge Corp", "FinanceForward Group", "CryptoTech Labs"
-            ]
-        }
-        
-        # Demo contact titles
-        titles = [
-            "CEO", "CTO", "VP of Sales", "Marketing Director", "Head of Growth",
-            "VP of Engineering", "Sales Manager", "Business Development Manager",
-            "Chief Marketing Officer", "Head of Operations", "VP of Product"
-        ]
-        
-        # Demo locations
-        locations_data = {
-            "usa": ["New York, NY", "San Francisco, CA", "Austin, TX", "Seattle, WA"],
-            "canada": ["Toronto, ON", "Vancouver, BC", "Montreal, QC", "Calgary, AB"],
-            "uk": ["London", "Manchester", "Birmingham", "Edinburgh"]
-        }
-        
-        company_sizes = {
-            "startup": "1-10 employees",
-            "small": "11-50 employees", 
-            "medium": "51-200 employees",
-            "large": "200+ employees"
-        }
-        
-        companies = companies_by_industry.get(industry, companies_by_industry["technology"])
-        location_list = locations_data.get(location, locations_data["usa"])
+        companies = self.DEMO_COMPANIES.get(industry, self.DEMO_COMPANIES["technology"])
+        location_list = self.DEMO_LOCATIONS.get(location, self.DEMO_LOCATIONS["usa"])
+        titles = self.DEMO_TITLES
+        company_sizes = self.DEMO_COMPANY_SIZES
         
-        for i in range(min(max_results, 100)):
-            company = random.choice(companies)
-            first_name = random.choice(["John", "Sarah", "Michael", "Emily", "David", "Jessica", "Robert", "Amanda"])
-            last_name = random.choice(["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis"])
+        total = min(max_results, 100)
+        start = self._begin_checkpoint(['demo', industry, location, total])
+        for i in range(start, total):
+            self.metrics.set_gauge('queue_depth', total - i, site='demo')
+            with self.metrics.time_stage('parse', site='demo'):
+                company = random.choice(companies)
+                first_name = random.choice(self.DEMO_FIRST_NAMES)
+                last_name = random.choice(self.DEMO_LAST_NAMES)
             
-            # Generate realistic business email
-            domain = company.lower().replace(" ", "").replace("inc", "").replace("corp", "").replace("ltd", "")
-            email = f"{first_name.lower()}.{last_name.lower()}@{domain}.com"
+                # Generate realistic business email
+                domain = company.lower().replace(" ", "").replace("inc", "").replace("corp", "").replace("ltd", "")
+                email = f"{first_name.lower()}.{last_name.lower()}@{domain}.com"
             
-            # Generate phone number
-            phone = f"+1-{random.randint(200,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}"
+                # Generate phone number
+                phone = f"+1-{random.randint(200,999)}-{random.randint(100,999)}-{random.randint(1000,9999)}"
             
-            lead = {
-                'company_name': company,
-                'contact_name': f"{first_name} {last_name}",
-                'title': random.choice(titles),
-                'email': email,
-                'phone': phone,
-                'industry': industry,
-                'location': random.choice(location_list),
-                'company_size': random.choice(list(company_sizes.keys())),
-                'employees': company_sizes[random.choice(list(company_sizes.keys()))],
-                'website': f"https://www.{domain}.com",
-                'linkedin_company': f"https://linkedin.com/company/{domain}",
-                'linkedin_profile': f"https://linkedin.com/in/{first_name.lower()}-{last_name.lower()}",
-                'lead_score': random.randint(1, 100),
-                'contact_verified': random.choice([True, False]),
-                'email_valid': self.validate_email(email),
-                'scraped_at': datetime.now().isoformat()
-            }
+                lead = {
+                    'company_name': company,
+                    'contact_name': f"{first_name} {last_name}",
+                    'title': random.choice(titles),
+                    'email': email,
+                    'phone': phone,
+                    'industry': industry,
+                    'location': random.choice(location_list),
+                    'company_size': random.choice(list(company_sizes.keys())),
+                    'employees': company_sizes[random.choice(list(company_sizes.keys()))],
+                    'website': f"https://www.{domain}.com",
+                    'linkedin_company': f"https://linkedin.com/company/{domain}",
+                    'linkedin_profile': f"https://linkedin.com/in/{first_name.lower()}-{last_name.lower()}",
+                    'lead_score': random.randint(1, 100),
+                    'contact_verified': random.choice([True, False]),
+                    'email_valid': self.validate_email(email),
+                    'scraped_at': datetime.now().isoformat()
+                }
             
             self.leads.append(lead)
+            self.metrics.record_records('demo')
+            if self.checkpoint is not None:
+                self.checkpoint.add(lead)
+                self.checkpoint.update(i + 1)
             
             # Progress indicator
             if (i + 1) % 20 == 0:
@@ -149,9 +210,33 @@ class LeadScraper:
             # Respectful rate limiting
             time.sleep(random.uniform(0.1, 0.5))
         
+        self.metrics.set_gauge('queue_depth', 0, site='demo')
+        if self.checkpoint is not None:
+            self.checkpoint.update(total, force=True)
         print(f"✅ Successfully generated {len(self.leads)} leads")
         return self.leads
     
+    def generate_synthetic_leads(self, count, industry, location, seed=None):
+        """
+        Generate count synthetic leads in vectorized batches, without sleeps
+        For load-testing the stages after the fetch at production volumes
+        """
+        print(f"🧪 Generating {count:,} synthetic {industry} leads in {location} (seed {seed})")
+        with self.metrics.time_stage('generate', site='synthetic'):
+            for batch in lead_batches(
+                    count,
+                    self.DEMO_COMPANIES.get(industry, self.DEMO_COMPANIES["technology"]),
+                    self.DEMO_TITLES,
+                    self.DEMO_LOCATIONS.get(location, self.DEMO_LOCATIONS["usa"]),
+                    self.DEMO_COMPANY_SIZES, self.DEMO_FIRST_NAMES, self.DEMO_LAST_NAMES, industry,
+                    validate_email=self.validate_email, seed=seed):
+                self.leads.extend(batch)
+                self.metrics.record_records('synthetic', len(batch))
+                print(f"📊 Generated {len(self.leads):,} leads...")
+        
+        print(f"✅ Successfully generated {len(self.leads):,} leads")
+        return self.leads
+    
     def qualify_leads(self, min_score=70):
         """Filter leads based on qualification criteria"""
         qualified = [lead for lead in self.leads if lead['lead_score'] >= min_score]
@@ -171,22 +256,104 @@ class LeadScraper:
             suffix = "_qualified" if qualified_only else ""
             filename = f"data/leads_{timestamp}{suffix}"
         
-        df = pd.DataFrame(data_to_export)
+        # Excel and JSON Lines rows are streamed from the records; no DataFrame is built for them
+        if output_format.lower() not in ('excel', 'jsonl'):
+            with self.metrics.time_stage('record_build'):
+                df = pd.DataFrame(data_to_export)
         
-        if output_format.lower() == 'csv':
-            output_file = f"{filename}.csv"
-            df.to_csv(output_file, index=False)
-        elif output_format.lower() == 'json':
-            output_file = f"{filename}.json"
-            df.to_json(output_file, orient='records', indent=2)
-        elif output_format.lower() == 'excel':
-            output_file = f"{filename}.xlsx"
-            df.to_excel(output_file, index=False)
+        with self.metrics.time_stage('export'):
+            if output_format.lower() == 'csv':
+                output_file = f"{filename}.csv"
+                df.to_csv(output_file, index=False)
+            elif output_format.lower() == 'json':
+                output_file = f"{filename}.json"
+                df.to_json(output_file, orient='records', indent=2)
+            elif output_format.lower() == 'jsonl':
+                output_settings = self.config.get('output_settings', {})
+                compression = output_settings.get('jsonl_compression') or (
+                    'gzip' if output_settings.get('compress_output') else None)
+                output_file = jsonl_path(filename, compression)
+                write_jsonl(data_to_export, output_file, compression)
+            elif output_format.lower() == 'excel':
+                output_file = f"{filename}.xlsx"
+                summary_sheet = self.config.get('output_settings', {}).get('summary_sheet', True)
+                write_excel(data_to_export, output_file,
+                            summary=self.report_summary() if summary_sheet else None)
         
         print(f"💾 Lead data exported to: {output_file}")
         print(f"📊 Total records: {len(data_to_export)}")
         return output_file
     
+    def export_crm(self, crm, upload=True, base_url=None, resume=True):
+        """
+        Export qualified leads to a CRM
+
+        With upload, leads are pushed to the CRM's bulk API in parallel batches
+        with resumable progress (see CRMExporter); otherwise they are written
+        to a CSV in the CRM's import column names.
+        """
+        settings = self.config.get('crm_integration', {})
+        exporter = CRMExporter.from_config(crm, settings, base_url, metrics=self.metrics)
+        if exporter is None:
+            print(f"❌ CRM export to {crm} is not enabled (crm_integration.{crm}_ready)")
+            return None
+        
+        leads = self.qualify_leads(settings.get('min_score', 70)) if settings.get('qualified_only', True) else self.leads
+        if not leads:
+            print("❌ No lead data to export")
+            return None
+        
+        if not upload:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            with self.metrics.time_stage('export'):
+                return exporter.write_import_file(leads, f"data/leads_{crm}_import_{timestamp}.csv")
+        with self.metrics.time_stage('crm_upload', site=crm):
+            return exporter.upload(leads, resume)
+    
+    def load_data(self, path):
+        """Append leads from a previous JSON Lines export, streamed record by record"""
+        before = len(self.leads)
+        self.leads.extend(read_jsonl(path))
+        print(f"📂 Loaded {len(self.leads) - before} leads from {path}")
+        return self.leads
+    
+    def geocode_locations(self):
+        """Place every lead's location with the offline gazetteer, each distinct location once"""
+        if not self.leads or not self.config.get('data_processing', {}).get('geocode_locations', False):
+            return
+        
+        geocoder = Geocoder.from_config(self.config.get('geocoding', {}))
+        if geocoder is None:
+            return
+        with self.metrics.time_stage('normalize'):
+            placed = geocoder.geocode_records(self.leads)
+        geocoder.close()
+        print(f"🌍 Geocoded {placed}/{len(self.leads)} leads "
+              f"({sum(geocoder.lookups.values())} distinct locations, {geocoder.lookups['gazetteer']} new)")
+    
+    def report_summary(self):
+        """Report aggregates as (metric, value) rows for the Excel summary sheet"""
+        quality_bands = [('Low (0-30)', 30), ('Medium (31-60)', 60), ('High (61-80)', 80), ('Premium (81-100)', 100)]
+        quality = Counter()
+        for lead in self.leads:
+            quality[next((band for band, upper in quality_bands if lead['lead_score'] <= upper), 'Premium (81-100)')] += 1
+        
+        rows = [
+            ('Total leads generated', len(self.leads)),
+            ('Qualified leads (score >= 70)', sum(1 for lead in self.leads if lead['lead_score'] >= 70)),
+            ('Valid emails', sum(1 for lead in self.leads if lead.get('email_valid'))),
+            ('Verified contacts', sum(1 for lead in self.leads if lead.get('contact_verified'))),
+            ('Unique companies', len({lead.get('company_name') for lead in self.leads})),
+            ('Locations covered', len({lead.get('location') for lead in self.leads}))
+        ]
+        rows += [(f"Industry: {name}", count) for name, count in Counter(lead.get('industry') for lead in self.leads).most_common()]
+        rows += [(f"Company size: {name}", count) for name, count in Counter(lead.get('company_size') for lead in self.leads).most_common()]
+        rows += [(f"Quality: {band}", quality[band]) for band, _ in quality_bands]
+        if self.leads and 'remote' in self.leads[0]:
+            regions = Counter(place_label(lead) for lead in self.leads)
+            rows += [(f"Top region: {name}", count) for name, count in regions.most_common(5)]
+        return rows
+    
     def generate_report(self):
         """Generate lead generation summary report"""
         if not self.leads:
@@ -209,6 +376,10 @@ class LeadScraper:
         industry_counts = df['industry'].value_counts()
         print(industry_counts.to_string())
         
+        if self.leads and 'remote' in self.leads[0]:
+            print("\n🌍 Top 10 Regions:")
+            print(pd.Series([place_label(lead) for lead in self.leads]).value_counts().head(10).to_string())
+        
         print("\n🏢 Leads by Company Size:")
         size_counts = df['company_size'].value_counts()
         print(size_counts.to_string())
@@ -233,26 +404,83 @@ def main():
                        help='Target location for leads')
     parser.add_argument('--max-results', type=int, default=100,
                        help='Maximum number of leads to generate')
-    parser.add_argument('--output', choices=['csv', 'json', 'excel'], default='csv',
+    parser.add_argument('--output', choices=['csv', 'json', 'jsonl', 'excel'], default='csv',
                        help='Output format')
     parser.add_argument('--qualified-only', action='store_true',
                        help='Export only qualified leads')
     parser.add_argument('--config', default='config/lead_scraper_config.json',
                        help='Configuration file path')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its last checkpoint')
+    parser.add_argument('--load',
+                       help='Re-export and re-report records from a previous .jsonl export instead of scraping')
+    parser.add_argument('--synthetic', type=int, metavar='COUNT',
+                       help='Generate COUNT synthetic records in vectorized batches to load-test the stages after the fetch')
+    parser.add_argument('--seed', type=int,
+                       help='Random seed for --synthetic, for reproducible benchmarks')
+    parser.add_argument('--crm', choices=['salesforce', 'hubspot', 'pipedrive'],
+                       help='Also upload qualified leads to this CRM through its bulk API')
+    parser.add_argument('--crm-url',
+                       help='Base URL of the CRM API, overriding crm_integration settings')
+    parser.add_argument('--crm-file', action='store_true',
+                       help='Write a CSV in the CRM\'s import format instead of uploading')
+    parser.add_argument('--crm-mock', action='store_true',
+                       help='Upload to a local mock bulk API instead of the real CRM')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port while running')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile each stage and write flame-graph output to data/')
     
     args = parser.parse_args()
     
+    profiler = Profiler('lead_scraper') if args.profile else None
+    if profiler:
+        profiler.start()
+    
     # Initialize scraper
     scraper = LeadScraper(args.config)
+    if args.resume or scraper.config.get('checkpointing', {}).get('enabled', False):
+        scraper.enable_checkpoints(args.resume)
+    metrics_port = args.metrics_port or scraper.config.get('monitoring', {}).get('metrics_port')
+    if metrics_port:
+        scraper.metrics.start_server(metrics_port)
     
     # Generate leads
-    scraper.generate_demo_leads(args.industry, args.location, args.max_results)
+    if args.load:
+        scraper.load_data(args.load)
+    elif args.synthetic:
+        scraper.generate_synthetic_leads(args.synthetic, args.industry, args.location, args.seed)
+    else:
+        scraper.generate_demo_leads(args.industry, args.location, args.max_results)
     
-    # Export data
+    # Normalize and export data
+    scraper.geocode_locations()
     scraper.export_data(args.output, qualified_only=args.qualified_only)
+    if args.crm:
+        mock = None
+        if args.crm_mock:
+            # Test harness only; not needed by production exports
+            from mock_crm import MockBulkAPI
+            mock = MockBulkAPI()
+        crm_url = mock.start() if mock else args.crm_url
+        scraper.export_crm(args.crm, upload=not args.crm_file, base_url=crm_url)
+        if mock:
+            mock.stop()
+    if scraper.checkpoint is not None:
+        scraper.checkpoint.finish()
     
     # Generate report
-    scraper.generate_report()
+    with scraper.metrics.time_stage('report'):
+        scraper.generate_report()
+    
+    # Persist performance metrics
+    if scraper.config.get('monitoring', {}).get('track_performance'):
+        scraper.metrics.write_snapshot()
+    scraper.metrics.stop_server()
+    
+    if profiler:
+        profiler.stop()
+        profiler.write()
     
     print("\n🎉 Lead generation completed successfully!")
 
@@ -0,0 +1,327 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+from profiling import profile_stage
+
+# Latency buckets in seconds, from sub-millisecond parse steps to slow downloads
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'scraper_'
+
+
+class Histogram:
+    """Cumulative histogram with Prometheus-style upper-bound buckets"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Add a single observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self):
+        """Return histogram state as a plain dictionary"""
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.count
+
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'buckets': buckets
+        }
+
+
+class MetricsCollector:
+    """Thread-safe per-site registry of counters, gauges and latency histograms"""
+
+    def __init__(self, scraper_name='scraper', buckets=DEFAULT_BUCKETS):
+        """Initialize an empty metrics registry"""
+        self.scraper_name = scraper_name
+        self.buckets = buckets
+        self.started_at = time.time()
+        self.counters: Dict[Tuple, float] = {}
+        self.gauges: Dict[Tuple, float] = {}
+        self.histograms: Dict[Tuple, Histogram] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+    def increment(self, name, amount=1, **labels):
+        """Increase a counter such as bytes, responses or retries"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        """Set a point-in-time value such as a queue depth"""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Record a latency observation in seconds"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time_stage(self, stage, site='all'):
+        """Time a pipeline stage (fetch, parse, export, ...) for a site"""
+        start = time.perf_counter()
+        try:
+            with profile_stage(stage):
+                yield
+        finally:
+            self.observe('stage_seconds', time.perf_counter() - start, site=site, stage=stage)
+
+    def record_records(self, site, count=1):
+        """Count records produced for a site"""
+        self.increment('records_total', count, site=site)
+
+    def records_per_second(self, site=None):
+        """Records per second since the collector started, for one site or all"""
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        with self._lock:
+            total = sum(
+                value for (name, labels), value in self.counters.items()
+                if name == 'records_total' and (site is None or ('site', str(site)) in labels)
+            )
+        return total / elapsed
+
+    def histogram(self, name, **labels):
+        """Return the histogram for a metric and label set, if any"""
+        with self._lock:
+            return self.histograms.get(self._key(name, labels))
+
+    def scoped(self, **labels):
+        """View of this collector that adds fixed labels, e.g. scraper=..., to everything it records"""
+        return ScopedMetrics(self, **labels)
+
+    def merge(self, snapshot):
+        """Fold a snapshot() from another collector, e.g. a worker process, into this one"""
+        with self._lock:
+            for counter in snapshot.get('counters', []):
+                key = self._key(counter['name'], counter['labels'])
+                self.counters[key] = self.counters.get(key, 0) + counter['value']
+            for gauge in snapshot.get('gauges', []):
+                self.gauges[self._key(gauge['name'], gauge['labels'])] = gauge['value']
+            for entry in snapshot.get('histograms', []):
+                key = self._key(entry['name'], entry['labels'])
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(self.buckets)
+                # Snapshot buckets are cumulative; bounds match when both sides use the same buckets
+                previous = 0
+                for index, cumulative in enumerate(entry['buckets'].values()):
+                    histogram.counts[min(index, len(histogram.counts) - 1)] += cumulative - previous
+                    previous = cumulative
+                histogram.total += entry['sum']
+                histogram.count += entry['count']
+
+    def _sites(self):
+        sites = set()
+        for collection in (self.counters, self.gauges, self.histograms):
+            for _, labels in collection:
+                sites.update(value for label, value in labels if label == 'site')
+        return sorted(sites)
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dictionary"""
+        def labelled(key):
+            name, labels = key
+            return {'name': name, 'labels': dict(labels)}
+
+        with self._lock:
+            counters = [dict(labelled(k), value=v) for k, v in sorted(self.counters.items())]
+            gauges = [dict(labelled(k), value=v) for k, v in sorted(self.gauges.items())]
+            histograms = [dict(labelled(k), **h.snapshot()) for k, h in sorted(self.histograms.items())]
+            sites = self._sites()
+
+        return {
+            'scraper': self.scraper_name,
+            'generated_at': datetime.now().isoformat(),
+            'uptime_seconds': round(time.time() - self.started_at, 3),
+            'records_per_second': {site: round(self.records_per_second(site), 3) for site in sites},
+            'counters': counters,
+            'gauges': gauges,
+            'histograms': histograms
+        }
+
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (
+            '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for k, v in pairs
+        )
+        return '{' + ','.join(escaped) + '}'
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(self.histograms.items())
+            sites = self._sites()
+
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            declare(metric, 'counter')
+            lines.append(f"{metric}{self._format_labels(labels)} {value}")
+
+        for (name, labels), value in gauges:
+            metric = METRIC_PREFIX + name
+            declare(metric, 'gauge')
+            lines.append(f"{metric}{self._format_labels(labels)} {value}")
+
+        for site in sites:
+            metric = METRIC_PREFIX + 'records_per_second'
+            declare(metric, 'gauge')
+            lines.append(f"{metric}{self._format_labels([('site', site)])} {self.records_per_second(site):.6f}")
+
+        for (name, labels), histogram in histograms:
+            metric = METRIC_PREFIX + name
+            declare(metric, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{self._format_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_bucket{self._format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+            lines.append(f"{metric}_sum{self._format_labels(labels)} {histogram.total:.6f}")
+            lines.append(f"{metric}_count{self._format_labels(labels)} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, filename=None):
+        """Write a JSON snapshot of all metrics and return its path"""
+        if filename is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"data/metrics_{self.scraper_name}_{timestamp}.json"
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file = f"{filename}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_file, filename)
+
+        print(f"📈 Metrics snapshot written to: {filename}")
+        return filename
+
+    def start_server(self, port=9108, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json from a background thread"""
+        if self._server is not None:
+            return self._server
+
+        collector = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics.json'):
+                    body = json.dumps(collector.snapshot()).encode('utf-8')
+                    content_type = 'application/json'
+                elif self.path.startswith('/metrics'):
+                    body = collector.to_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+
+        print(f"📡 Metrics endpoint: http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def stop_server(self):
+        """Shut down the metrics endpoint if it is running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class ScopedMetrics:
+    """MetricsCollector view that records into a shared collector with extra labels"""
+
+    def __init__(self, collector, **labels):
+        self.collector = collector
+        self.labels = labels
+
+    def increment(self, name, amount=1, **labels):
+        self.collector.increment(name, amount, **self.labels, **labels)
+
+    def set_gauge(self, name, value, **labels):
+        self.collector.set_gauge(name, value, **self.labels, **labels)
+
+    def observe(self, name, value, **labels):
+        self.collector.observe(name, value, **self.labels, **labels)
+
+    def histogram(self, name, **labels):
+        return self.collector.histogram(name, **self.labels, **labels)
+
+    # These only call the methods above, so they pick up the extra labels
+    time_stage = MetricsCollector.time_stage
+    record_records = MetricsCollector.record_records
+
+    def __getattr__(self, name):
+        return getattr(self.collector, name)
@@ -0,0 +1,167 @@
+import argparse
+import json
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockAlertServer:
+    """Local stand-in webhook and SMTP server that records the alert deliveries it receives"""
+
+    def __init__(self, host='127.0.0.1', http_port=0, smtp_port=0, fail_first=0):
+        """
+        Initialize server; ports 0 pick free ports
+
+        Webhook and Slack POSTs to any path are stored in webhooks as
+        (path, JSON body); emails are stored in emails as (sender, recipients,
+        email.message.Message). The first fail_first webhook requests get a
+        503, to exercise retries.
+        """
+        self.host = host
+        self.http_port = http_port
+        self.smtp_port = smtp_port
+        self.fail_first = fail_first
+        self.webhooks = []
+        self.emails = []
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._servers = []
+
+    @property
+    def webhook_url(self):
+        return f"http://{self.host}:{self.http_port}/webhook"
+
+    @property
+    def slack_url(self):
+        return f"http://{self.host}:{self.http_port}/slack"
+
+    def destinations(self, recipients=('alerts@example.com',)):
+        """alert_system destinations pointing at this server"""
+        return {
+            'webhook': {'url': self.webhook_url},
+            'slack': {'webhook_url': self.slack_url},
+            'email': {'smtp_host': self.host, 'smtp_port': self.smtp_port,
+                      'from': 'monitor@example.com', 'to': list(recipients)}
+        }
+
+    def _record_webhook(self, path, body):
+        with self._lock:
+            if self.rejected < self.fail_first:
+                self.rejected += 1
+                return 503
+            self.webhooks.append((path, body))
+            return 200
+
+    def _record_email(self, sender, recipients, data):
+        with self._lock:
+            self.emails.append((sender, recipients, message_from_bytes(data)))
+
+    def start(self):
+        """Serve webhooks and SMTP from background threads"""
+        server = self
+
+        class WebhookHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'null')
+                except ValueError:
+                    self.send_error(400)
+                    return
+                status = server._record_webhook(self.path, body)
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        class SMTPHandler(socketserver.StreamRequestHandler):
+            """Just enough SMTP for smtplib: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+            def reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                sender, recipients = None, []
+                self.reply('220 mock-alerts ESMTP')
+                for raw in self.rfile:
+                    command = raw.decode('ascii', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250 mock-alerts')
+                    elif verb == 'MAIL':
+                        sender, recipients = command.split(':', 1)[1].strip(' <>'), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[1].strip(' <>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        lines = []
+                        for line in self.rfile:
+                            if line in (b'.\r\n', b'.\n'):
+                                break
+                            lines.append(line[1:] if line.startswith(b'..') else line)
+                        server._record_email(sender, recipients, b''.join(lines))
+                        self.reply('250 OK')
+                    elif verb in ('RSET', 'NOOP'):
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        class SMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        http_server = ThreadingHTTPServer((self.host, self.http_port), WebhookHandler)
+        smtp_server = SMTPServer((self.host, self.smtp_port), SMTPHandler)
+        self.http_port = http_server.server_address[1]
+        self.smtp_port = smtp_server.server_address[1]
+        for instance in (http_server, smtp_server):
+            threading.Thread(target=instance.serve_forever, daemon=True).start()
+            self._servers.append(instance)
+        print(f"🧪 Mock alert endpoints: {self.webhook_url}, {self.slack_url}, smtp://{self.host}:{self.smtp_port}")
+        return self
+
+    def stop(self):
+        """Shut both servers down"""
+        for instance in self._servers:
+            instance.shutdown()
+            instance.server_close()
+        self._servers = []
+
+    def alerts(self):
+        """Alerts received through the webhook, in arrival order"""
+        with self._lock:
+            return [alert for path, body in self.webhooks if path == '/webhook' for alert in body.get('alerts', [])]
+
+
+def main():
+    """Run the mock alert endpoints until interrupted, printing deliveries as they arrive"""
+    parser = argparse.ArgumentParser(description='Mock webhook and SMTP server for testing price alerts')
+    parser.add_argument('--http-port', type=int, default=8025, help='Webhook/Slack port')
+    parser.add_argument('--smtp-port', type=int, default=8026, help='SMTP port')
+    args = parser.parse_args()
+
+    server = MockAlertServer(http_port=args.http_port, smtp_port=args.smtp_port).start()
+    seen = (0, 0)
+    try:
+        while True:
+            time.sleep(1)
+            counts = (len(server.webhooks), len(server.emails))
+            if counts != seen:
+                print(f"📬 {counts[0]} webhook posts, {counts[1]} emails received")
+                seen = counts
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crm_export import CRM_PROFILES
+
+# Fields each CRM refuses to create a record without
+REQUIRED_FIELDS = {'salesforce': 'LastName', 'hubspot': 'email', 'pipedrive': 'name'}
+
+
+class MockBulkAPI:
+    """Local stand-in for the Salesforce, HubSpot and Pipedrive bulk endpoints used by CRMExporter"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, throttle_rate=0.0, seed=None):
+        """
+        Initialize server on host:port (0 picks a free port)
+
+        Every request takes latency seconds, and a throttle_rate fraction of
+        them is answered 429 with Retry-After. Batches over a CRM's size limit
+        get a 400. Responses are stored by Idempotency-Key; a repeated key
+        gets the stored response back without creating its records again.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.records = {crm: [] for crm in CRM_PROFILES}
+        self.requests = 0
+        self.replays = 0
+        self.throttled = 0
+        self._routes = {profile['endpoint']: crm for crm, profile in CRM_PROFILES.items()}
+        self._responses = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _create(self, crm, payload):
+        """(status, response body, records to store) for a request payload"""
+        if crm == 'salesforce':
+            records = payload.get('records', [])
+        elif crm == 'hubspot':
+            records = [entry.get('properties', {}) for entry in payload.get('inputs', [])]
+        else:
+            records = [payload]
+
+        limit = CRM_PROFILES[crm]['max_batch_size']
+        if len(records) > limit:
+            return 400, {'message': f"Batch of {len(records)} exceeds the limit of {limit}"}, []
+
+        required = REQUIRED_FIELDS[crm]
+        valid = [bool(record.get(required)) for record in records]
+        created = [record for record, ok in zip(records, valid) if ok]
+        first_id = sum(len(stored) for stored in self.records.values()) + 1
+
+        if crm == 'salesforce':
+            return 200, [{'id': f"00Q{first_id + i:012d}", 'success': True, 'errors': []} if ok else
+                         {'success': False, 'errors': [{'statusCode': 'REQUIRED_FIELD_MISSING',
+                                                        'fields': [required]}]}
+                         for i, ok in enumerate(valid)], created
+        if crm == 'hubspot':
+            errors = len(records) - len(created)
+            body = {'status': 'COMPLETE', 'results': [{'id': str(first_id + i)} for i in range(len(created))]}
+            if errors:
+                body.update({'numErrors': errors, 'errors': [{'category': 'VALIDATION_ERROR',
+                                                              'message': f"Property {required} is required"}]})
+            return (207 if errors else 201), body, created
+        if not created:
+            return 400, {'success': False, 'error': f"Field {required} is required"}, []
+        return 201, {'success': True, 'data': {'id': first_id, **created[0]}}, created
+
+    def handle(self, path, key, payload):
+        """Process one request; returns (status, body, headers)"""
+        time.sleep(self.latency)
+        crm = self._routes.get(path)
+        with self._lock:
+            self.requests += 1
+            if crm is None:
+                return 404, {'message': f"No endpoint {path}"}, {}
+            if self.throttle_rate and self._random.random() < self.throttle_rate:
+                self.throttled += 1
+                return 429, {'message': 'Rate limit exceeded'}, {'Retry-After': '1'}
+            if key and key in self._responses:
+                self.replays += 1
+                status, body = self._responses[key]
+                return status, body, {'Idempotent-Replayed': 'true'}
+
+            status, body, created = self._create(crm, payload)
+            self.records[crm].extend(created)
+            if key and status < 300:
+                self._responses[key] = (status, body)
+            return status, body, {}
+
+    def start(self):
+        """Serve from a background thread; returns the base URL"""
+        api = self
+
+        class BulkHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    status, body, headers = 400, {'message': 'Malformed JSON'}, {}
+                else:
+                    status, body, headers = api.handle(self.path, self.headers.get('Idempotency-Key'), payload)
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), BulkHandler)
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        print(f"🧪 Mock CRM bulk API: {self.url}")
+        return self.url
+
+    def stop(self):
+        """Shut down the server if it is running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def stats(self):
+        """Requests served, idempotent replays, 429s and records created per CRM"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'replays': self.replays,
+                'throttled': self.throttled,
+                'created': {crm: len(records) for crm, records in self.records.items()}
+            }
+
+
+def main():
+    """Run the mock bulk API until interrupted"""
+    parser = argparse.ArgumentParser(description='Mock CRM bulk API for testing CRM exports')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds each request takes')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    api = MockBulkAPI(port=args.port, latency=args.latency, throttle_rate=args.throttle_rate)
+    api.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    api.stop()
+    print(f"📊 {api.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import requests
+
+from fetcher import Fetcher, RateLimiter
+from proxies import ProxyPool
+
+# Per-connection headers a proxy must not pass on
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'proxy-authorization',
+                      'proxy-authenticate', 'te', 'trailer', 'transfer-encoding', 'upgrade'}
+
+
+class MockProxy:
+    """Local stand-in forward proxy for exercising ProxyPool health scoring, cooldown and failover"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, block_after=None, block_status=429, drop=False):
+        """
+        Initialize proxy on host:port (0 picks a free port)
+
+        Plain-HTTP requests are relayed to their origin after latency seconds.
+        Once block_after requests have been relayed, every further request is
+        answered with block_status, as a target does when it blocks an egress
+        address. With drop, connections are closed without any response, like
+        a dead proxy. HTTPS CONNECT tunnels are not supported.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.block_after = block_after
+        self.block_status = block_status
+        self.drop = drop
+        self.requests = 0
+        self.relayed = 0
+        self.blocked = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _outcome(self):
+        """'relay', 'block' or 'drop' for the next request"""
+        with self._lock:
+            self.requests += 1
+            if self.drop:
+                self.dropped += 1
+                return 'drop'
+            if self.block_after is not None and self.relayed >= self.block_after:
+                self.blocked += 1
+                return 'block'
+            self.relayed += 1
+            return 'relay'
+
+    def start(self):
+        """Serve from a background thread; returns the proxy URL"""
+        proxy = self
+
+        class ProxyHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def relay(self):
+                target = urlsplit(self.path)
+                if target.scheme != 'http' or not target.hostname:
+                    self.respond(400, b'Only absolute http:// URLs are proxied')
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else None
+
+                outcome = proxy._outcome()
+                if outcome == 'drop':
+                    self.close_connection = True
+                    return
+                time.sleep(proxy.latency)
+                if outcome == 'block':
+                    self.respond(proxy.block_status, b'Blocked')
+                    return
+
+                headers = {name: value for name, value in self.headers.items()
+                           if name.lower() not in HOP_BY_HOP_HEADERS}
+                path = target.path or '/'
+                if target.query:
+                    path += '?' + target.query
+                upstream = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                try:
+                    upstream.request(self.command, path, body=body, headers=headers)
+                    response = upstream.getresponse()
+                    # Relayed as received, still content-encoded
+                    content = response.read()
+                    upstream_headers = [(name, value) for name, value in response.getheaders()
+                                        if name.lower() not in HOP_BY_HOP_HEADERS | {'content-length'}]
+                except OSError as e:
+                    self.respond(502, str(e).encode('utf-8'))
+                    return
+                finally:
+                    upstream.close()
+                self.respond(response.status, content, upstream_headers)
+
+            def respond(self, status, content, headers=()):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Via', f"1.1 mock-proxy-{proxy.port}")
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = relay
+
+            def do_CONNECT(self):
+                proxy._outcome()
+                self.respond(501, b'CONNECT tunnels are not supported')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), ProxyHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """Shut down the proxy if it is running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def stats(self):
+        """Requests received, relayed, blocked and dropped"""
+        with self._lock:
+            return {'requests': self.requests, 'relayed': self.relayed,
+                    'blocked': self.blocked, 'dropped': self.dropped}
+
+
+class MockOrigin:
+    """Local origin site serving a small fixed page on every path, for proxied benchmarks and tests"""
+
+    def __init__(self, host='127.0.0.1', port=0, body=b'<html><body><p>ok</p></body></html>'):
+        self.host = host
+        self.port = port
+        self.body = body
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Serve from a background thread; returns the base URL"""
+        origin = self
+
+        class OriginHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(origin.body)))
+                self.end_headers()
+                self.wfile.write(origin.body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), OriginHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """Shut down the origin if it is running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def benchmark(proxy_counts=(1, 2, 4), requests_per_run=200, rate_limit=0.05, latency=0.02,
+              max_concurrency_per_proxy=4):
+    """
+    Requests per second through 1, 2, 4... stand-in proxies to one rate-limited origin
+
+    rate_limit spacing applies per host and proxy, so throughput should grow
+    with the number of proxies up to the per-proxy concurrency limit.
+    Returns {proxy count: requests per second}.
+    """
+    origin = MockOrigin()
+    origin.start()
+    results = {}
+    try:
+        for count in proxy_counts:
+            proxies = [MockProxy(latency=latency) for _ in range(count)]
+            pool = ProxyPool([proxy.start() for proxy in proxies], max_concurrency=max_concurrency_per_proxy)
+            session = requests.Session()
+            session.trust_env = False
+            fetcher = Fetcher(session, rate_limiter=RateLimiter(rate_limit), proxy_pool=pool, backoff_seconds=0)
+            urls = [f"{origin.url}/page/{index}" for index in range(requests_per_run)]
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=count * max_concurrency_per_proxy) as executor:
+                statuses = list(executor.map(lambda url: fetcher.fetch(url).status_code, urls))
+            elapsed = time.perf_counter() - start
+
+            for proxy in proxies:
+                proxy.stop()
+            results[count] = round(statuses.count(200) / elapsed, 1)
+            print(f"🌐 {count} proxies: {results[count]} req/s ({statuses.count(200)}/{len(urls)} OK)")
+    finally:
+        origin.stop()
+    return results
+
+
+def main():
+    """Run stand-in proxies until interrupted, or benchmark throughput through them"""
+    parser = argparse.ArgumentParser(description='Mock forward proxies for testing the proxy pool')
+    parser.add_argument('--count', type=int, default=2, help='Number of proxies to run')
+    parser.add_argument('--base-port', type=int, default=8890, help='Port of the first proxy; the rest follow')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds each relayed request takes')
+    parser.add_argument('--block-after', type=int, default=None,
+                        help='Answer 429 to everything after this many requests (first proxy only)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Measure throughput through 1, 2 and 4 proxies and exit')
+    parser.add_argument('--rate-limit', type=float, default=0.05, help='Benchmark spacing per host and proxy')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(rate_limit=args.rate_limit, latency=args.latency)
+        return
+
+    proxies = [MockProxy(port=args.base_port + index, latency=args.latency,
+                         block_after=args.block_after if index == 0 else None)
+               for index in range(args.count)]
+    for proxy in proxies:
+        print(f"🧪 Mock proxy: {proxy.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    for proxy in proxies:
+        proxy.stop()
+        print(f"📊 {proxy.url}: {proxy.stats()}")
+
+
+if __name__ == "__main__":
+    main()
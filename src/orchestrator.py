@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import requests
+
+from fetcher import InstrumentedAdapter, RateLimiter
+from metrics import MetricsCollector
+from proxies import ProxyPool
+
+
+def run_job_pipeline(settings, output_format='csv', **shared):
+    """Scrape, export and report job listings"""
+    from job_scraper import JobScraper
+
+    scraper = JobScraper(settings.get('config', 'config/job_scraper_config.json'), **shared)
+    if settings.get('synthetic'):
+        scraper.generate_synthetic_jobs(settings['synthetic'], settings.get('keywords', ['python', 'developer']),
+                                        settings.get('seed'))
+    else:
+        scraper.scrape_demo_jobs(
+            settings.get('keywords', ['python', 'developer']),
+            settings.get('location', 'remote'),
+            settings.get('max_results', 50)
+        )
+    scraper.dedupe_postings(':memory:' if settings.get('synthetic') else None)
+    scraper.normalize_salaries()
+    scraper.extract_skills()
+    scraper.geocode_locations()
+    output_file = scraper.export_data(output_format)
+    scraper.commit_postings()
+    if scraper.fingerprints is not None:
+        scraper.fingerprints.save()
+    with scraper.metrics.time_stage('report'):
+        scraper.generate_report()
+    return {'records': len(scraper.scraped_jobs), 'output_file': output_file}
+
+
+def run_lead_pipeline(settings, output_format='csv', **shared):
+    """Generate, export and report leads"""
+    from lead_scraper import LeadScraper
+
+    scraper = LeadScraper(settings.get('config', 'config/lead_scraper_config.json'), **shared)
+    if settings.get('synthetic'):
+        scraper.generate_synthetic_leads(settings['synthetic'], settings.get('industry', 'technology'),
+                                         settings.get('location', 'usa'), settings.get('seed'))
+    else:
+        scraper.generate_demo_leads(
+            settings.get('industry', 'technology'),
+            settings.get('location', 'usa'),
+            settings.get('max_results', 100)
+        )
+    scraper.geocode_locations()
+    output_file = scraper.export_data(output_format, qualified_only=settings.get('qualified_only', False))
+    with scraper.metrics.time_stage('report'):
+        scraper.generate_report()
+    return {'records': len(scraper.leads), 'output_file': output_file}
+
+
+def run_price_pipeline(settings, output_format='csv', **shared):
+    """Collect, export and report product prices"""
+    from price_monitor import PriceMonitor
+
+    monitor = PriceMonitor(settings.get('config', 'config/price_monitor_config.json'), **shared)
+    if settings.get('synthetic'):
+        monitor.generate_synthetic_price_data(settings['synthetic'], settings.get('seed'))
+    else:
+        monitor.generate_demo_price_data(settings.get('products', 20))
+    monitor.match_products()
+    output_file = monitor.export_data(output_format)
+    if not settings.get('synthetic'):
+        monitor.save_last_seen()
+    if monitor.fingerprints is not None:
+        monitor.fingerprints.save()
+    if monitor.alerts is not None:
+        monitor.alerts.stop()
+    with monitor.metrics.time_stage('report'):
+        monitor.generate_report()
+    return {'records': len(monitor.price_data), 'output_file': output_file}
+
+
+PIPELINES = {
+    'job_scraper': run_job_pipeline,
+    'lead_scraper': run_lead_pipeline,
+    'price_monitor': run_price_pipeline
+}
+
+
+def _run_in_worker(name, settings, output_format, max_connections, niceness, proxy_settings=None):
+    """Worker process entry point; returns the pipeline result and its metrics snapshot"""
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+
+    collector = MetricsCollector('orchestrator')
+    result = PIPELINES[name](
+        settings, output_format,
+        metrics=collector.scoped(scraper=name),
+        max_connections=max_connections,
+        proxy_pool=ProxyPool.from_config(proxy_settings or {})
+    )
+    return result, collector.snapshot()
+
+
+class ScrapeOrchestrator:
+    """Run the job, lead and price pipelines concurrently with shared fetch resources"""
+
+    def __init__(self, config_file='config/orchestrator_config.json'):
+        """Initialize orchestrator with configuration"""
+        self.config = self.load_config(config_file)
+        self.metrics = MetricsCollector('orchestrator')
+        self.results = {}
+
+        # One connection pool and one per-host request schedule for every pipeline
+        max_connections = self.config.get('max_connections', 20)
+        self.session = requests.Session()
+        adapter = InstrumentedAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = RateLimiter()
+        self.proxy_pool = ProxyPool.from_config(self.config.get('proxy_pool', {}))
+
+        print("🎼 Scrape Orchestrator initialized")
+        print(f"🧩 Pipelines: {', '.join(name for name, _ in self.enabled_pipelines())}")
+        if self.proxy_pool is not None:
+            print(f"🌐 Proxy pool: {len(self.proxy_pool)} egress proxies")
+
+    def load_config(self, config_file):
+        """Load configuration from JSON file"""
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                return json.load(f)
+        else:
+            print(f"⚠️  Config file {config_file} not found, using defaults")
+            return {
+                "mode": "threads",
+                "max_connections": 20,
+                "pipelines": {name: {"enabled": True, "weight": 1} for name in PIPELINES}
+            }
+
+    def enabled_pipelines(self, only=None):
+        """(name, settings) of the pipelines to run, heaviest weight first"""
+        pipelines = [
+            (name, settings) for name, settings in self.config.get('pipelines', {}).items()
+            if name in PIPELINES and settings.get('enabled', True) and (not only or name in only)
+        ]
+        return sorted(pipelines, key=lambda item: -item[1].get('weight', 1))
+
+    @staticmethod
+    def allot(pipelines, total):
+        """Split total slots between pipelines in proportion to their weights, at least one each"""
+        weights = {name: max(settings.get('weight', 1), 0) for name, settings in pipelines}
+        weight_sum = sum(weights.values()) or 1
+        return {name: max(1, int(total * weight / weight_sum)) for name, weight in weights.items()}
+
+    def run(self, mode=None, only=None, output_format=None):
+        """Run the enabled pipelines concurrently; returns {pipeline: result}"""
+        mode = mode or self.config.get('mode', 'threads')
+        output_format = output_format or self.config.get('output_format', 'csv')
+        pipelines = self.enabled_pipelines(only)
+        if not pipelines:
+            print("❌ No pipelines enabled")
+            return {}
+
+        connections = self.allot(pipelines, self.config.get('max_connections', 20))
+        for name, _ in pipelines:
+            print(f"⚖️  {name}: {connections[name]} connection slots")
+
+        start = time.perf_counter()
+        if mode == 'processes':
+            self._run_processes(pipelines, connections, output_format)
+        else:
+            self._run_threads(pipelines, connections, output_format)
+        elapsed = time.perf_counter() - start
+
+        self.metrics.set_gauge('orchestrator_wall_seconds', round(elapsed, 3))
+        print(f"\n⏱️  {len(pipelines)} pipelines finished in {elapsed:.1f}s ({mode})")
+        return self.results
+
+    def _run_threads(self, pipelines, connections, output_format):
+        with ThreadPoolExecutor(max_workers=len(pipelines), thread_name_prefix='pipeline') as executor:
+            futures = {
+                executor.submit(
+                    PIPELINES[name], settings, output_format,
+                    session=self.session,
+                    metrics=self.metrics.scoped(scraper=name),
+                    rate_limiter=self.rate_limiter,
+                    max_connections=connections[name],
+                    proxy_pool=self.proxy_pool
+                ): name
+                for name, settings in pipelines
+            }
+            for future in as_completed(futures):
+                self._collect(futures[future], future)
+
+    def _run_processes(self, pipelines, connections, output_format):
+        # Processes cannot share a session or proxy pool; besides its connection slots,
+        # a pipeline's weight sets its CPU scheduling priority
+        heaviest = max(settings.get('weight', 1) for _, settings in pipelines) or 1
+        workers = self.config.get('workers') or len(pipelines)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for name, settings in pipelines:
+                niceness = round((1 - settings.get('weight', 1) / heaviest) * 10)
+                future = executor.submit(_run_in_worker, name, settings, output_format, connections[name], niceness,
+                                         self.config.get('proxy_pool'))
+                futures[future] = name
+            for future in as_completed(futures):
+                name = futures[future]
+                if self._collect(name, future):
+                    self.results[name], snapshot = self.results[name]
+                    self.metrics.merge(snapshot)
+
+    def _collect(self, name, future):
+        try:
+            self.results[name] = future.result()
+            return True
+        except Exception as e:
+            print(f"❌ Pipeline {name} failed: {e}")
+            self.results[name] = {'error': str(e)}
+            return False
+
+    def generate_report(self):
+        """Print a combined summary of all pipelines"""
+        print("\n" + "="*50)
+        print("🎼 ORCHESTRATED RUN REPORT")
+        print("="*50)
+        for name, result in self.results.items():
+            if 'error' in result:
+                print(f"❌ {name}: {result['error']}")
+            else:
+                print(f"✅ {name}: {result['records']} records → {result['output_file']}")
+        if self.proxy_pool is not None:
+            print("\n🌐 Proxy health:")
+            for proxy in self.proxy_pool.stats():
+                state = 'cooling down' if proxy['cooling'] else 'healthy'
+                print(f"  {proxy['name']}: {proxy['requests']} requests, success {proxy['success']:.0%}, "
+                      f"{proxy['cooldowns']} cooldowns ({state})")
+        print("="*50)
+
+
+def main():
+    """Main function to run all scrapers together"""
+    parser = argparse.ArgumentParser(description='Run the job, lead and price pipelines concurrently')
+    parser.add_argument('--config', default='config/orchestrator_config.json',
+                       help='Configuration file path')
+    parser.add_argument('--mode', choices=['threads', 'processes'],
+                       help='Run pipelines as threads sharing one HTTP pool, or as worker processes')
+    parser.add_argument('--only', nargs='+', choices=sorted(PIPELINES),
+                       help='Run only these pipelines')
+    parser.add_argument('--output', choices=['csv', 'json', 'jsonl', 'excel'],
+                       help='Output format')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port while running')
+
+    args = parser.parse_args()
+
+    orchestrator = ScrapeOrchestrator(args.config)
+    metrics_port = args.metrics_port or orchestrator.config.get('monitoring', {}).get('metrics_port')
+    if metrics_port:
+        orchestrator.metrics.start_server(metrics_port)
+
+    orchestrator.run(args.mode, args.only, args.output)
+    orchestrator.generate_report()
+
+    # Persist performance metrics
+    if orchestrator.config.get('monitoring', {}).get('track_performance'):
+        orchestrator.metrics.write_snapshot()
+    orchestrator.metrics.stop_server()
+
+    print("\n🎉 Orchestrated run completed successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime
+from urllib.parse import urlparse
+
+from geocoding import normalize_place
+
+_WORD_PATTERN = re.compile(r'\w+')
+# Legal suffixes boards add or drop: "TechCorp Inc" and "TechCorp, Inc." are one company
+_COMPANY_SUFFIXES = {'inc', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company', 'gmbh', 'plc'}
+
+# SQLite host parameter limit is 999 on older builds
+_QUERY_BATCH = 500
+
+
+def _words(text):
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii')
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def listing_key(job):
+    """Hash of a job's normalized title, company and location, shared by every posting for that role"""
+    company = [word for word in _words(job.get('company')) if word not in _COMPANY_SUFFIXES]
+    parts = (' '.join(_words(job.get('title'))), ' '.join(company), normalize_place(job.get('location') or ''))
+    return _digest('\x1f'.join(parts))
+
+
+def content_hash(text, shingle_size=3):
+    """Hash of the set of word shingles in a description; ignores case, punctuation and spacing"""
+    words = _words(text)
+    shingles = {' '.join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+    return _digest('\n'.join(sorted(shingles)))
+
+
+def posting_key(job, listing=None, description_hash=None):
+    """
+    Identity of a posting across boards: its listing_key plus the content_hash of its description
+
+    Boards carrying the same posting share the key; two openings with the
+    same title, company and location but different descriptions do not.
+    """
+    listing = listing or listing_key(job)
+    return _digest(listing + (description_hash or content_hash(job.get('description') or '')))
+
+
+def job_source(job):
+    """Board a job came from: its source URL's host, or its 'source' field"""
+    if job.get('source_url'):
+        return urlparse(job['source_url']).hostname or job['source_url']
+    return job.get('source') or 'demo'
+
+
+class PostingIndex:
+    """Persistent SQLite index of job postings seen across runs and boards"""
+
+    def __init__(self, path):
+        """
+        Open or create the index at path (":memory:" for a throwaway index)
+
+        Each posting is keyed by posting_key() and stores its listing_key,
+        when it was first and last seen, and the boards it was seen on.
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS postings ('
+            'key TEXT PRIMARY KEY, first_seen TEXT, last_seen TEXT, sources TEXT, listing TEXT)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS postings_listing ON postings (listing)')
+        self._pending = ([], [])
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM postings').fetchone()[0]
+
+    def _select(self, column, values):
+        """Rows whose column is one of values, as (key, first_seen, sources, listing)"""
+        for start in range(0, len(values), _QUERY_BATCH):
+            batch = values[start:start + _QUERY_BATCH]
+            rows = self._db.execute(
+                f"SELECT key, first_seen, sources, listing FROM postings "
+                f"WHERE {column} IN ({','.join('?' * len(batch))})",
+                batch
+            )
+            for key, first_seen, sources, listing in rows:
+                yield key, first_seen, json.loads(sources), listing
+
+    def ingest(self, jobs, emit_unchanged=False):
+        """
+        Match a run's jobs against the index and return the ones to emit, with counts
+
+        Jobs sharing a posting key within the run are merged into the first,
+        whose sources field lists every board it was seen on. A posting is
+        'new' when the index has never seen it, 'changed' when it replaces a
+        posting with the same title, company and location that a board
+        listed before with a different description, and 'unchanged'
+        otherwise, including when it merely appears on another board. Only
+        new and changed postings are returned unless emit_unchanged. Each
+        returned job gains posting_id, posting_status, first_seen, last_seen
+        and sources.
+
+        The index itself is not written until commit(), so postings that
+        never make it into an export are offered again by the next run.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        merged = {}
+        listings, hashes = {}, {}
+        duplicates = 0
+        for job in jobs:
+            identity = (job.get('title'), job.get('company'), job.get('location'))
+            listing = listings.get(identity)
+            if listing is None:
+                listing = listings[identity] = listing_key(job)
+            description = job.get('description') or ''
+            if description not in hashes:
+                hashes[description] = content_hash(description)
+            key = posting_key(job, listing, hashes[description])
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = (job, {job_source(job)}, listing)
+            else:
+                duplicates += 1
+                entry[1].add(job_source(job))
+
+        known = {key: (first_seen, sources) for key, first_seen, sources, _ in self._select('key', list(merged))}
+        # Earlier postings for the same roles that this run no longer shows; candidates for 'changed'
+        replaced = {}
+        unseen = list({listing for key, (_, _, listing) in merged.items() if key not in known})
+        for key, first_seen, sources, listing in self._select('listing', unseen):
+            if key not in merged:
+                replaced.setdefault(listing, []).append((key, first_seen, sources))
+
+        emitted, rows, superseded = [], [], []
+        counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'merged': duplicates}
+        for key, (job, seen, listing) in merged.items():
+            if key in known:
+                first_seen, sources = known[key]
+                status = 'unchanged'
+            else:
+                first_seen, sources, status = now, [], 'new'
+                for previous in replaced.get(listing, []):
+                    if seen.intersection(previous[2]):
+                        replaced[listing].remove(previous)
+                        superseded.append(previous[0])
+                        first_seen, sources, status = previous[1], previous[2], 'changed'
+                        break
+            sources = sorted(seen.union(sources))
+            counts[status] += 1
+            rows.append((key, first_seen, now, json.dumps(sources), listing))
+
+            if status != 'unchanged' or emit_unchanged:
+                job.update({
+                    'posting_id': key,
+                    'posting_status': status,
+                    'first_seen': first_seen,
+                    'last_seen': now,
+                    'sources': ', '.join(sources)
+                })
+                emitted.append(job)
+
+        self._pending = (rows, superseded)
+        return emitted, counts
+
+    def commit(self):
+        """Record the last ingest()'s postings as seen; call once they have been exported"""
+        rows, superseded = self._pending
+        with self._db:
+            self._db.executemany('DELETE FROM postings WHERE key = ?', [(key,) for key in superseded])
+            self._db.executemany(
+                'INSERT OR REPLACE INTO postings (key, first_seen, last_seen, sources, listing) '
+                'VALUES (?, ?, ?, ?, ?)', rows)
+        self._pending = ([], [])
+        return len(rows)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -7,15 +7,111 @@ import random
 import argparse
 from datetime import datetime
 import os
+import re
+import itertools
+from urllib.parse import urlparse
+from metrics import MetricsCollector
+from fetcher import ACCEPT_ENCODING, Fetcher, RateLimiter
+from proxies import ProxyPool
+from profiling import Profiler
+from scheduler import PriceCheckScheduler
+from fingerprint import Fingerprinter, FingerprintStore, PRICE_PATTERN
+from alerts import AlertDispatcher, price_alerts
+from excel_export import write_excel
+from checkpoint import Checkpoint
+from jsonl_io import jsonl_path, read_jsonl, write_jsonl
+from product_matching import ProductIndex
+from synthetic import price_batches
 
 class PriceMonitor:
     """Professional price monitoring toolkit for e-commerce and competitive analysis"""
     
-    def __init__(self, config_file='config/price_monitor_config.json'):
+    # Demo products and categories
+    DEMO_PRODUCTS = [
+        {"name": "MacBook Pro 13\"", "category": "Electronics", "base_price": 1299.99},
+        {"name": "iPhone 14", "category": "Electronics", "base_price": 899.99},
+        {"name": "Samsung Galaxy S23", "category": "Electronics", "base_price": 799.99},
+        {"name": "Dell XPS 13", "category": "Electronics", "base_price": 999.99},
+        {"name": "Sony WH-1000XM4", "category": "Electronics", "base_price": 349.99},
+        {"name": "Nike Air Max 90", "category": "Footwear", "base_price": 119.99},
+        {"name": "Adidas Ultraboost 22", "category": "Footwear", "base_price": 179.99},
+        {"name": "Levi's 501 Jeans", "category": "Apparel", "base_price": 89.99},
+        {"name": "Patagonia Fleece", "category": "Apparel", "base_price": 149.99},
+        {"name": "Instant Pot Duo", "category": "Kitchen", "base_price": 79.99}
+    ]
+    
+    DEMO_SITES = ["Amazon", "Best Buy", "Target", "Walmart", "Newegg"]
+    # Seconds between requests to a site without a configured rate_limit
+    DEFAULT_RATE_LIMIT = 1
+    
+    # Selectors tried in order when extracting a price from a product page
+    PRICE_SELECTORS = [
+        'meta[property="product:price:amount"]', '[itemprop="price"]',
+        '.a-price .a-offscreen', '[data-testid="product-price"]', '.price'
+    ]
+    
+    # Listing title and GTIN/UPC selectors used for cross-site product matching
+    TITLE_SELECTORS = ['meta[property="og:title"]', '#productTitle', '[itemprop="name"]', 'h1']
+    GTIN_SELECTORS = ['[itemprop="gtin13"]', '[itemprop="gtin12"]', '[itemprop="gtin14"]', '[itemprop="gtin"]', '[itemprop="gtin8"]']
+    
+    # Chance that a demo price moves between two checks
+    DEMO_VOLATILITY = {"Electronics": 0.3, "Footwear": 0.1, "Apparel": 0.05, "Kitchen": 0.02}
+    
+    def __init__(self, config_file='config/price_monitor_config.json', session=None, metrics=None,
+                 rate_limiter=None, max_connections=None, proxy_pool=None):
         """Initialize price monitor with configuration"""
         self.config = self.load_config(config_file)
         self.price_data = []
-        self.session = requests.Session()
+        self.last_prices = {}
+        self.last_availability = {}
+        self.session = session or requests.Session()
+        
+        # Performance metrics and shared fetch layer
+        settings = self.config.get('monitoring_settings', {})
+        self.metrics = metrics or MetricsCollector('price_monitor')
+        self.fetcher = Fetcher(
+            self.session, self.get_random_headers, self.metrics,
+            timeout=settings.get('timeout', 30),
+            retry_attempts=settings.get('retry_attempts', 3),
+            max_body_bytes=int(settings.get('max_body_size_mb', 10) * 1024 * 1024),
+            spill_bytes=int(settings.get('spill_to_disk_mb', 2) * 1024 * 1024),
+            rate_limiter=RateLimiter(intervals={
+                urlparse(site['base_url']).hostname: site.get('rate_limit', self.DEFAULT_RATE_LIMIT)
+                for site in self.config.get('target_ecommerce_sites', []) if site.get('base_url')
+            }, parent=rate_limiter),
+            max_in_flight=max_connections,
+            proxy_pool=proxy_pool or ProxyPool.from_config(self.config.get('proxy_pool', {})),
+            adaptive_concurrency=settings.get('adaptive_concurrency')
+        )
+        
+        # Skip re-parsing product pages whose relevant content has not changed
+        fingerprinting = self.config.get('performance_optimization', {}).get('fingerprinting', {})
+        self.fingerprints = None
+        if fingerprinting.get('enabled', False):
+            self.fingerprints = FingerprintStore(
+                fingerprinting.get('store_file', 'data/fingerprints_price_monitor.json'),
+                Fingerprinter(
+                    region_pattern=fingerprinting.get('region_pattern'),
+                    exact_pattern=PRICE_PATTERN,
+                    max_distance=fingerprinting.get('max_distance', 3)
+                )
+            )
+        
+        # Price and stock alerts are delivered in the background
+        alert_config = self.config.get('alert_system', {})
+        self.alerts = AlertDispatcher.from_config(alert_config, self.metrics) if alert_config.get('enabled') else None
+        self.alert_baseline_ready = False
+        
+        # Last-seen prices persist between runs, so a single pass alerts on changes since the previous one
+        self.last_seen_file = self.config.get('price_tracking', {}).get('last_seen_file')
+        self.load_last_seen()
+        
+        # Crash-resume checkpoints, see enable_checkpoints()
+        self.checkpoint = None
+        self.resume = False
+        
+        # Adaptive re-check schedule while run_daemon() runs; checkpointed with the last-seen prices
+        self.scheduler = None
         
         # User agents for rotation
         self.user_agents = [
@@ -47,11 +143,47 @@ class PriceMonitor:
             'User-Agent': random.choice(self.user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': ACCEPT_ENCODING,
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
     
+    def enable_checkpoints(self, resume=False):
+        """Checkpoint monitoring progress to disk; with resume, continue from the last checkpoint"""
+        settings = self.config.get('checkpointing', {})
+        self.checkpoint = Checkpoint(
+            'price_monitor', settings.get('directory', 'data/checkpoints'),
+            every_records=settings.get('every_records', 50),
+            every_seconds=settings.get('every_seconds', 30)
+        )
+        self.resume = resume
+    
+    def _begin_checkpoint(self, run_key):
+        """Restore price records and last-seen prices from the last checkpoint; returns the position"""
+        if self.checkpoint is None:
+            return 0
+        records, position, state = self.checkpoint.begin(run_key, self.resume)
+        self.price_data.extend(records)
+        for name, site, price, availability in state.get('last_seen', []):
+            self.last_prices[(name, site)] = price
+            self.last_availability[(name, site)] = availability
+        if self.scheduler is not None and state.get('schedule'):
+            resumed = self.scheduler.restore(state['schedule'])
+            print(f"♻️  Restored the check schedule of {resumed} product/site pairs")
+        return position
+    
+    def _checkpoint_state(self):
+        # Last-seen prices drive alerts; fingerprints save themselves atomically
+        if self.fingerprints is not None:
+            self.fingerprints.save()
+        state = {'last_seen': [
+            [name, site, price, self.last_availability.get((name, site))]
+            for (name, site), price in self.last_prices.items()
+        ]}
+        if self.scheduler is not None:
+            state['schedule'] = self.scheduler.snapshot()
+        return state
+    
     def generate_demo_price_data(self, num_products=20):
         """
         Generate demo price data for portfolio demonstration
@@ -59,50 +191,35 @@ class PriceMonitor:
         """
         print("🔍 Generating demo price monitoring data...")
         
-        # Demo products and categories
-        products = [
-            {"name": "MacBook Pro 13\"", "category": "Electronics", "base_price": 1299.99},
-            {"name": "iPhone 14", "category": "Electronics", "base_price": 899.99},
-            {"name": "Samsung Galaxy S23", "category": "Electronics", "base_price": 799.99},
-            {"name": "Dell XPS 13", "category": "Electronics", "base_price": 999.99},
-            {"name": "Sony WH-1000XM4", "category": "Electronics", "base_price": 349.99},
-            {"name": "Nike Air Max 90", "category": "Footwear", "base_price": 119.99},
-            {"name": "Adidas Ultraboost 22", "category": "Footwear", "base_price": 179.99},
-            {"name": "Levi's 501 Jeans", "category": "Apparel", "base_price": 89.99},
-            {"name": "Patagonia Fleece", "category": "Apparel", "base_price": 149.99},
-            {"name": "Instant Pot Duo", "category": "Kitchen", "base_price": 79.99}
-        ]
+        products = self.DEMO_PRODUCTS
+        sites = self.DEMO_SITES
         
-        sites = ["Amazon", "Best Buy", "Target", "Walmart", "Newegg"]
+        remaining = {site: len(products[:num_products]) for site in sites}
+        position = 0
+        start = self._begin_checkpoint(['demo', len(products[:num_products]), sites])
         
         for product in products[:num_products]:
             for site in sites:
-                # Simulate price variations
-                price_variation = random.uniform(-0.2, 0.3)  # -20% to +30%
-                current_price = product["base_price"] * (1 + price_variation)
+                self.metrics.set_gauge('queue_depth', remaining[site], site=site)
+                remaining[site] -= 1
+                position += 1
+                if position <= start:
+                    continue
                 
-                # Simulate availability
-                availability = random.choice([True, True, True, False])  # 75% available
+                with self.metrics.time_stage('parse', site=site):
+                    # Simulate price variations
+                    price_variation = random.uniform(-0.2, 0.3)  # -20% to +30%
+                    current_price = product["base_price"] * (1 + price_variation)
                 
-                # Simulate discount info
-                discount = random.uniform(0, 0.25) if random.random() < 0.3 else 0
+                    # Simulate availability
+                    availability = random.choice([True, True, True, False])  # 75% available
                 
-                price_record = {
-                    'product_name': product["name"],
-                    'category': product["category"],
-                    'site': site,
-                    'current_price': round(current_price, 2),
-                    'original_price': product["base_price"],
-                    'discount_percentage': round(discount * 100, 1),
-                    'availability': availability,
-                    'stock_status': 'In Stock' if availability else 'Out of Stock',
-                    'price_change': round(current_price - product["base_price"], 2),
-                    'price_change_percent': round(((current_price - product["base_price"]) / product["base_price"]) * 100, 1),
-                    'last_updated': datetime.now().isoformat(),
-                    'scraped_at': datetime.now().isoformat()
-                }
+                    # Simulate discount info
+                    discount = random.uniform(0, 0.25) if random.random() < 0.3 else 0
                 
-                self.price_data.append(price_record)
+                    price_record = self.build_price_record(product, site, current_price, availability, discount)
+                
+                self.record_observation(product, site, price_record, position)
                 
                 # Progress indicator
                 if len(self.price_data) % 20 == 0:
@@ -111,9 +228,258 @@ class PriceMonitor:
                 # Respectful rate limiting
                 time.sleep(random.uniform(0.1, 0.3))
         
+        for site in sites:
+            self.metrics.set_gauge('queue_depth', 0, site=site)
+        if self.checkpoint is not None:
+            self.checkpoint.update(position, self._checkpoint_state, force=True)
+        self.alert_baseline_ready = True
         print(f"✅ Successfully monitored {len(self.price_data)} price points")
         return self.price_data
     
+    def generate_synthetic_price_data(self, count, seed=None):
+        """
+        Generate count synthetic price points in vectorized batches, without sleeps
+        For load-testing the stages after the fetch at production volumes
+        """
+        print(f"🧪 Generating {count:,} synthetic price points (seed {seed})")
+        products = {product['name']: product for product in self.DEMO_PRODUCTS}
+        first = len(self.price_data)
+        with self.metrics.time_stage('generate', site='synthetic'):
+            for batch in price_batches(count, self.DEMO_PRODUCTS, self.DEMO_SITES, seed=seed):
+                self.price_data.extend(batch)
+                self.metrics.record_records('synthetic', len(batch))
+                print(f"📊 Generated {len(self.price_data):,} price points...")
+        # Synthetic alerts are evaluated and coalesced in memory, never delivered
+        dispatcher = self.alerts
+        if dispatcher is not None:
+            self.alerts = AlertDispatcher([], enabled_types=dispatcher.enabled_types, metrics=self.metrics)
+        try:
+            with self.metrics.time_stage('alerts', site='synthetic'):
+                for record in itertools.islice(self.price_data, first, None):
+                    self.observe_price(products[record['product_name']], record['site'], record)
+        finally:
+            if dispatcher is not None:
+                self.alerts.stop()
+                self.alerts = dispatcher
+
+        print(f"✅ Successfully generated {len(self.price_data):,} price points")
+        return self.price_data
+    
+    def build_price_record(self, product, site, current_price, availability, discount=0):
+        """Build a price record for a product observed on a site"""
+        return {
+            'product_name': product["name"],
+            'category': product["category"],
+            'site': site,
+            'current_price': round(current_price, 2),
+            'original_price': product["base_price"],
+            'discount_percentage': round(discount * 100, 1),
+            'availability': availability,
+            'stock_status': 'In Stock' if availability else 'Out of Stock',
+            'price_change': round(current_price - product["base_price"], 2),
+            'price_change_percent': round(((current_price - product["base_price"]) / product["base_price"]) * 100, 1),
+            'last_updated': datetime.now().isoformat(),
+            'scraped_at': datetime.now().isoformat()
+        }
+    
+    def extract_price(self, soup):
+        """Extract the first price found on a product page"""
+        for selector in self.PRICE_SELECTORS:
+            element = soup.select_one(selector)
+            if element is None:
+                continue
+            text = element.get('content') or element.get_text()
+            match = re.search(r'\d[\d,]*(?:\.\d+)?', text)
+            if match:
+                return float(match.group(0).replace(',', ''))
+        return None
+    
+    def extract_first(self, soup, selectors):
+        """Text or content attribute of the first selector that matches, or None"""
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element is not None:
+                text = (element.get('content') or element.get_text()).strip()
+                if text:
+                    return text
+        return None
+    
+    def check_product_page(self, url, product, site=None):
+        """
+        Fetch a product page and record its price
+        Returns the new price record, or None when the page is unchanged or has no price
+        """
+        site = site or self.fetcher.site_for(url)
+        with self.fetcher.fetch_body(url, site=site) as body:
+            if self.fingerprints is not None and not self.fingerprints.check(url, body.view):
+                self.metrics.increment('pages_unchanged_total', site=site)
+                return None
+            # Raw bytes, so the parser sniffs <meta charset> itself when the header declares none
+            markup = body.tobytes()
+        
+        with self.metrics.time_stage('parse', site=site):
+            soup = BeautifulSoup(markup, 'html.parser', from_encoding=body.declared_encoding)
+            current_price = self.extract_price(soup)
+            if current_price is None:
+                if self.fingerprints is not None:
+                    self.fingerprints.forget(url)
+                return None
+            
+            availability = 'out of stock' not in soup.get_text(' ').lower()
+            price_record = self.build_price_record(product, site, current_price, availability)
+            price_record['url'] = url
+            price_record['listing_title'] = self.extract_first(soup, self.TITLE_SELECTORS)
+            price_record['gtin'] = self.extract_first(soup, self.GTIN_SELECTORS)
+        
+        self.record_observation(product, site, price_record)
+        return price_record
+    
+    def observe_price(self, product, site, price_record):
+        """Remember a price record as the latest observation of product on site and raise alerts"""
+        key = (product["name"], site)
+        previous_price = self.last_prices.get(key)
+        previous_availability = self.last_availability.get(key)
+        
+        self.last_prices[key] = price_record['current_price']
+        self.last_availability[key] = price_record['availability']
+        
+        if self.alerts is not None:
+            tracking = self.config.get('price_tracking', {})
+            alerts = price_alerts(
+                product, site, previous_price, previous_availability, price_record,
+                threshold_percent=tracking.get('alert_threshold_percent', 5.0),
+                minimum_change=tracking.get('minimum_price_change', 1.0),
+                is_new=self.alert_baseline_ready
+            )
+            if alerts:
+                self.alerts.start()
+                for alert in alerts:
+                    self.alerts.submit(alert)
+    
+    def load_last_seen(self):
+        """Load last-seen prices saved by a previous run; new-product alerts start once there are some"""
+        if not self.last_seen_file or not os.path.exists(self.last_seen_file):
+            return
+        with open(self.last_seen_file, 'r') as f:
+            for name, site, price, availability in json.load(f):
+                self.last_prices[(name, site)] = price
+                self.last_availability[(name, site)] = availability
+        self.alert_baseline_ready = bool(self.last_prices)
+    
+    def save_last_seen(self):
+        """Atomically write last-seen prices for the next run to compare against"""
+        if not self.last_seen_file:
+            return
+        directory = os.path.dirname(self.last_seen_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = f"{self.last_seen_file}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self._checkpoint_state()['last_seen'], f)
+        os.replace(temp_file, self.last_seen_file)
+    
+    def record_observation(self, product, site, price_record, position=None):
+        """
+        Store a price record, remember it as the latest observation and raise alerts
+        When checkpointing, the record is logged and position (by default one past
+        the last) saved with the last-seen prices
+        """
+        self.observe_price(product, site, price_record)
+        self.price_data.append(price_record)
+        self.metrics.record_records(site)
+        if self.checkpoint is not None and self.checkpoint.running:
+            self.checkpoint.add(price_record)
+            self.checkpoint.update(self.checkpoint.position + 1 if position is None else position,
+                                   self._checkpoint_state)
+    
+    def site_rate_limits(self):
+        """Minimum seconds between requests for each configured site"""
+        return {
+            site['name']: site.get('rate_limit', self.DEFAULT_RATE_LIMIT)
+            for site in self.config.get('target_ecommerce_sites', [])
+            if site.get('enabled', True)
+        }
+    
+    def check_demo_price(self, product, site):
+        """
+        Simulate a single price check for continuous monitoring
+        In production, this would fetch and parse the product page
+        """
+        key = (product["name"], site)
+        
+        with self.metrics.time_stage('parse', site=site):
+            previous_price = self.last_prices.get(key)
+            if previous_price is None:
+                current_price = product["base_price"] * (1 + random.uniform(-0.2, 0.3))
+            elif random.random() < self.DEMO_VOLATILITY.get(product["category"], 0.05):
+                current_price = previous_price * (1 + random.uniform(-0.1, 0.1))
+            else:
+                current_price = previous_price
+            
+            availability = random.random() < 0.9
+            price_record = self.build_price_record(product, site, current_price, availability)
+        
+        self.record_observation(product, site, price_record)
+        return current_price
+    
+    def run_daemon(self, num_products=20, duration=None, interval_seconds=None):
+        """
+        Continuously re-check prices, adapting each item's interval to its volatility
+        Only the latest daemon_max_records observations stay in price_data; with
+        checkpointing, every observation is also in the checkpoint log
+        """
+        settings = self.config.get('monitoring_settings', {})
+        scheduling = settings.get('adaptive_scheduling', {})
+        base_interval = interval_seconds or settings.get('check_interval_minutes', 60) * 60
+        max_records = settings.get('daemon_max_records', 100000)
+        
+        scheduler = self.scheduler = PriceCheckScheduler(
+            base_interval,
+            min_interval=base_interval * scheduling.get('min_interval_factor', 0.1),
+            max_interval=base_interval * scheduling.get('max_interval_factor', 24),
+            site_spacing=self.site_rate_limits(),
+            default_spacing=self.DEFAULT_RATE_LIMIT,
+            jitter=scheduling.get('jitter', 0.1),
+            min_change=self.config.get('price_tracking', {}).get('minimum_price_change', 1.0),
+            speedup_factor=scheduling.get('speedup_factor', 0.5),
+            slowdown_factor=scheduling.get('slowdown_factor', 1.25),
+            volatility_scale=scheduling.get('volatility_scale_percent', 5.0)
+        )
+        
+        max_per_site = settings.get('max_products_per_site', 500)
+        products = self.DEMO_PRODUCTS[:min(num_products, max_per_site)]
+        for site in self.DEMO_SITES:
+            for product in products:
+                scheduler.add(product, site)
+        self._begin_checkpoint(['daemon', len(products), self.DEMO_SITES])
+        del self.price_data[:-max_records]
+        
+        print(f"⏱️  Scheduling {len(scheduler)} product/site pairs every ~{base_interval / 60:.1f} minutes")
+        
+        def check(product, site):
+            price = self.check_demo_price(product, site)
+            if len(self.price_data) > max_records:
+                # Trim in chunks so the list is not shifted on every check
+                del self.price_data[:len(self.price_data) - max_records // 2]
+            # New-product alerts only make sense once every scheduled item has a baseline
+            if not self.alert_baseline_ready and len(self.last_prices) >= len(scheduler):
+                self.alert_baseline_ready = True
+            return price
+        
+        try:
+            scheduler.run(check, duration=duration)
+        except KeyboardInterrupt:
+            print("\n🛑 Monitoring stopped")
+        finally:
+            if self.fingerprints is not None:
+                self.fingerprints.save()
+            if self.checkpoint is not None and self.checkpoint.running:
+                self.checkpoint.update(self.checkpoint.position, self._checkpoint_state, force=True)
+        
+        stats = scheduler.stats()
+        print(f"✅ {stats.get('checks', 0)} checks, {stats.get('changes', 0)} price changes detected")
+        return stats
+    
     def detect_price_changes(self, threshold=0.05):
         """Detect significant price changes"""
         changes = []
@@ -125,6 +491,50 @@ class PriceMonitor:
         
         return changes
     
+    def match_products(self):
+        """Give every record the canonical product_id of its listing, kept across runs in the product index"""
+        settings = self.config.get('product_matching', {})
+        if not self.price_data or not settings.get('enabled', False):
+            return
+        
+        index = ProductIndex(
+            settings.get('store_file', 'data/product_index.json'),
+            threshold=settings.get('threshold', 0.6),
+            brands=settings.get('brands', [])
+        )
+        known = len(index)
+        matches = {}
+        with self.metrics.time_stage('normalize'):
+            for record in self.price_data:
+                listing = (record.get('listing_title') or record['product_name'], record.get('category'),
+                           record.get('brand'), record.get('gtin'))
+                if listing not in matches:
+                    matches[listing] = index.match(*listing)
+                record['product_id'], record['match_method'] = matches[listing]
+        index.save()
+        print(f"🔗 Matched {len(matches)} distinct listings to {len({product_id for product_id, _ in matches.values()})} "
+              f"products ({len(index) - known} new, {len(index)} in index)")
+    
+    def competitor_comparison(self):
+        """Latest price of each matched product on every site, cheapest site and price spread"""
+        df = pd.DataFrame(self.price_data)
+        if 'product_id' not in df.columns:
+            return pd.DataFrame()
+        
+        latest = df.sort_values('last_updated').groupby(['product_id', 'site'], as_index=False).last()
+        grouped = latest.groupby('product_id')
+        comparison = pd.DataFrame({
+            'product': grouped['product_name'].first(),
+            'sites': grouped['site'].nunique(),
+            'min_price': grouped['current_price'].min(),
+            'max_price': grouped['current_price'].max(),
+            'cheapest_site': latest.loc[grouped['current_price'].idxmin()].set_index('product_id')['site']
+        })
+        comparison = comparison[comparison['sites'] > 1]
+        comparison['spread_percent'] = ((comparison['max_price'] - comparison['min_price'])
+                                        / comparison['min_price'] * 100).round(1)
+        return comparison.sort_values('spread_percent', ascending=False)
+    
     def export_data(self, output_format='csv', filename=None):
         """Export price data to specified format"""
         if not self.price_data:
@@ -135,22 +545,63 @@ class PriceMonitor:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"data/price_monitor_{timestamp}"
         
-        df = pd.DataFrame(self.price_data)
+        # Excel and JSON Lines rows are streamed from the records; no DataFrame is built for them
+        if output_format.lower() not in ('excel', 'jsonl'):
+            with self.metrics.time_stage('record_build'):
+                df = pd.DataFrame(self.price_data)
         
-        if output_format.lower() == 'csv':
-            output_file = f"{filename}.csv"
-            df.to_csv(output_file, index=False)
-        elif output_format.lower() == 'json':
-            output_file = f"{filename}.json"
-            df.to_json(output_file, orient='records', indent=2)
-        elif output_format.lower() == 'excel':
-            output_file = f"{filename}.xlsx"
-            df.to_excel(output_file, index=False)
+        with self.metrics.time_stage('export'):
+            if output_format.lower() == 'csv':
+                output_file = f"{filename}.csv"
+                df.to_csv(output_file, index=False)
+            elif output_format.lower() == 'json':
+                output_file = f"{filename}.json"
+                df.to_json(output_file, orient='records', indent=2)
+            elif output_format.lower() == 'jsonl':
+                output_settings = self.config.get('output_settings', {})
+                compression = output_settings.get('jsonl_compression') or (
+                    'gzip' if output_settings.get('compress_output') else None)
+                output_file = jsonl_path(filename, compression)
+                write_jsonl(self.price_data, output_file, compression)
+            elif output_format.lower() == 'excel':
+                output_file = f"{filename}.xlsx"
+                summary_sheet = self.config.get('output_settings', {}).get('include_summary_stats', True)
+                write_excel(self.price_data, output_file,
+                            summary=self.report_summary() if summary_sheet else None)
         
         print(f"💾 Price data exported to: {output_file}")
         print(f"📊 Total records: {len(self.price_data)}")
         return output_file
     
+    def load_data(self, path):
+        """Append price records from a previous JSON Lines export, streamed record by record"""
+        before = len(self.price_data)
+        self.price_data.extend(read_jsonl(path))
+        print(f"📂 Loaded {len(self.price_data) - before} price records from {path}")
+        return self.price_data
+    
+    def report_summary(self):
+        """Report aggregates as (metric, value) rows for the Excel summary sheet"""
+        available = sum(1 for record in self.price_data if record['availability'])
+        site_totals = {}
+        for record in self.price_data:
+            total, count = site_totals.get(record['site'], (0.0, 0))
+            site_totals[record['site']] = (total + record['current_price'], count + 1)
+        
+        rows = [
+            ('Total price points monitored', len(self.price_data)),
+            ('Unique products', len({record['product_name'] for record in self.price_data})),
+            ('Sites monitored', len(site_totals)),
+            ('Average price', round(sum(record['current_price'] for record in self.price_data) / len(self.price_data), 2)),
+            ('Significant price changes', len(self.detect_price_changes(0.1))),
+            ('Products available', available),
+            ('Products out of stock', len(self.price_data) - available)
+        ]
+        if any('product_id' in record for record in self.price_data):
+            rows.append(('Matched products', len({record.get('product_id') for record in self.price_data})))
+        rows += [(f"Average price: {site}", round(total / count, 2)) for site, (total, count) in sorted(site_totals.items())]
+        return rows
+    
     def generate_report(self):
         """Generate price monitoring summary report"""
         if not self.price_data:
@@ -186,6 +637,12 @@ class PriceMonitor:
         top_drops = df.nsmallest(5, 'price_change_percent')[['product_name', 'site', 'price_change_percent']]
         print(top_drops.to_string(index=False))
         
+        if self.config.get('reporting', {}).get('competitor_comparison', False):
+            comparison = self.competitor_comparison()
+            if not comparison.empty:
+                print("\n🏁 Competitor Comparison (widest price spreads):")
+                print(comparison.head(10).to_string())
+        
         print("="*50)
 
 def main():
@@ -193,26 +650,79 @@ def main():
     parser = argparse.ArgumentParser(description='Professional Price Monitor Toolkit')
     parser.add_argument('--products', type=int, default=20, 
                        help='Number of products to monitor')
-    parser.add_argument('--output', choices=['csv', 'json', 'excel'], default='csv',
+    parser.add_argument('--output', choices=['csv', 'json', 'jsonl', 'excel'], default='csv',
                        help='Output format')
     parser.add_argument('--config', default='config/price_monitor_config.json',
                        help='Configuration file path')
     parser.add_argument('--threshold', type=float, default=0.1,
                        help='Price change threshold for alerts')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Monitor continuously with adaptive re-check intervals')
+    parser.add_argument('--interval', type=int,
+                       help='Base re-check interval in seconds (overrides check_interval_minutes)')
+    parser.add_argument('--duration', type=int,
+                       help='Stop daemon mode after this many seconds')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run from its last checkpoint')
+    parser.add_argument('--load',
+                       help='Re-export and re-report records from a previous .jsonl export instead of scraping')
+    parser.add_argument('--synthetic', type=int, metavar='COUNT',
+                       help='Generate COUNT synthetic records in vectorized batches to load-test the stages after the fetch')
+    parser.add_argument('--seed', type=int,
+                       help='Random seed for --synthetic, for reproducible benchmarks')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port while running')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile each stage and write flame-graph output to data/')
     
     args = parser.parse_args()
     
+    profiler = Profiler('price_monitor') if args.profile else None
+    if profiler:
+        profiler.start()
+    
     # Initialize monitor
     monitor = PriceMonitor(args.config)
+    if args.resume or monitor.config.get('checkpointing', {}).get('enabled', False):
+        monitor.enable_checkpoints(args.resume)
+    metrics_port = args.metrics_port or monitor.config.get('monitoring', {}).get('metrics_port')
+    if metrics_port:
+        monitor.metrics.start_server(metrics_port)
     
     # Generate demo data
-    monitor.generate_demo_price_data(args.products)
+    if args.load:
+        monitor.load_data(args.load)
+    elif args.synthetic:
+        monitor.generate_synthetic_price_data(args.synthetic, args.seed)
+    elif args.daemon:
+        monitor.run_daemon(args.products, args.duration, args.interval)
+    else:
+        monitor.generate_demo_price_data(args.products)
     
-    # Export data
+    # Match listings across sites and export data
+    monitor.match_products()
     monitor.export_data(args.output)
+    if not (args.load or args.synthetic):
+        monitor.save_last_seen()
+    if monitor.fingerprints is not None:
+        monitor.fingerprints.save()
+    if monitor.checkpoint is not None:
+        monitor.checkpoint.finish()
+    if monitor.alerts is not None:
+        monitor.alerts.stop()
     
     # Generate report
-    monitor.generate_report()
+    with monitor.metrics.time_stage('report'):
+        monitor.generate_report()
+    
+    # Persist performance metrics
+    if monitor.config.get('monitoring', {}).get('track_performance'):
+        monitor.metrics.write_snapshot()
+    monitor.metrics.stop_server()
+    
+    if profiler:
+        profiler.stop()
+        profiler.write()
     
     print("\n🎉 Price monitoring completed successfully!")
 
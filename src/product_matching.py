@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+_UNIT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(gb|tb|mb|mah|mm|cm|ml|oz|lb|lbs|kg|w|hz|in|inch|inches|")(?![a-z0-9])')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:\.[0-9]+)?')
+_GTIN_PATTERN = re.compile(r'(?<!\d)(\d{8}|\d{12,14})(?!\d)')
+_MODEL_PATTERN = re.compile(r'\b(?=[A-Za-z0-9-]*\d)(?=[A-Za-z0-9-]*[A-Za-z])[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*\b')
+
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'with', 'for', 'of', 'in', 'by', 'new', 'brand', 'edition',
+    'free', 'shipping', 'sale', 'pack', 'pcs', 'color', 'size', 'version'
+}
+UNIT_NAMES = {'inch': 'in', 'inches': 'in', '"': 'in', 'lbs': 'lb'}
+
+# Shortest model number worth trusting, hyphens not counted
+MIN_MODEL_LENGTH = 5
+
+# MinHash/LSH shape: BANDS x ROWS hash functions. Titles with Jaccard
+# similarity 0.6 share a band about 90% of the time, at 0.3 about 8%.
+BANDS = 10
+ROWS = 3
+_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(42)
+_HASH_A = _rng.randint(1, 1 << 32, size=BANDS * ROWS, dtype=np.uint64)
+_HASH_B = _rng.randint(0, 1 << 32, size=BANDS * ROWS, dtype=np.uint64)
+_BAND_SALT = _rng.randint(0, np.iinfo(np.int64).max, size=BANDS, dtype=np.uint64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+# Token sets hashed per numpy batch when loading a catalog
+SIGNATURE_BATCH = 20000
+
+
+def valid_gtin(digits):
+    """Whether a digit string is a GTIN-8/12/13/14 with a correct check digit"""
+    if len(digits) not in (8, 12, 13, 14) or not digits.isdigit():
+        return False
+    body, check = digits[:-1], int(digits[-1])
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1) for position, digit in enumerate(reversed(body)))
+    return (10 - total % 10) % 10 == check
+
+
+def extract_gtin(text):
+    """First valid GTIN/UPC/EAN in text, as 14 digits, or None"""
+    for match in _GTIN_PATTERN.finditer(text or ''):
+        if valid_gtin(match.group(1)):
+            return match.group(1).zfill(14)
+    return None
+
+
+def extract_model(text):
+    """First token that looks like a model number (letters and digits, e.g. WH-1000XM4), or None"""
+    for match in _MODEL_PATTERN.finditer(text or ''):
+        model = match.group(0).replace('-', '').upper()
+        # Sizes and capacities (128GB, 13in) mix letters and digits too
+        if len(model) >= MIN_MODEL_LENGTH and not model.isdigit() and not _UNIT_PATTERN.fullmatch(model.lower()):
+            return model
+    return None
+
+
+def tokenize(title):
+    """Normalized, order-free token set of a product title"""
+    text = _UNIT_PATTERN.sub(lambda m: m.group(1) + UNIT_NAMES.get(m.group(2), m.group(2)), (title or '').lower())
+    # "WH-1000XM4" and "WH1000XM4", "Wi-Fi" and "WiFi" are the same token
+    text = re.sub(r"(?<=[a-z0-9])-(?=[a-z0-9])|'", '', text)
+    return frozenset(token for token in _TOKEN_PATTERN.findall(text) if token not in STOPWORDS)
+
+
+def _numeric(tokens):
+    return {token for token in tokens if any(char.isdigit() for char in token)}
+
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+class ProductIndex:
+    """Persistent catalog assigning canonical product IDs to listings from different sites"""
+
+    def __init__(self, path, threshold=0.6, brands=None):
+        """
+        Load the catalog from path if it exists
+
+        Listings match on GTIN, then model number, then MinHash-LSH candidates
+        whose title token Jaccard similarity reaches threshold. Candidates are
+        blocked by category, must agree on brand when both are known, and may
+        not carry numbers (sizes, capacities, generations) the other lacks.
+        brands is a list of known brand names used to recognise the brand in a
+        title when a listing does not give one.
+        """
+        self.path = path
+        self.threshold = threshold
+        self.brands = {brand.lower() for brand in (brands or [])}
+        self.products = {}
+        self.by_gtin = {}
+        self.by_model = {}
+        self._buckets = defaultdict(dict)
+        self._tokens = {}
+        self._hashes = {}
+        self._next_id = 1
+        self._dirty = False
+
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self._next_id = data.get('next_id', 1)
+            products = data.get('products', {})
+            token_sets = [tokenize(product['title']) for product in products.values()]
+            keyed = [tokens for tokens in token_sets if tokens]
+            band_keys = iter(self._band_keys(keyed))
+            for (product_id, product), tokens in zip(products.items(), token_sets):
+                self._add(product_id, product, tokens, next(band_keys) if tokens else ())
+
+    def __len__(self):
+        return len(self.products)
+
+    def _brand(self, brand, tokens):
+        if brand:
+            return brand.lower()
+        return next((token for token in tokens if token in self.brands), '')
+
+    def _hash(self, token):
+        value = self._hashes.get(token)
+        if value is None:
+            value = self._hashes[token] = _token_hash(token)
+        return value
+
+    def _band_keys(self, token_sets):
+        """
+        LSH bucket keys of each token set, BANDS ints per set
+
+        MinHash signatures are computed for a whole batch at once: every token
+        hash goes through all BANDS * ROWS hash functions in one array
+        operation, then minimum.reduceat takes the minimum per token set.
+        Each band's ROWS values fold into one salted 64-bit key.
+        """
+        keys = []
+        for start in range(0, len(token_sets), SIGNATURE_BATCH):
+            batch = token_sets[start:start + SIGNATURE_BATCH]
+            lengths = np.fromiter((len(tokens) for tokens in batch), dtype=np.int64, count=len(batch))
+            hashes = np.fromiter((self._hash(token) for tokens in batch for token in tokens),
+                                 dtype=np.uint64, count=int(lengths.sum()))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            signatures = np.minimum.reduceat((hashes[:, None] * _HASH_A + _HASH_B) % _PRIME, offsets, axis=0)
+            bands = signatures.reshape(len(batch), BANDS, ROWS)
+            folded = bands[:, :, 0]
+            for row in range(1, ROWS):
+                folded = folded * _MIX ^ bands[:, :, row]
+            keys.extend((folded ^ _BAND_SALT).tolist())
+        return keys
+
+    def _add(self, product_id, product, tokens, band_keys):
+        self.products[product_id] = product
+        self._tokens[product_id] = tokens
+        for gtin in product.get('gtins', []):
+            self.by_gtin[gtin] = product_id
+        if product.get('model'):
+            self.by_model.setdefault(product['model'], product_id)
+        buckets = self._buckets[(product.get('category') or '').lower()]
+        for key in band_keys:
+            buckets.setdefault(key, []).append(product_id)
+
+    def _compatible(self, product_id, tokens, brand):
+        product = self.products[product_id]
+        if brand and product.get('brand') and brand != product['brand']:
+            return False
+        known = self._tokens[product_id]
+        # Every number on the shorter title (128gb, 13in, 14) must appear on the other
+        shorter, longer = (tokens, known) if len(tokens) <= len(known) else (known, tokens)
+        return _numeric(shorter) <= _numeric(longer)
+
+    def match(self, title, category=None, brand=None, gtin=None):
+        """
+        Canonical product ID for a listing and how it was found
+
+        Returns (product_id, method) with method 'gtin', 'model', 'similar' or
+        'new'. Unmatched listings are added to the catalog under a new ID.
+        """
+        gtin = str(gtin).zfill(14) if gtin and valid_gtin(str(gtin)) else extract_gtin(title)
+        if gtin and gtin in self.by_gtin:
+            return self.by_gtin[gtin], 'gtin'
+
+        model = extract_model(title)
+        tokens = tokenize(title)
+        brand = self._brand(brand, tokens)
+        if model and model in self.by_model and self._compatible(self.by_model[model], tokens, brand):
+            return self._remember(self.by_model[model], gtin), 'model'
+
+        band_keys = self._band_keys([tokens])[0] if tokens else ()
+        buckets = self._buckets.get((category or '').lower(), {})
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in band_keys:
+            for product_id in buckets.get(key, ()):
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                known = self._tokens[product_id]
+                score = len(tokens & known) / len(tokens | known)
+                if score >= best_score and self._compatible(product_id, tokens, brand):
+                    best, best_score = product_id, score
+        if best is not None:
+            return self._remember(best, gtin), 'similar'
+
+        product_id = f"P{self._next_id:07d}"
+        self._next_id += 1
+        self._add(product_id, {
+            'title': title,
+            'category': category,
+            'brand': brand,
+            'gtins': [gtin] if gtin else [],
+            'model': model,
+            'first_seen': datetime.now().isoformat()
+        }, tokens, band_keys)
+        self._dirty = True
+        return product_id, 'new'
+
+    def _remember(self, product_id, gtin):
+        """Attach a newly seen GTIN to an existing product"""
+        if gtin and gtin not in self.by_gtin:
+            self.by_gtin[gtin] = product_id
+            self.products[product_id]['gtins'].append(gtin)
+            self._dirty = True
+        return product_id
+
+    def save(self):
+        """Atomically write the catalog back to disk"""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({'next_id': self._next_id, 'products': self.products}, f)
+        os.replace(temp_file, self.path)
+        self._dirty = False
@@ -0,0 +1,155 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Profiler for the current run, set by Profiler.start()
+_active_profiler = None
+
+
+def profile_stage(stage):
+    """Context manager attributing work to a stage of the active profiler, if any"""
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.stage(stage)
+
+
+class Profiler:
+    """Per-stage cProfile, stack sampling and tracemalloc profiling for a run"""
+
+    def __init__(self, name, output_dir='data', sample_interval=0.005):
+        """Initialize profiler; output files are prefixed with name and a timestamp"""
+        self.name = name
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.profiles = {}
+        self.stage_seconds = Counter()
+        self.stage_peak_bytes = {}
+        self.samples = Counter()
+        self.peak_bytes = 0
+        self._stages = ['main']
+        # Highest tracemalloc peak seen by each open stage before its last peak reset
+        self._peaks = [0]
+        self._thread_id = None
+        self._sampler = None
+        self._running = threading.Event()
+        self._started_at = None
+
+    def _profile_for(self, stage):
+        if stage not in self.profiles:
+            self.profiles[stage] = cProfile.Profile()
+        return self.profiles[stage]
+
+    def start(self):
+        """Begin profiling the calling thread"""
+        global _active_profiler
+        _active_profiler = self
+
+        self._thread_id = threading.get_ident()
+        self._started_at = time.perf_counter()
+        tracemalloc.start()
+
+        self._running.set()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        self._sampler.start()
+
+        self._profile_for('main').enable()
+        print(f"🔬 Profiling enabled for {self.name}")
+
+    def stop(self):
+        """Stop profiling and record overall peak memory"""
+        global _active_profiler
+
+        self._profile_for(self._stages[-1]).disable()
+        self._running.clear()
+        self._sampler.join()
+
+        self.stage_seconds['total'] = time.perf_counter() - self._started_at
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes = max([peak, self._peaks[0]] + list(self.stage_peak_bytes.values()))
+        tracemalloc.stop()
+
+        if _active_profiler is self:
+            _active_profiler = None
+
+    @contextmanager
+    def stage(self, stage):
+        """Switch cProfile collection to a stage for the duration of the block"""
+        # Only one cProfile.Profile may be enabled at a time, so nested stages
+        # pause the enclosing stage's profile and resume it on exit.
+        if threading.get_ident() != self._thread_id:
+            yield
+            return
+
+        self._profile_for(self._stages[-1]).disable()
+        # reset_peak() would lose the enclosing stage's peak so far; keep it aside.
+        # The stage's own peak still counts toward the enclosing one, since the
+        # traced peak is not reset again when it ends.
+        _, peak = tracemalloc.get_traced_memory()
+        self._peaks[-1] = max(self._peaks[-1], peak)
+        self._stages.append(stage)
+        self._peaks.append(0)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        self._profile_for(stage).enable()
+        try:
+            yield
+        finally:
+            self._profile_for(stage).disable()
+            self.stage_seconds[stage] += time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peaks.pop())
+            self.stage_peak_bytes[stage] = max(self.stage_peak_bytes.get(stage, 0), peak)
+            self._stages.pop()
+            self._profile_for(self._stages[-1]).enable()
+
+    def _sample_loop(self):
+        """Collect folded call stacks of the profiled thread, rooted at the current stage"""
+        while self._running.is_set():
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(self._stages[-1])
+                self.samples[';'.join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+    def write(self):
+        """Write folded stacks, per-stage pstats dumps and a JSON summary; return the base path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.output_dir, f"profile_{self.name}_{timestamp}")
+
+        # Brendan Gregg's collapsed format, readable by flamegraph.pl and speedscope
+        with open(f"{base}.folded", 'w') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        for stage, profile in self.profiles.items():
+            profile.dump_stats(f"{base}_{stage}.prof")
+
+        summary = {
+            'name': self.name,
+            'generated_at': datetime.now().isoformat(),
+            'sample_interval_seconds': self.sample_interval,
+            'samples': sum(self.samples.values()),
+            'peak_memory_bytes': self.peak_bytes,
+            'stage_seconds': {stage: round(seconds, 6) for stage, seconds in self.stage_seconds.items()},
+            'stage_peak_memory_bytes': self.stage_peak_bytes
+        }
+        with open(f"{base}.json", 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        print(f"🔬 Profile written to: {base}.folded")
+        print(f"🧠 Peak memory: {self.peak_bytes / (1024 * 1024):.1f} MB")
+        return base
@@ -0,0 +1,197 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+
+class NoProxyAvailable(requests.RequestException):
+    """No proxy became free before the acquire timeout"""
+
+
+class Proxy:
+    """One egress proxy with its health statistics and in-flight count"""
+
+    __slots__ = ('url', 'name', 'proxies', 'max_concurrency', 'in_flight', 'latency', 'success',
+                 'failures', 'strikes', 'cooldown_until', 'requests', 'cooldowns')
+
+    def __init__(self, url, max_concurrency):
+        self.url = url
+        parsed = urlparse(url)
+        # Label without credentials, for metrics and reports
+        self.name = f"{parsed.hostname}:{parsed.port}" if parsed.port else (parsed.hostname or url)
+        self.proxies = {'http': url, 'https': url}
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.latency = None
+        self.success = 1.0
+        self.failures = 0
+        self.strikes = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.cooldowns = 0
+
+    def health(self, default_latency=1.0):
+        """Success rate per second of latency; proxies not yet measured get default_latency"""
+        latency = self.latency if self.latency is not None else default_latency
+        return self.success / max(latency, 0.01)
+
+
+class ProxyPool:
+    """Thread-safe pool of egress proxies chosen by health within per-proxy concurrency limits"""
+
+    THROTTLE_STATUS_CODES = {403, 429}
+
+    def __init__(self, proxies, max_concurrency=4, cooldown_seconds=30, max_cooldown_seconds=600,
+                 max_failures=3, sticky=False, smoothing=0.2, acquire_timeout=None,
+                 clock=time.monotonic, seed=None):
+        """
+        Initialize pool from proxy URLs, or dicts with "url" and "max_concurrency"
+
+        Each proxy carries at most max_concurrency requests at once. A 403/429
+        response, or max_failures errors in a row, cools the proxy down for
+        cooldown_seconds, doubling on each further cooldown without a success
+        in between, up to max_cooldown_seconds. Free proxies are picked at
+        random weighted by health: the moving averages (weight smoothing) of
+        success rate over latency. With sticky, each host keeps the proxy it
+        was first given until that proxy cools down.
+        """
+        self.proxies = []
+        for entry in proxies:
+            if isinstance(entry, str):
+                entry = {'url': entry}
+            self.proxies.append(Proxy(entry['url'], entry.get('max_concurrency', max_concurrency)))
+        if not self.proxies:
+            raise ValueError("ProxyPool needs at least one proxy")
+
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.max_failures = max_failures
+        self.sticky = sticky
+        self.smoothing = smoothing
+        self.acquire_timeout = acquire_timeout
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._pinned = {}
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Build a pool from a proxy_pool config section, or None when disabled or empty"""
+        if not settings.get('enabled', False) or not settings.get('proxies'):
+            return None
+        return cls(
+            settings['proxies'],
+            max_concurrency=settings.get('max_concurrency_per_proxy', 4),
+            cooldown_seconds=settings.get('cooldown_seconds', 30),
+            max_cooldown_seconds=settings.get('max_cooldown_seconds', 600),
+            max_failures=settings.get('max_failures', 3),
+            sticky=settings.get('sticky_per_host', False),
+            acquire_timeout=settings.get('acquire_timeout_seconds')
+        )
+
+    def __len__(self):
+        return len(self.proxies)
+
+    def healthy_count(self):
+        """Proxies not cooling down right now"""
+        now = self.clock()
+        with self._condition:
+            return sum(1 for proxy in self.proxies if proxy.cooldown_until <= now)
+
+    def _default_latency(self):
+        measured = [proxy.latency for proxy in self.proxies if proxy.latency is not None]
+        return sum(measured) / len(measured) if measured else 1.0
+
+    def _choose(self, host, now):
+        if self.sticky and host in self._pinned:
+            pinned = self._pinned[host]
+            if pinned.cooldown_until <= now:
+                # Wait for the host's own proxy rather than switching egress IP
+                return pinned if pinned.in_flight < pinned.max_concurrency else None
+            del self._pinned[host]
+
+        free = [proxy for proxy in self.proxies
+                if proxy.cooldown_until <= now and proxy.in_flight < proxy.max_concurrency]
+        if not free:
+            return None
+        default_latency = self._default_latency()
+        proxy = self._random.choices(free, weights=[proxy.health(default_latency) for proxy in free])[0]
+        if self.sticky and host:
+            self._pinned[host] = proxy
+        return proxy
+
+    def acquire(self, host=None, timeout=None):
+        """
+        Reserve a proxy for one request to host, waiting while all are busy or cooling down
+
+        Raises NoProxyAvailable after timeout seconds (acquire_timeout by default).
+        Every acquire must be paired with a release().
+        """
+        timeout = timeout if timeout is not None else self.acquire_timeout
+        deadline = self.clock() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                now = self.clock()
+                proxy = self._choose(host, now)
+                if proxy is not None:
+                    proxy.in_flight += 1
+                    return proxy
+
+                # Wake on a release, or when the first cooldown ends
+                cooling = [proxy.cooldown_until for proxy in self.proxies if proxy.cooldown_until > now]
+                wait = min(cooling) - now if cooling else None
+                if deadline is not None:
+                    if deadline <= now:
+                        raise NoProxyAvailable(f"No proxy available for {host} within {timeout}s")
+                    wait = min(wait, deadline - now) if wait is not None else deadline - now
+                self._condition.wait(wait)
+
+    def release(self, proxy, status=None, latency=None):
+        """
+        Return a proxy and record the outcome of its request
+
+        status is the HTTP status code, or None when the request failed
+        without a response. Returns True if the proxy was put in cooldown.
+        """
+        with self._condition:
+            proxy.in_flight -= 1
+            proxy.requests += 1
+            throttled = status in self.THROTTLE_STATUS_CODES
+            succeeded = status is not None and status < 500 and not throttled
+            proxy.success += self.smoothing * ((1.0 if succeeded else 0.0) - proxy.success)
+            if succeeded and latency is not None:
+                proxy.latency = latency if proxy.latency is None else (
+                    proxy.latency + self.smoothing * (latency - proxy.latency))
+
+            cooled = False
+            if succeeded:
+                proxy.failures = 0
+                proxy.strikes = 0
+            else:
+                proxy.failures += 1
+                if throttled or proxy.failures >= self.max_failures:
+                    cooldown = min(self.cooldown_seconds * 2 ** proxy.strikes, self.max_cooldown_seconds)
+                    proxy.cooldown_until = self.clock() + cooldown
+                    proxy.strikes += 1
+                    proxy.cooldowns += 1
+                    cooled = True
+            self._condition.notify_all()
+            return cooled
+
+    def stats(self):
+        """Per-proxy health snapshot: name, in_flight, health, success, latency, requests, cooldowns, cooling"""
+        now = self.clock()
+        with self._condition:
+            default_latency = self._default_latency()
+            return [{
+                'name': proxy.name,
+                'in_flight': proxy.in_flight,
+                'health': round(proxy.health(default_latency), 3),
+                'success': round(proxy.success, 3),
+                'latency': round(proxy.latency, 4) if proxy.latency is not None else None,
+                'requests': proxy.requests,
+                'cooldowns': proxy.cooldowns,
+                'cooling': proxy.cooldown_until > now
+            } for proxy in self.proxies]
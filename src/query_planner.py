@@ -0,0 +1,209 @@
+import re
+from collections import OrderedDict, defaultdict
+from itertools import zip_longest
+from typing import Dict, FrozenSet, List
+
+STOPWORDS = {'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with'}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9+#.]+')
+
+
+def normalize_terms(keywords) -> FrozenSet[str]:
+    """Order-insensitive term set for a keyword phrase or list of keywords"""
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    tokens = set()
+    for keyword in keywords:
+        tokens.update(token.strip('.') for token in _TOKEN_PATTERN.findall(keyword.lower()))
+    return frozenset(token for token in tokens if token and token not in STOPWORDS)
+
+
+def text_terms(text) -> FrozenSet[str]:
+    """Whole-word terms of free text, tokenized like normalize_terms; plurals also count as singular"""
+    tokens = {token.strip('.') for token in _TOKEN_PATTERN.findall(text.lower())}
+    return frozenset(tokens | {token[:-1] for token in tokens if len(token) > 3 and token.endswith('s')})
+
+
+def normalize_location(location):
+    """Canonical form of a free-text search location"""
+    return ' '.join(location.lower().replace(',', ' ').split())
+
+
+class SearchFetch:
+    """One search result page request against one site"""
+
+    __slots__ = ('site', 'terms', 'keywords', 'location', 'page')
+
+    def __init__(self, site, terms, keywords, location, page=0):
+        self.site = site
+        self.terms = terms
+        self.keywords = keywords
+        self.location = location
+        self.page = page
+
+    @property
+    def key(self):
+        return (self.site, self.terms, self.location, self.page)
+
+    def __repr__(self):
+        return f"SearchFetch({self.site!r}, {self.keywords!r}, {self.location!r}, page={self.page})"
+
+
+class QueryPlan:
+    """Deduplicated, budgeted and site-interleaved execution plan for a search grid"""
+
+    def __init__(self, queries, fetches, naive_requests, dropped_requests):
+        self.queries = queries
+        self.fetches = fetches
+        self.naive_requests = naive_requests
+        self.dropped_requests = dropped_requests
+
+    @staticmethod
+    def matches(job, terms, experience_level=None):
+        """Whether a fetched job satisfies a query's terms, as whole words, and experience level"""
+        if terms and not terms <= text_terms(f"{job.get('title', '')} {job.get('description', '')}"):
+            return False
+        level = (job.get('experience_level') or '').lower()
+        # Boards that don't expose the level keep the job for every level
+        return experience_level is None or not level or level == experience_level.lower()
+
+    def execute(self, fetch_page):
+        """
+        Run the plan with fetch_page(SearchFetch) -> list of jobs
+
+        Each result page is fetched once and shared by every query it serves.
+        Returns {query label: list of matching jobs}.
+        """
+        pages = {}
+        for fetch in self.fetches:
+            pages[fetch.key] = fetch_page(fetch) or []
+
+        results = OrderedDict()
+        for query in self.queries:
+            seen = set()
+            matched = []
+            for key in query['fetch_keys']:
+                for job in pages.get(key, []):
+                    identity = (job.get('title'), job.get('company'), job.get('location'), key[0])
+                    if identity in seen:
+                        continue
+                    # Only terms the site search did not already enforce are checked locally
+                    if not self.matches(job, query['terms'] - query['fetch_terms'], query['experience_level']):
+                        continue
+                    seen.add(identity)
+                    matched.append(job)
+            results[query['label']] = matched
+        return results
+
+    def summary(self):
+        """Request counts for the naive grid versus this plan"""
+        by_site = defaultdict(int)
+        for fetch in self.fetches:
+            by_site[fetch.site] += 1
+        return {
+            'queries': len(self.queries),
+            'naive_requests': self.naive_requests,
+            'planned_requests': len(self.fetches),
+            'dropped_by_budget': self.dropped_requests,
+            'requests_by_site': dict(by_site)
+        }
+
+
+class QueryPlanner:
+    """Expand keyword x location x experience grids into a minimal set of site searches"""
+
+    def __init__(self, sites, max_requests_per_site=None, pages_per_query=1, subsume_narrower=False):
+        """
+        Initialize planner
+
+        With subsume_narrower, a query whose terms are a superset of another
+        requested query at the same location ("python developer" vs "python") is
+        answered by filtering the broader query's results instead of being fetched.
+        That saves requests but costs recall: only the broader query's first
+        pages_per_query pages are filtered, and most narrower matches rank lower.
+        """
+        self.sites = list(sites)
+        self.max_requests_per_site = max_requests_per_site
+        self.pages_per_query = max(1, pages_per_query)
+        self.subsume_narrower = subsume_narrower
+
+    def plan(self, keyword_list, locations, experience_levels=None) -> QueryPlan:
+        """Build a plan for every combination of keywords, locations and experience levels"""
+        levels = list(experience_levels) if experience_levels else [None]
+
+        # Distinct term sets per location, keeping the first spelling for search URLs
+        searches: Dict[str, Dict[FrozenSet[str], str]] = OrderedDict()
+        requested = []
+        seen_queries = set()
+        for location in locations:
+            normalized_location = normalize_location(location)
+            for keywords in keyword_list:
+                terms = normalize_terms(keywords)
+                if not terms:
+                    continue
+                display = keywords if isinstance(keywords, str) else ' '.join(keywords)
+                searches.setdefault(normalized_location, OrderedDict()).setdefault(terms, display)
+                for level in levels:
+                    if (terms, normalized_location, level) in seen_queries:
+                        continue
+                    seen_queries.add((terms, normalized_location, level))
+                    requested.append((display, terms, location, normalized_location, level))
+
+        # Map every term set to the broadest requested term set that covers it
+        covering: Dict[tuple, FrozenSet[str]] = {}
+        for location, term_sets in searches.items():
+            for terms in term_sets:
+                best = terms
+                if self.subsume_narrower:
+                    for other in term_sets:
+                        if other < terms and len(other) < len(best):
+                            best = other
+                covering[(location, terms)] = best
+
+        # One fetch per (site, covering terms, location, page), ordered page-first then broadest-first
+        per_site: Dict[str, List[SearchFetch]] = OrderedDict((site, []) for site in self.sites)
+        fetched_terms = OrderedDict()
+        for (location, _), terms in covering.items():
+            fetched_terms.setdefault((location, terms), searches[location][terms])
+
+        ordered = sorted(fetched_terms.items(), key=lambda item: len(item[0][1]))
+        for page in range(self.pages_per_query):
+            for (location, terms), display in ordered:
+                for site in self.sites:
+                    per_site[site].append(SearchFetch(site, terms, display, location, page))
+
+        dropped = 0
+        if self.max_requests_per_site is not None:
+            for site, fetches in per_site.items():
+                dropped += max(0, len(fetches) - self.max_requests_per_site)
+                per_site[site] = fetches[:self.max_requests_per_site]
+
+        # Round-robin across sites so no site's budget is spent in a burst
+        fetches = [
+            fetch for round_fetches in zip_longest(*per_site.values())
+            for fetch in round_fetches if fetch is not None
+        ]
+        planned_keys = {fetch.key for fetch in fetches}
+
+        queries = []
+        for display, terms, location, normalized_location, level in requested:
+            fetch_terms = covering[(normalized_location, terms)]
+            fetch_keys = [
+                (site, fetch_terms, normalized_location, page)
+                for page in range(self.pages_per_query)
+                for site in self.sites
+                if (site, fetch_terms, normalized_location, page) in planned_keys
+            ]
+            label = f"{display} | {location}" + (f" | {level}" if level else '')
+            queries.append({
+                'label': label,
+                'keywords': display,
+                'terms': terms,
+                'fetch_terms': fetch_terms,
+                'location': location,
+                'experience_level': level,
+                'fetch_keys': fetch_keys
+            })
+
+        naive = len(requested) * len(self.sites) * self.pages_per_query
+        return QueryPlan(queries, fetches, naive, dropped)
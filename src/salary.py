@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+_CURRENCY = r'[$£€¥₹]|\b(?:USD|EUR|GBP|CAD|AUD|INR|JPY)\b'
+_PERIOD = r'hour|hr|day|week|wk|month|mo|year|yr|annum'
+
+# Digits with "," or "." separators in either convention: "60,000", "50.000", "50,5", "1.2".
+# Not the 401(k)/403(b) retirement plans
+_NUMBER = r'(?<![\d.,])(?!40[13]\s*\(?[kKbB]\b)\d(?:[\d.,]*\d)?'
+# "k" or "M" not starting a word, so "60 months" is not 60 million
+_SUFFIX = r'[kKmM](?![A-Za-z])'
+
+# "$60,000 - $80,000", "$45/hr", "60k-80k USD", "£30,000 to £35,000 a year", "€50.000 - €60.000", "$1.2M".
+# A number only counts as a salary with a currency, a k/M suffix or a period right after it,
+# so "3 years experience" is not one
+SALARY_PATTERN = (
+    r'(?P<currency>' + _CURRENCY + r')?\s*(?P<low>' + _NUMBER + r')\s*(?P<low_k>' + _SUFFIX + r')?'
+    r'(?:\s*(?:-|–|—|to)\s*(?P<high_currency>' + _CURRENCY + r')?\s*(?P<high>' + _NUMBER + r')\s*'
+    r'(?P<high_k>' + _SUFFIX + r')?)?'
+    r'(?P<unit>\s*(?:' + _CURRENCY + r'|(?i:(?:\bper\s+|\ban?\s+|/\s*)(?:' + _PERIOD + r')\b'
+    r'|\b(?:hourly|daily|weekly|monthly|yearly|annually)\b)))?'
+)
+CURRENCY_PATTERN = r'(' + _CURRENCY + r')'
+PERIOD_PATTERN = (r'(?i)(?:\bper|\ban?|/)\s*(' + _PERIOD + r')\b'
+                  r'|\b(hourly|daily|weekly|monthly|yearly|annually)\b')
+
+CURRENCY_SYMBOLS = {'$': 'USD', '£': 'GBP', '€': 'EUR', '¥': 'JPY', '₹': 'INR'}
+PERIOD_NAMES = {
+    'hour': 'hour', 'hr': 'hour', 'hourly': 'hour',
+    'day': 'day', 'daily': 'day',
+    'week': 'week', 'wk': 'week', 'weekly': 'week',
+    'month': 'month', 'mo': 'month', 'monthly': 'month',
+    'year': 'year', 'yr': 'year', 'annum': 'year', 'yearly': 'year', 'annually': 'year'
+}
+SUFFIX_MULTIPLIERS = {'k': 1e3, 'm': 1e6}
+SALARY_COLUMNS = ['salary_min', 'salary_max', 'salary_currency', 'salary_period']
+
+# Multipliers to a full-time yearly amount
+PERIODS_PER_YEAR = {'hour': 2080, 'day': 260, 'week': 52, 'month': 12, 'year': 1}
+
+# Amounts below this with no stated period are taken to be hourly rates
+HOURLY_CEILING = 200
+
+
+def _grouped(number, separator):
+    """Whether separator splits number into valid thousands groups, as in 1,234,567"""
+    groups = number.split(separator)
+    return 1 <= len(groups[0]) <= 3 and all(len(group) == 3 for group in groups[1:])
+
+
+def _number(number, suffix):
+    """
+    Value of a number written with either separator convention, NaN when it cannot be told
+
+    With both separators the last one is the decimal mark ("1,234.50",
+    "50.000,50"). A lone separator followed by three digits groups thousands
+    ("60,000", "50.000"), unless a k/M suffix makes it a fraction ("1.250k");
+    followed by other digit counts it is a decimal mark ("50,5k", "1.2M").
+    """
+    if not isinstance(number, str):
+        return np.nan
+    if ',' in number and '.' in number:
+        decimal = ',' if number.rfind(',') > number.rfind('.') else '.'
+        thousands = '.' if decimal == ',' else ','
+        whole, _, fraction = number.partition(decimal)
+        if decimal in fraction or thousands in fraction or not _grouped(whole, thousands):
+            return np.nan
+        return float(whole.replace(thousands, '') + '.' + fraction)
+
+    separator = ',' if ',' in number else '.' if '.' in number else None
+    if separator is None:
+        return float(number)
+    groups = number.split(separator)
+    if len(groups) == 2 and (len(groups[1]) != 3 or isinstance(suffix, str)):
+        return float(groups[0] + '.' + groups[1])
+    if _grouped(number, separator):
+        return float(number.replace(separator, ''))
+    return np.nan
+
+
+def _amount(numbers, suffixes):
+    values = pd.Series([_number(number, suffix) for number, suffix in zip(numbers, suffixes)],
+                       index=numbers.index, dtype=float)
+    return values * suffixes.str.lower().map(SUFFIX_MULTIPLIERS).fillna(1)
+
+
+def parse_salaries(salaries):
+    """
+    Parse free-text salaries into salary_min, salary_max, salary_currency and salary_period
+
+    Takes any sequence of strings (None for missing) and returns a DataFrame
+    aligned with it. Each distinct string is parsed once with vectorized
+    pandas string extraction. A single amount sets both bounds; amounts
+    without a stated period are hourly below HOURLY_CEILING, else yearly.
+    Only numbers with a currency, a k/M suffix or a period next to them
+    count, and amounts whose separators can't be read either way are left
+    NaN rather than guessed.
+    """
+    salaries = pd.Series(salaries, dtype=object)
+    codes, distinct = pd.factorize(salaries.astype(str).where(salaries.notna(), ''))
+    text = pd.Series(distinct, dtype=object)
+
+    # First number in each string that carries a salary marker
+    matches = text.str.extractall(SALARY_PATTERN)
+    marked = matches[['currency', 'high_currency', 'low_k', 'high_k', 'unit']].notna().any(axis=1)
+    parts = matches[marked].groupby(level=0).first().reindex(text.index)
+    # "$60-80k": the suffix on the upper bound applies to both
+    low = _amount(parts['low'], parts['low_k'].fillna(parts['high_k']))
+    high = _amount(parts['high'], parts['high_k'])
+    unreadable = low.isna() | (parts['high'].notna() & high.isna())
+    low, high = low.mask(unreadable), high.fillna(low).mask(unreadable)
+
+    currency = text.str.extract(CURRENCY_PATTERN)[0].replace(CURRENCY_SYMBOLS)
+    period_parts = text.str.extract(PERIOD_PATTERN)
+    period = period_parts[0].fillna(period_parts[1]).str.lower().map(PERIOD_NAMES)
+    period = period.where(period.notna() | low.isna(), np.where(high < HOURLY_CEILING, 'hour', 'year'))
+
+    parsed = pd.DataFrame({
+        'salary_min': np.minimum(low, high),
+        'salary_max': np.maximum(low, high),
+        'salary_currency': currency,
+        'salary_period': period
+    })
+    return parsed.take(codes).reset_index(drop=True)
+
+
+def annual_salary(frame):
+    """Yearly midpoint of each parsed salary, NaN where none was found"""
+    midpoint = (frame['salary_min'] + frame['salary_max']) / 2
+    return midpoint * frame['salary_period'].map(PERIODS_PER_YEAR)
+
+
+def salary_percentiles(frame, by, percentiles=(0.25, 0.5, 0.75), min_count=1):
+    """
+    Percentiles of annualized salary per group and currency
+
+    frame needs the parsed salary columns and the by column. Returns a
+    DataFrame indexed by (by, salary_currency) with a count column and one
+    column per percentile (p25, p50, ...), largest groups first.
+    """
+    data = frame.assign(annual_salary=annual_salary(frame)).dropna(subset=['annual_salary', 'salary_currency'])
+    if data.empty:
+        return pd.DataFrame()
+
+    grouped = data.groupby([by, 'salary_currency'])['annual_salary']
+    table = grouped.quantile(list(percentiles)).unstack()
+    table.columns = [f"p{int(round(p * 100))}" for p in table.columns]
+    table.insert(0, 'count', grouped.size())
+    table = table[table['count'] >= min_count]
+    return table.sort_values('count', ascending=False).round(0)
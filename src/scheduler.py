@@ -0,0 +1,217 @@
+import heapq
+import itertools
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+
+class CheckState:
+    """Adaptive re-check state for one (product, site) pair"""
+
+    __slots__ = ('product', 'site', 'interval', 'last_price', 'volatility', 'checks', 'changes')
+
+    def __init__(self, product, site, interval):
+        self.product = product
+        self.site = site
+        self.interval = interval
+        self.last_price = None
+        self.volatility = 0.0
+        self.checks = 0
+        self.changes = 0
+
+
+class PriceCheckScheduler:
+    """Priority-queue scheduler with volatility-adaptive, rate-limited re-check intervals"""
+
+    def __init__(self, base_interval, min_interval=None, max_interval=None, site_spacing=None,
+                 default_spacing=0.0, jitter=0.1, min_change=1.0, speedup_factor=0.5, slowdown_factor=1.25,
+                 volatility_alpha=0.3, volatility_scale=5.0, clock=time.time, sleep=time.sleep, seed=None):
+        """
+        Initialize scheduler
+
+        Intervals are in seconds. A significant price change multiplies an item's
+        interval by speedup_factor; an unchanged price multiplies it by
+        slowdown_factor. The delay until the next check is that interval divided
+        by 1 + volatility / volatility_scale, where volatility is the item's
+        moving average (weight volatility_alpha) of percent price change per
+        check, so an item that moves 5% per check on average is re-checked twice
+        as often. site_spacing maps a site to the minimum number of seconds
+        between two requests to it (the site's rate_limit); other sites get
+        default_spacing.
+        """
+        self.base_interval = base_interval
+        self.min_interval = min_interval if min_interval is not None else base_interval * 0.1
+        self.max_interval = max_interval if max_interval is not None else base_interval * 24
+        self.site_spacing = site_spacing or {}
+        self.default_spacing = default_spacing
+        self.jitter = jitter
+        self.min_change = min_change
+        self.speedup_factor = speedup_factor
+        self.slowdown_factor = slowdown_factor
+        self.volatility_alpha = volatility_alpha
+        self.volatility_scale = volatility_scale
+        self.clock = clock
+        self.sleep = sleep
+        self.random = random.Random(seed)
+
+        self.states: Dict[Tuple[str, str], CheckState] = {}
+        self._heap = []
+        self._sequence = itertools.count()
+        self._site_next_free: Dict[str, float] = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def _jittered(self, interval):
+        return interval * self.random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _delay(self, state):
+        delay = state.interval / (1 + state.volatility / self.volatility_scale)
+        return self._jittered(max(self.min_interval, delay))
+
+    def _push(self, when, key):
+        heapq.heappush(self._heap, (when, next(self._sequence), key))
+
+    def add(self, product, site, first_check=None):
+        """Schedule a product on a site; the first check is spread over the jitter window"""
+        key = (product['name'], site)
+        if key in self.states:
+            return
+        self.states[key] = CheckState(product, site, self.base_interval)
+        if first_check is None:
+            first_check = self.clock() + self.random.uniform(0, self.jitter * self.base_interval)
+        self._push(first_check, key)
+
+    def remove(self, product_name, site):
+        """Stop checking a product on a site"""
+        self.states.pop((product_name, site), None)
+
+    def next_check(self, deadline=None) -> Optional[Tuple[float, CheckState]]:
+        """
+        Pop the next check, deferred as needed to respect the site's request spacing
+
+        Returns None, leaving the queue and site budgets untouched, when no
+        check is due by deadline.
+        """
+        while self._heap:
+            when, sequence, key = heapq.heappop(self._heap)
+            state = self.states.get(key)
+            if state is None:
+                continue
+
+            slot = max(when, self._site_next_free.get(state.site, 0.0))
+            if slot > when:
+                # Site budget is taken; retry at its next free slot
+                heapq.heappush(self._heap, (slot, sequence, key))
+                continue
+            if deadline is not None and slot > deadline:
+                heapq.heappush(self._heap, (when, sequence, key))
+                return None
+
+            self._site_next_free[state.site] = slot + self.site_spacing.get(state.site, self.default_spacing)
+            return slot, state
+        return None
+
+    def record(self, state, price):
+        """Record an observed price, adapt the item's interval and schedule its next check"""
+        state.checks += 1
+        changed = False
+
+        if state.last_price is not None:
+            change = abs(price - state.last_price)
+            change_percent = change / state.last_price * 100 if state.last_price else 0.0
+            state.volatility += self.volatility_alpha * (change_percent - state.volatility)
+            changed = change >= self.min_change
+
+        state.last_price = price
+        if changed:
+            state.changes += 1
+            state.interval = max(self.min_interval, state.interval * self.speedup_factor)
+        else:
+            state.interval = min(self.max_interval, state.interval * self.slowdown_factor)
+
+        key = (state.product['name'], state.site)
+        if key in self.states:
+            self._push(self.clock() + self._delay(state), key)
+        return changed
+
+    def snapshot(self):
+        """Each item's adaptive state and next check time, as JSON-serializable lists for a checkpoint"""
+        due = {}
+        for when, _, key in self._heap:
+            if key in self.states and when < due.get(key, float('inf')):
+                due[key] = when
+        return [
+            [name, site, state.interval, state.last_price, state.volatility, state.checks, state.changes,
+             due.get((name, site))]
+            for (name, site), state in self.states.items()
+        ]
+
+    def restore(self, saved):
+        """
+        Continue from a snapshot() of an earlier run
+
+        Only items already added are restored; they keep their interval,
+        volatility and counts and are checked at their saved time, or as soon
+        as their site allows when that time has passed. An item whose check
+        was in flight when the snapshot was taken keeps its first check.
+        """
+        resumed = {}
+        for name, site, interval, last_price, volatility, checks, changes, due in saved:
+            state = self.states.get((name, site))
+            if state is None:
+                continue
+            state.interval = min(self.max_interval, max(self.min_interval, interval))
+            state.last_price = last_price
+            state.volatility = volatility
+            state.checks = checks
+            state.changes = changes
+            if due is not None:
+                resumed[(name, site)] = due
+
+        self._heap = [entry for entry in self._heap if entry[2] not in resumed]
+        heapq.heapify(self._heap)
+        for key, when in resumed.items():
+            self._push(when, key)
+        return len(resumed)
+
+    def run(self, check, duration=None, max_checks=None):
+        """Run checks until the duration elapses or max_checks is reached; return the check count"""
+        deadline = self.clock() + duration if duration is not None else None
+        performed = 0
+
+        while max_checks is None or performed < max_checks:
+            scheduled = self.next_check(deadline)
+            if scheduled is None:
+                break
+
+            when, state = scheduled
+            delay = when - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+            price = check(state.product, state.site)
+            if price is not None:
+                self.record(state, price)
+            else:
+                self._push(self.clock() + self._delay(state), (state.product['name'], state.site))
+            performed += 1
+
+        return performed
+
+    def stats(self):
+        """Summarize checks, detected changes and current intervals"""
+        states = list(self.states.values())
+        if not states:
+            return {'items': 0, 'checks': 0, 'changes': 0}
+
+        intervals = sorted(state.interval for state in states)
+        return {
+            'items': len(states),
+            'checks': sum(state.checks for state in states),
+            'changes': sum(state.changes for state in states),
+            'max_volatility_percent': round(max(state.volatility for state in states), 2),
+            'min_interval_seconds': round(intervals[0], 1),
+            'median_interval_seconds': round(intervals[len(intervals) // 2], 1),
+            'max_interval_seconds': round(intervals[-1], 1)
+        }
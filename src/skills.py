@@ -0,0 +1,152 @@
+import json
+from collections import Counter, deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton reporting every occurrence of a set of patterns in one pass"""
+
+    def __init__(self, patterns):
+        """patterns maps each pattern string to a value; uses pyahocorasick when installed"""
+        self.size = len(patterns)
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, value in patterns.items():
+                self._automaton.add_word(pattern, (len(pattern), value))
+            if patterns:
+                self._automaton.make_automaton()
+            return
+
+        # Trie of per-state transition dicts, then failure links breadth-first
+        self._goto = [{}]
+        self._output = [[]]
+        for pattern, value in patterns.items():
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append((len(pattern), value))
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[target] = self._goto[fallback].get(char, 0)
+                self._output[target] = self._output[target] + self._output[self._fail[target]]
+
+    def iter(self, text):
+        """Yield (end index, pattern length, value) for every occurrence in text"""
+        if not self.size:
+            return
+        if ahocorasick is not None:
+            for end, (length, value) in self._automaton.iter(text):
+                yield end, length, value
+            return
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield index, length, value
+
+
+class SkillMatcher:
+    """Find taxonomy skills and their synonyms in text, scanning each text once"""
+
+    def __init__(self, taxonomy, case_sensitive=False, word_boundaries=True):
+        """
+        Build the automata from a taxonomy
+
+        taxonomy maps each canonical skill name to {"category": ..., "synonyms": [...]}.
+        The name and every synonym are patterns for the skill. Matching ignores
+        case unless case_sensitive is set: globally, on the skill's entry for its
+        canonical name (short names like "Go" or "R"), or on a synonym given as
+        {"term": ..., "case_sensitive": true}. With word_boundaries, a match
+        must not run into a neighbouring letter, digit or underscore, so "Java"
+        is not found in "JavaScript". Scanning time depends on the text, not the
+        taxonomy size.
+        """
+        self.case_sensitive = case_sensitive
+        self.word_boundaries = word_boundaries
+        self.categories = {}
+        exact, folded = {}, {}
+        for skill, entry in taxonomy.items():
+            entry = entry or {}
+            self.categories[skill] = entry.get('category', 'Other')
+            # "Go" is case-sensitive, "golang" need not be
+            terms = [(skill, entry.get('case_sensitive', False))]
+            for synonym in entry.get('synonyms', []):
+                if isinstance(synonym, dict):
+                    terms.append((synonym.get('term', ''), synonym.get('case_sensitive', False)))
+                else:
+                    terms.append((synonym, False))
+            for term, sensitive in terms:
+                term = term.strip()
+                sensitive = sensitive or case_sensitive
+                if term:
+                    (exact if sensitive else folded).setdefault(term if sensitive else term.lower(), skill)
+
+        self._exact = PatternAutomaton(exact)
+        self._folded = PatternAutomaton(folded)
+        self.pattern_count = len(exact) + len(folded)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load a taxonomy JSON file: {"skills": {name: {"category", "synonyms", "case_sensitive"}}}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('skills', data), **kwargs)
+
+    def _spans(self, automaton, text):
+        for end, length, skill in automaton.iter(text):
+            start = end - length + 1
+            if self.word_boundaries and (
+                    (start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]))
+                    or (end + 1 < len(text) and _is_word_char(text[end + 1]) and _is_word_char(text[end]))):
+                continue
+            yield start, -length, skill
+
+    def find(self, text):
+        """Canonical skills mentioned in text, in order of first mention"""
+        if not text:
+            return []
+
+        spans = list(self._spans(self._exact, text))
+        spans += self._spans(self._folded, text.lower())
+
+        # Leftmost-longest: "Spring Boot" wins over the "Spring" inside it
+        skills = []
+        covered = -1
+        for start, negative_length, skill in sorted(spans):
+            if start <= covered:
+                continue
+            covered = start - negative_length - 1
+            if skill not in skills:
+                skills.append(skill)
+        return skills
+
+    def count(self, texts):
+        """Number of texts mentioning each skill"""
+        counts = Counter()
+        for text in texts:
+            counts.update(self.find(text))
+        return counts
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Records built per vectorized batch
+BATCH_SIZE = 100000
+
+
+def choose(rng, vocabulary, size):
+    """size values drawn uniformly from vocabulary, as a list"""
+    return np.asarray(vocabulary, dtype=object)[rng.integers(0, len(vocabulary), size)].tolist()
+
+
+def to_records(columns):
+    """List of dicts from a dict of equally long column lists"""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def _batches(count, batch_size):
+    for start in range(0, count, batch_size):
+        yield min(batch_size, count - start)
+
+
+def job_batches(count, companies, titles, locations, salaries, keywords, seed=None, batch_size=BATCH_SIZE):
+    """
+    Yield lists of synthetic job records, count in total
+
+    Fields match JobScraper.scrape_demo_jobs. Every column of a batch is
+    sampled at once from a seeded NumPy generator, so the same seed always
+    gives the same records; posting dates spread over the last 30 days.
+    Each description ends with its own requisition number, so every record
+    is a distinct posting rather than one of the few thousand combinations
+    the vocabularies allow.
+    """
+    rng = np.random.default_rng(seed)
+    today = datetime.now()
+    dates = [(today - timedelta(days=days)).strftime('%Y-%m-%d') for days in range(30)]
+    keywords = list(keywords) or ['python']
+    # Two different keywords per description, like random.sample(keywords, 2)
+    pairs = [first if first == second else f"{first}, {second}"
+             for first in keywords for second in keywords if first != second or len(keywords) == 1]
+
+    generated = 0
+    for size in _batches(count, batch_size):
+        wanted = choose(rng, [title.lower() for title in titles], size)
+        years = rng.integers(2, 6, size).tolist()
+        skills = choose(rng, pairs, size)
+        scraped_at = datetime.now().isoformat()
+        yield to_records({
+            'title': choose(rng, titles, size),
+            'company': choose(rng, companies, size),
+            'location': choose(rng, locations, size),
+            'salary': choose(rng, salaries, size),
+            'description': [f"Looking for experienced {title} with {year} years experience in {skill}. "
+                            f"Requisition R{requisition:07d}."
+                            for requisition, title, year, skill
+                            in zip(range(generated + 1, generated + size + 1), wanted, years, skills)],
+            'posted_date': choose(rng, dates, size),
+            'job_type': choose(rng, ['Full-time', 'Part-time', 'Contract', 'Remote'], size),
+            'experience_level': choose(rng, ['Entry', 'Mid', 'Senior', 'Lead'], size),
+            'scraped_at': [scraped_at] * size
+        })
+        generated += size
+
+
+def lead_batches(count, companies, titles, locations, company_sizes, first_names, last_names, industry,
+                 validate_email=None, seed=None, batch_size=BATCH_SIZE):
+    """
+    Yield lists of synthetic lead records, count in total
+
+    Fields match LeadScraper.generate_demo_leads. Emails, websites and
+    profiles derive from the sampled company and contact as in the demo.
+    Each email carries a running number, since a CRM treats an email as one
+    contact and the vocabularies allow only a few hundred name pairs per
+    company; validate_email runs once per email.
+    """
+    rng = np.random.default_rng(seed)
+    domains = [company.lower().replace(" ", "").replace("inc", "").replace("corp", "").replace("ltd", "")
+               for company in companies]
+    size_names = list(company_sizes)
+    size_labels = [company_sizes[name] for name in size_names]
+    generated = 0
+
+    for size in _batches(count, batch_size):
+        company_index = rng.integers(0, len(companies), size)
+        first = choose(rng, first_names, size)
+        last = choose(rng, last_names, size)
+        domain = np.asarray(domains, dtype=object)[company_index].tolist()
+        email = [f"{f.lower()}.{l.lower()}{number}@{d}.com"
+                 for number, f, l, d in zip(range(generated + 1, generated + size + 1), first, last, domain)]
+        valid = [validate_email(address) for address in email] if validate_email is not None else [True] * size
+        phone = np.stack([rng.integers(200, 1000, size), rng.integers(100, 1000, size),
+                          rng.integers(1000, 10000, size)], axis=1).tolist()
+        scraped_at = datetime.now().isoformat()
+        yield to_records({
+            'company_name': np.asarray(companies, dtype=object)[company_index].tolist(),
+            'contact_name': [f"{f} {l}" for f, l in zip(first, last)],
+            'title': choose(rng, titles, size),
+            'email': email,
+            'phone': [f"+1-{a}-{b}-{c}" for a, b, c in phone],
+            'industry': [industry] * size,
+            'location': choose(rng, locations, size),
+            'company_size': choose(rng, size_names, size),
+            'employees': choose(rng, size_labels, size),
+            'website': [f"https://www.{d}.com" for d in domain],
+            'linkedin_company': [f"https://linkedin.com/company/{d}" for d in domain],
+            'linkedin_profile': [f"https://linkedin.com/in/{f.lower()}-{l.lower()}" for f, l in zip(first, last)],
+            'lead_score': rng.integers(1, 101, size).tolist(),
+            'contact_verified': (rng.random(size) < 0.5).tolist(),
+            'email_valid': valid,
+            'scraped_at': [scraped_at] * size
+        })
+        generated += size
+
+
+def price_batches(count, products, sites, seed=None, batch_size=BATCH_SIZE):
+    """
+    Yield lists of synthetic price records, count in total
+
+    Fields match PriceMonitor.build_price_record: prices vary -20% to +30%
+    around each product's base price, 75% are in stock and 30% discounted.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.asarray([product['name'] for product in products], dtype=object)
+    categories = np.asarray([product['category'] for product in products], dtype=object)
+    base_prices = np.asarray([product['base_price'] for product in products], dtype=float)
+
+    for size in _batches(count, batch_size):
+        product_index = rng.integers(0, len(products), size)
+        base = base_prices[product_index]
+        current = base * (1 + rng.uniform(-0.2, 0.3, size))
+        discount = np.where(rng.random(size) < 0.3, rng.uniform(0, 0.25, size), 0.0)
+        available = rng.random(size) < 0.75
+        scraped_at = datetime.now().isoformat()
+        yield to_records({
+            'product_name': names[product_index].tolist(),
+            'category': categories[product_index].tolist(),
+            'site': choose(rng, sites, size),
+            'current_price': current.round(2).tolist(),
+            'original_price': base.tolist(),
+            'discount_percentage': (discount * 100).round(1).tolist(),
+            'availability': available.tolist(),
+            'stock_status': np.where(available, 'In Stock', 'Out of Stock').tolist(),
+            'price_change': (current - base).round(2).tolist(),
+            'price_change_percent': ((current - base) / base * 100).round(1).tolist(),
+            'last_updated': [scraped_at] * size,
+            'scraped_at': [scraped_at] * size
+        })
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+from alerts import AlertDispatcher, build_channels
+from mock_alerts import MockAlertServer
+from price_monitor import PriceMonitor
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'price_monitor_config.json')
+
+
+@pytest.fixture
+def server():
+    server = MockAlertServer().start()
+    yield server
+    server.stop()
+
+
+def drop(product, site, old, new):
+    return {'type': 'price_drop', 'product_name': product, 'site': site, 'category': 'Electronics',
+            'old_price': old, 'new_price': new, 'change_percent': round((new - old) / old * 100, 1)}
+
+
+def dispatcher_for(server, **kwargs):
+    config = {'notification_methods': ['webhook', 'slack', 'email'], 'destinations': server.destinations()}
+    return AlertDispatcher(build_channels(config), coalesce_window=3600, backoff_seconds=0.01, **kwargs)
+
+
+def test_alerts_are_coalesced_and_delivered_to_every_channel(server):
+    dispatcher = dispatcher_for(server)
+    dispatcher.start()
+    dispatcher.submit(drop('iPhone 14', 'Amazon', 800.0, 760.0))
+    dispatcher.submit(drop('iPhone 14', 'Amazon', 760.0, 720.0))
+    dispatcher.submit(drop('iPhone 14', 'Amazon', 720.0, 700.0))
+    dispatcher.submit(drop('iPad Air', 'Target', 600.0, 540.0))
+    dispatcher.stop()
+
+    alerts = {alert['product_name']: alert for alert in server.alerts()}
+    assert len(server.alerts()) == 2
+    assert alerts['iPhone 14']['occurrences'] == 3
+    assert alerts['iPhone 14']['old_price'] == 800.0
+    assert alerts['iPhone 14']['new_price'] == 700.0
+    assert alerts['iPhone 14']['change_percent'] == -12.5
+
+    slack = [body for path, body in server.webhooks if path == '/slack']
+    assert len(slack) == 1 and slack[0]['text'].startswith('*2 price alerts*')
+    assert len(server.emails) == 1
+    sender, recipients, message = server.emails[0]
+    assert recipients == ['alerts@example.com']
+    assert 'iPhone 14 @ Amazon' in message.get_payload() and '(3x)' in message.get_payload()
+    assert dispatcher.sent == 6 and dispatcher.failed == 0
+
+
+def test_failed_deliveries_are_retried(server):
+    server.fail_first = 2
+    dispatcher = dispatcher_for(server, retry_attempts=3)
+    dispatcher.start()
+    dispatcher.submit(drop('iPhone 14', 'Amazon', 800.0, 700.0))
+    dispatcher.stop()
+
+    assert server.rejected == 2
+    assert len(server.alerts()) == 1
+    assert dispatcher.failed == 0
+
+
+def test_demo_pass_alerts_on_changes_since_last_run(server):
+    monitor = PriceMonitor(CONFIG)
+    monitor.last_seen_file = None
+    monitor.alerts = dispatcher_for(server)
+    product = monitor.DEMO_PRODUCTS[0]
+    for site in monitor.DEMO_SITES:
+        monitor.last_prices[(product['name'], site)] = product['base_price'] * 10
+    monitor.alert_baseline_ready = True
+
+    monitor.generate_demo_price_data(num_products=1)
+    monitor.alerts.stop()
+
+    received = server.alerts()
+    assert {alert['site'] for alert in received if alert['type'] == 'price_drop'} == set(monitor.DEMO_SITES)
+
+
+def test_synthetic_records_never_reach_the_alert_channels(server):
+    monitor = PriceMonitor(CONFIG)
+    monitor.last_seen_file = None
+    monitor.alerts = dispatcher = dispatcher_for(server)
+    for product in monitor.DEMO_PRODUCTS:
+        for site in monitor.DEMO_SITES:
+            monitor.last_prices[(product['name'], site)] = product['base_price'] * 10
+    monitor.alert_baseline_ready = True
+
+    monitor.generate_synthetic_price_data(2000, seed=1)
+    monitor.alerts.stop()
+
+    assert monitor.alerts is dispatcher
+    assert server.alerts() == [] and server.emails == []
+    assert dispatcher.sent == 0 and not dispatcher.pending
+    assert monitor.metrics.histogram('stage_seconds', site='synthetic', stage='alerts').count == 1
+    assert any(name == 'alerts_submitted_total' for name, _ in monitor.metrics.counters)
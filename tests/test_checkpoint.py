@@ -0,0 +1,56 @@
+import os
+
+from checkpoint import Checkpoint
+
+RUN = ['grid', ['python | remote']]
+
+
+def interrupted_run(directory, saved=3, unsaved=2):
+    """A run killed after checkpointing saved records, with unsaved more already in the log"""
+    checkpoint = Checkpoint('scraper', str(directory), every_records=saved, every_seconds=3600)
+    checkpoint.begin(RUN)
+    for index in range(saved + unsaved):
+        checkpoint.add({'id': index})
+        checkpoint.update(index + 1, lambda: {'seen': checkpoint.position})
+    # The process dies here: the log has reached the disk, the last checkpoint has not moved
+    checkpoint._writer.flush(sync=True)
+    return checkpoint
+
+
+def test_resume_restores_the_last_checkpoint_and_drops_later_records(tmp_path):
+    interrupted_run(tmp_path)
+
+    checkpoint = Checkpoint('scraper', str(tmp_path))
+    records, position, state = checkpoint.begin(RUN, resume=True)
+    assert records == [{'id': 0}, {'id': 1}, {'id': 2}]
+    assert position == 3 and state == {'seen': 3}
+
+    for index in range(position, 6):
+        checkpoint.add({'id': index})
+        checkpoint.update(index + 1)
+    checkpoint.save({'seen': 6})
+    records, position, _ = Checkpoint('scraper', str(tmp_path)).begin(RUN, resume=True)
+    assert [record['id'] for record in records] == list(range(6)) and position == 6
+
+    checkpoint.finish()
+    assert not os.listdir(tmp_path)
+
+
+def test_a_fresh_begin_discards_the_stale_checkpoint(tmp_path):
+    interrupted_run(tmp_path)
+
+    checkpoint = Checkpoint('scraper', str(tmp_path))
+    assert checkpoint.begin(RUN) == ([], 0, {})
+    assert not os.path.exists(checkpoint.state_path)
+    assert os.path.getsize(checkpoint.records_path) == 0
+
+    # Nothing of the stale run comes back, even when the next run asks to resume
+    checkpoint.add({'id': 'new'})
+    checkpoint.save({})
+    records, position, _ = Checkpoint('scraper', str(tmp_path)).begin(RUN, resume=True)
+    assert records == [{'id': 'new'}] and position == 0
+
+
+def test_a_checkpoint_of_a_different_run_is_not_resumed(tmp_path):
+    interrupted_run(tmp_path)
+    assert Checkpoint('scraper', str(tmp_path)).begin(['grid', ['java | remote']], resume=True) == ([], 0, {})
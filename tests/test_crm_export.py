@@ -0,0 +1,39 @@
+import pytest
+
+from crm_export import CRMExporter
+from mock_crm import MockBulkAPI
+
+
+def leads(count, start=0):
+    return [{'contact_name': f"Ann Lee{i}", 'email': f"ann{i}@example.com", 'company_name': 'Acme'}
+            for i in range(start, start + count)]
+
+
+@pytest.fixture
+def api():
+    api = MockBulkAPI(latency=0.0)
+    api.start()
+    yield api
+    api.stop()
+
+
+def test_batch_keys_survive_added_removed_and_reordered_leads(tmp_path):
+    exporter = CRMExporter('hubspot', 'http://127.0.0.1:9', progress_dir=str(tmp_path))
+    original = leads(5000)
+    before = {key for key, _, _ in exporter.batches(exporter.map_records(original))}
+
+    edited = original[1:] + leads(1, start=9000)
+    edited.reverse()
+    after = {key for key, _, _ in exporter.batches(exporter.map_records(edited))}
+
+    assert len(after - before) <= 10 < len(before)
+
+
+def test_resumed_upload_sends_only_new_records(api, tmp_path):
+    exporter = CRMExporter('hubspot', api.url, progress_dir=str(tmp_path), rate_limit=0)
+    first = exporter.upload(leads(1500))
+    second = exporter.upload(leads(1600) + leads(1, start=5))
+
+    assert first['records'] == 1500
+    assert second['skipped'] == 1501 and second['records'] == 100
+    assert api.stats()['created']['hubspot'] == 1600
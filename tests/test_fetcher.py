@@ -0,0 +1,239 @@
+import gzip
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from fetcher import BodyTooLarge, Fetcher
+from metrics import MetricsCollector
+
+PAGE = ('<html><body>' + '<p>Python developer, remote</p>' * 2000 + '</body></html>').encode()
+
+
+class PagedSite:
+    """Local site serving numbered result pages, recording which pages were requested and how many at once"""
+
+    def __init__(self, last_page, delay=lambda page: 0.02):
+        self.last_page = last_page
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                page = int(parse_qs(urlsplit(self.path).query)['page'][0])
+                with site._lock:
+                    site.requested.append(page)
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                time.sleep(site.delay(page))
+                with site._lock:
+                    site.in_flight -= 1
+                body = ' '.join(f"job{page}-{item}" for item in range(3)).encode() if page <= site.last_page else b''
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/jobs?q=python&page=1"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class EncodedSite:
+    """Local site serving fixed bodies per path: {path: (headers, body sent, bytes announced)}"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                headers, body, announced = site.routes[self.path]
+                self.send_response(200)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(announced or len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                # Fewer bytes than announced: the connection drops mid-body
+                if announced:
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+@pytest.fixture
+def sites():
+    started = []
+
+    def start(*args, **kwargs):
+        site = PagedSite(*args, **kwargs)
+        started.append(site)
+        return site
+
+    yield start
+    for site in started:
+        site.stop()
+
+
+def fetcher(**kwargs):
+    session = requests.Session()
+    session.trust_env = False
+    return Fetcher(session, backoff_seconds=0, timeout=5, **kwargs)
+
+
+def items(body):
+    return body.tobytes().decode().split()
+
+
+def test_pages_are_yielded_in_order_while_later_pages_arrive_first(sites):
+    site = sites(last_page=6, delay=lambda page: 0.1 / page)
+    pages = list(fetcher().paginate(site.url, items, max_pages=6, prefetch=3))
+
+    assert [target.rsplit('=', 1)[1] for target, _ in pages] == ['1', '2', '3', '4', '5', '6']
+    assert [page_items[0] for _, page_items in pages] == [f"job{page}-0" for page in range(1, 7)]
+    assert site.max_in_flight > 1
+
+
+def test_prefetch_depth_is_bounded_and_an_empty_page_stops_early(sites):
+    site = sites(last_page=4)
+    metrics = MetricsCollector('test')
+    pages = list(fetcher(metrics=metrics).paginate(site.url, items, max_pages=50, prefetch=2))
+
+    assert len(pages) == 4
+    # The page being parsed plus at most two ahead of it
+    assert site.max_in_flight <= 3
+    assert max(site.requested) <= 5 + 2
+    wasted = metrics.counters.get(('speculative_pages_wasted_total', (('site', '127.0.0.1'),)), 0)
+    assert len(site.requested) - 5 <= wasted <= 2
+
+
+def test_skipped_pages_are_not_yielded_and_do_not_end_pagination(sites):
+    site = sites(last_page=4)
+    parse = lambda body: None if body.url.endswith('page=2') else items(body)
+    pages = list(fetcher().paginate(site.url, parse, max_pages=10, prefetch=1))
+
+    assert [target.rsplit('=', 1)[1] for target, _ in pages] == ['1', '3', '4']
+    assert all(page_items for _, page_items in pages)
+
+
+def test_a_page_that_cannot_be_fetched_raises(sites):
+    site = sites(last_page=4)
+    site.stop()
+    with pytest.raises(requests.ConnectionError):
+        list(fetcher(retry_attempts=1).paginate(site.url, items, max_pages=4))
+
+
+def raw_deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def brotli_or_skip():
+    brotli = pytest.importorskip('brotli')
+    return brotli.compress
+
+
+def zstd_or_skip():
+    zstandard = pytest.importorskip('zstandard')
+    return zstandard.ZstdCompressor().compress
+
+
+@pytest.fixture
+def encoded_site():
+    started = []
+
+    def start(routes):
+        site = EncodedSite(routes)
+        started.append(site)
+        return site
+
+    yield start
+    for site in started:
+        site.stop()
+
+
+@pytest.mark.parametrize('encoding, encode', [
+    ('gzip', gzip.compress),
+    ('deflate', zlib.compress),
+    ('deflate', raw_deflate),
+    ('br', lambda data: brotli_or_skip()(data)),
+    ('zstd', lambda data: zstd_or_skip()(data)),
+    ('deflate, gzip', lambda data: gzip.compress(zlib.compress(data))),
+])
+def test_bodies_are_decoded_as_they_stream_in(encoded_site, encoding, encode):
+    wire = encode(PAGE)
+    site = encoded_site({'/page': ({'Content-Encoding': encoding}, wire, None)})
+    with fetcher().fetch_body(f"{site.url}/page") as body:
+        assert body.tobytes() == PAGE
+    assert len(wire) < len(PAGE)
+
+
+def test_a_truncated_compressed_stream_is_a_decoding_error(encoded_site):
+    wire = gzip.compress(PAGE)
+    site = encoded_site({'/cut': ({'Content-Encoding': 'gzip'}, wire[:len(wire) // 2], None)})
+    with pytest.raises(requests.exceptions.ContentDecodingError):
+        fetcher(retry_attempts=1).fetch_body(f"{site.url}/cut")
+
+
+def test_a_connection_dropped_mid_body_raises(encoded_site):
+    site = encoded_site({'/drop': ({'Content-Type': 'text/html'}, PAGE[:1000], len(PAGE))})
+    with pytest.raises(requests.RequestException):
+        fetcher(retry_attempts=1).fetch_body(f"{site.url}/drop")
+
+
+def test_bodies_over_the_size_cap_are_refused(encoded_site):
+    bomb = gzip.compress(b'0' * 5_000_000)
+    site = encoded_site({
+        '/declared': ({'Content-Type': 'text/html'}, PAGE, None),
+        '/bomb': ({'Content-Encoding': 'gzip'}, bomb, None),
+        '/small': ({'Content-Encoding': 'gzip'}, gzip.compress(b'ok'), None),
+    })
+    metrics = MetricsCollector('test')
+    capped = fetcher(metrics=metrics, max_body_bytes=10_000, retry_attempts=3)
+
+    # Declared too large: refused before any of it is read
+    with pytest.raises(BodyTooLarge, match='declares'):
+        capped.fetch_body(f"{site.url}/declared")
+    # Compressed bodies are capped on their decoded size, and not retried
+    with pytest.raises(BodyTooLarge, match='exceeds'):
+        capped.fetch_body(f"{site.url}/bomb")
+    assert len(bomb) < 10_000
+    assert metrics.counters[('oversized_bodies_total', (('site', '127.0.0.1'),))] == 2
+    assert not any(name == 'retries_total' for name, _ in metrics.counters)
+    with capped.fetch_body(f"{site.url}/small") as body:
+        assert body.tobytes() == b'ok'
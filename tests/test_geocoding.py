@@ -0,0 +1,60 @@
+import pytest
+
+from geocoding import Geocoder
+
+GAZETTEER = 'config/gazetteer.tsv'
+
+
+@pytest.fixture(scope='module')
+def geocoder():
+    return Geocoder(GAZETTEER)
+
+
+def placed(geocoder, location):
+    place = geocoder.geocode(location)
+    return place and (place['city'], place['region'], place['country'])
+
+
+@pytest.mark.parametrize('location, expected', [
+    # Neither town is in the gazetteer: keep the state rather than moving the place abroad
+    ('Paris, TX', (None, 'Texas', 'US')),
+    ('Richmond, VA', (None, 'Virginia', 'US')),
+    ('Paris', ('Paris', None, 'FR')),
+    ('London, ON', ('London', 'Ontario', 'CA')),
+    ('London', ('London', 'England', 'GB')),
+])
+def test_region_qualifiers_are_kept(geocoder, location, expected):
+    assert placed(geocoder, location) == expected
+
+
+@pytest.mark.parametrize('location, expected', [
+    ('Mumbai, IN', ('Mumbai', None, 'IN')),
+    ('Indianapolis, IN', (None, 'Indiana', 'US')),
+    ('Toronto, CA', ('Toronto', 'Ontario', 'CA')),
+    ('Los Angeles, CA', ('Los Angeles', 'California', 'US')),
+])
+def test_ambiguous_codes_fall_back_only_to_their_other_meaning(geocoder, location, expected):
+    assert placed(geocoder, location) == expected
+
+
+def test_repeated_locations_hit_the_memory_cache():
+    geocoder = Geocoder(GAZETTEER, memory_size=1)
+    geocoder.geocode('Berlin, Germany')
+    geocoder.geocode('berlin,  germany')
+    geocoder.geocode('Toronto')
+    assert geocoder.lookups == {'gazetteer': 2, 'memory': 1}
+
+
+def test_saved_locations_hit_the_disk_cache_without_loading_the_gazetteer(tmp_path):
+    cache = str(tmp_path / 'geocode.sqlite')
+    first = Geocoder(GAZETTEER, cache)
+    expected = first.geocode('Paris, TX')
+    first.geocode('Nowhere In Particular')
+    first.close()
+
+    second = Geocoder(GAZETTEER, cache)
+    assert second.geocode('Paris, TX') == expected
+    assert second.geocode('Nowhere In Particular') is None
+    assert second.lookups == {'disk': 2}
+    assert second._gazetteer is None
+    second.close()
@@ -0,0 +1,43 @@
+import json
+
+import orchestrator
+from job_scraper import JobScraper
+from orchestrator import ScrapeOrchestrator
+from price_monitor import PriceMonitor
+
+
+def test_thread_pipelines_share_session_schedule_metrics_and_proxies(tmp_path, monkeypatch):
+    config = tmp_path / 'orchestrator.json'
+    config.write_text(json.dumps({
+        'mode': 'threads',
+        'max_connections': 8,
+        'pipelines': {
+            'job_scraper': {'weight': 3, 'config': 'config/job_scraper_config.json'},
+            'price_monitor': {'weight': 1, 'config': 'config/price_monitor_config.json'}
+        },
+        'proxy_pool': {'enabled': True, 'proxies': ['http://127.0.0.1:9']}
+    }))
+    built = {}
+
+    def pipeline(scraper_class):
+        def run(settings, output_format, **shared):
+            built[scraper_class] = scraper = scraper_class(settings['config'], **shared)
+            scraper.metrics.record_records('demo', 5)
+            return {'records': 5, 'output_file': None}
+        return run
+
+    monkeypatch.setitem(orchestrator.PIPELINES, 'job_scraper', pipeline(JobScraper))
+    monkeypatch.setitem(orchestrator.PIPELINES, 'price_monitor', pipeline(PriceMonitor))
+    conductor = ScrapeOrchestrator(str(config))
+    results = conductor.run()
+
+    jobs, prices = built[JobScraper].fetcher, built[PriceMonitor].fetcher
+    assert results == {name: {'records': 5, 'output_file': None} for name in ('job_scraper', 'price_monitor')}
+    assert jobs.session is prices.session is conductor.session
+    assert jobs.proxy_pool is prices.proxy_pool is conductor.proxy_pool
+    # Each scraper keeps its own spacing, but both book requests in the orchestrator's per-host schedule
+    assert jobs.rate_limiter._next_slot is prices.rate_limiter._next_slot is conductor.rate_limiter._next_slot
+    assert jobs.metrics.collector is prices.metrics.collector is conductor.metrics
+    assert conductor.metrics.records_per_second() > 0
+    # Connection slots are split 3:1 by weight
+    assert (jobs._slots._value, prices._slots._value) == (6, 2)
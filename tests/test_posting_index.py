@@ -0,0 +1,65 @@
+from posting_index import PostingIndex
+
+
+def job(title, description, board='boarda.example', company='TechCorp Inc', location='Austin, TX'):
+    return {'title': title, 'company': company, 'location': location, 'description': description,
+            'source_url': f"https://{board}/jobs/{title.lower().replace(' ', '-')}"}
+
+
+def statuses(jobs):
+    return {job['title']: job['posting_status'] for job in jobs}
+
+
+def run(path, jobs, **kwargs):
+    index = PostingIndex(path)
+    try:
+        emitted, counts = index.ingest(jobs, **kwargs)
+        index.commit()
+        return emitted, counts
+    finally:
+        index.close()
+
+
+def test_new_changed_and_unchanged_postings_across_two_runs(tmp_path):
+    path = str(tmp_path / 'postings.sqlite')
+    emitted, counts = run(path, [
+        job('Data Engineer', 'Build pipelines in Python and SQL.'),
+        job('Data Engineer', 'Build  pipelines in python and SQL!', board='boardb.example', company='TechCorp, Inc.'),
+        job('Backend Developer', 'Write Go services.'),
+        job('Designer', 'Design things.'),
+    ])
+    assert counts == {'new': 3, 'changed': 0, 'unchanged': 0, 'merged': 1}
+    assert statuses(emitted) == {'Data Engineer': 'new', 'Backend Developer': 'new', 'Designer': 'new'}
+    assert emitted[0]['sources'] == 'boarda.example, boardb.example'
+    first_ids = {job['title']: job['posting_id'] for job in emitted}
+
+    emitted, counts = run(path, [
+        job('Data Engineer', 'Build pipelines in Python and SQL.', board='boardc.example'),
+        job('Backend Developer', 'Write Go and Rust services.'),
+        job('Designer', 'Design things.'),
+        job('QA Engineer', 'Test things.'),
+    ], emit_unchanged=True)
+    assert counts == {'new': 1, 'changed': 1, 'unchanged': 2, 'merged': 0}
+    assert statuses(emitted) == {'Data Engineer': 'unchanged', 'Backend Developer': 'changed',
+                                 'Designer': 'unchanged', 'QA Engineer': 'new'}
+    by_title = {job['title']: job for job in emitted}
+    assert by_title['Data Engineer']['posting_id'] == first_ids['Data Engineer']
+    assert by_title['Data Engineer']['sources'] == 'boarda.example, boardb.example, boardc.example'
+    assert by_title['Backend Developer']['posting_id'] != first_ids['Backend Developer']
+
+    # The changed posting replaced the old one instead of being indexed next to it
+    index = PostingIndex(path)
+    assert len(index) == 4
+    index.close()
+
+
+def test_postings_are_offered_again_until_committed(tmp_path):
+    path = str(tmp_path / 'postings.sqlite')
+    index = PostingIndex(path)
+    index.ingest([job('Data Engineer', 'Build pipelines.')])
+    index.close()
+
+    emitted, counts = run(path, [job('Data Engineer', 'Build pipelines.')])
+    assert counts['new'] == 1 and statuses(emitted) == {'Data Engineer': 'new'}
+    emitted, counts = run(path, [job('Data Engineer', 'Build pipelines.')])
+    assert emitted == [] and counts['unchanged'] == 1
@@ -0,0 +1,70 @@
+from product_matching import ProductIndex, extract_gtin, valid_gtin
+
+
+def gtin(body):
+    """body plus its GTIN check digit"""
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1) for position, digit in enumerate(reversed(body)))
+    return body + str((10 - total % 10) % 10)
+
+
+BLUE, MIDNIGHT = gtin('019425000001'), gtin('019425000002')
+
+LISTINGS = [
+    ('Apple iPhone 14 128GB Blue', 'Electronics', 'Apple', BLUE),
+    ('Apple iPhone 14 128GB Midnight Renewed', 'Electronics', 'Apple', MIDNIGHT),
+    ('Apple iPhone 14 256GB Blue', 'Electronics', 'Apple', None),
+    ('Sony WH-1000XM4 Wireless Headphones', 'Electronics', 'Sony', None),
+    ('Samsung 55" QLED 4K TV', 'Electronics', 'Samsung', None),
+]
+
+
+def test_gtins_are_check_digit_verified():
+    assert valid_gtin(BLUE) and not valid_gtin(BLUE[:-1] + str((int(BLUE[-1]) + 1) % 10))
+    assert extract_gtin(f"iPhone 14 UPC {BLUE}") == BLUE.zfill(14)
+    assert extract_gtin('iPhone 14 part 123456789013') is None
+
+
+def test_canonical_ids_are_stable_across_runs(tmp_path):
+    path = str(tmp_path / 'products.json')
+    first = ProductIndex(path, brands=['apple', 'sony', 'samsung'])
+    ids = {listing[0]: first.match(*listing)[0] for listing in LISTINGS}
+    first.save()
+    assert len(set(ids.values())) == len(LISTINGS)
+
+    # Another run sees the same products under other sites' titles, in another order
+    second = ProductIndex(path, brands=['apple', 'sony', 'samsung'])
+    assert second.match('Samsung 55 inch QLED 4K Smart TV', 'Electronics')[0] == ids['Samsung 55" QLED 4K TV']
+    assert second.match('Sony WH1000XM4/B Noise Cancelling', 'Electronics') == \
+        (ids['Sony WH-1000XM4 Wireless Headphones'], 'model')
+    assert second.match('iPhone 14 (128 GB) - Blue', 'Electronics', gtin=BLUE) == \
+        (ids['Apple iPhone 14 128GB Blue'], 'gtin')
+    assert second.match('Apple iPhone 14 256 GB Blue', 'Electronics') == \
+        (ids['Apple iPhone 14 256GB Blue'], 'similar')
+
+    # New products get new IDs, never one already handed out
+    product_id, method = second.match('Apple iPad Air 64GB', 'Electronics')
+    assert method == 'new' and product_id not in ids.values()
+    second.save()
+    assert ProductIndex(path).match('Apple iPad Air 64GB', 'Electronics')[0] == product_id
+
+
+def test_a_gtin_match_beats_a_closer_title_match(tmp_path):
+    index = ProductIndex(str(tmp_path / 'products.json'))
+    blue, _ = index.match(*LISTINGS[0])
+    midnight, method = index.match(*LISTINGS[1])
+    assert method == 'new' and midnight != blue
+
+    # The title is Blue's exactly, but the GTIN says Midnight
+    assert index.match('Apple iPhone 14 128GB Blue', 'Electronics', 'Apple', MIDNIGHT) == (midnight, 'gtin')
+    assert index.match('Apple iPhone 14 128GB Blue', 'Electronics', 'Apple') == (blue, 'similar')
+
+
+def test_differing_numbers_or_brands_are_never_the_same_product(tmp_path):
+    index = ProductIndex(str(tmp_path / 'products.json'))
+    ids = {index.match(title, 'Electronics', brand)[0] for title, brand in [
+        ('iPhone 14 128GB Blue', 'Apple'),
+        ('iPhone 14 256GB Blue', 'Apple'),
+        ('iPhone 15 128GB Blue', 'Apple'),
+        ('iPhone 14 128GB Blue Case', 'Spigen'),
+    ]}
+    assert len(ids) == 4
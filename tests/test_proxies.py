@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from fetcher import Fetcher
+from mock_proxy import MockOrigin, MockProxy
+from proxies import ProxyPool
+
+
+@pytest.fixture
+def origin():
+    origin = MockOrigin()
+    origin.start()
+    yield origin
+    origin.stop()
+
+
+@pytest.fixture
+def proxies():
+    started = []
+
+    def start(**kwargs):
+        proxy = MockProxy(**kwargs)
+        proxy.start()
+        started.append(proxy)
+        return proxy
+
+    yield start
+    for proxy in started:
+        proxy.stop()
+
+
+def fetcher_for(pool):
+    session = requests.Session()
+    session.trust_env = False
+    return Fetcher(session, proxy_pool=pool, retry_attempts=3, backoff_seconds=0, timeout=5)
+
+
+def test_blocked_proxy_cools_down_and_requests_fail_over(origin, proxies):
+    blocked = proxies(block_after=0)
+    healthy = proxies()
+    pool = ProxyPool([blocked.url, healthy.url], cooldown_seconds=60, seed=1)
+    fetcher = fetcher_for(pool)
+
+    statuses = [fetcher.fetch(f"{origin.url}/jobs/{index}").status_code for index in range(20)]
+
+    assert statuses == [200] * 20
+    assert healthy.relayed == 20
+    # One 429 puts the blocked proxy out of rotation for the whole cooldown
+    assert blocked.blocked == 1
+    stats = {entry['name']: entry for entry in pool.stats()}
+    assert stats[f"127.0.0.1:{blocked.port}"]['cooling']
+    assert stats[f"127.0.0.1:{blocked.port}"]['cooldowns'] == 1
+    assert pool.healthy_count() == 1
+
+
+def test_dead_proxy_fails_over_after_max_failures(origin, proxies):
+    dead = proxies(drop=True)
+    healthy = proxies()
+    pool = ProxyPool([dead.url, healthy.url], cooldown_seconds=60, max_failures=1, seed=2)
+    fetcher = fetcher_for(pool)
+
+    statuses = [fetcher.fetch(f"{origin.url}/jobs/{index}").status_code for index in range(10)]
+
+    assert statuses == [200] * 10
+    assert healthy.relayed == 10
+    assert dead.dropped == 1
+    assert pool.healthy_count() == 1
+
+
+def test_cooldown_doubles_until_a_success_and_then_resets():
+    now = [0.0]
+    pool = ProxyPool(['http://127.0.0.1:9'], cooldown_seconds=10, max_cooldown_seconds=25,
+                     clock=lambda: now[0])
+
+    proxy = pool.acquire()
+    assert pool.release(proxy, 429, 0.1)
+    assert pool.healthy_count() == 0
+    with pytest.raises(requests.RequestException):
+        pool.acquire(timeout=0)
+
+    for cooldown in (20, 25):
+        now[0] = proxy.cooldown_until
+        assert pool.healthy_count() == 1
+        assert pool.release(pool.acquire(), 403, 0.1)
+        assert proxy.cooldown_until == now[0] + cooldown
+
+    now[0] = proxy.cooldown_until
+    assert not pool.release(pool.acquire(), 200, 0.1)
+    assert pool.release(pool.acquire(), 429, 0.1)
+    assert proxy.cooldown_until == now[0] + 10
@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from salary import annual_salary, parse_salaries
+
+
+def parsed(text):
+    return parse_salaries([text]).iloc[0].to_dict()
+
+
+@pytest.mark.parametrize('text', [
+    '3 years experience', '401k match', '401(k) and dental', '60 months', 'Competitive', 'Ref 12345', None
+])
+def test_numbers_without_a_salary_marker_are_not_salaries(text):
+    result = parsed(text)
+    assert math.isnan(result['salary_min']) and math.isnan(result['salary_max'])
+
+
+@pytest.mark.parametrize('text, low, high, currency, period', [
+    ('$60,000 - $80,000', 60000, 80000, 'USD', 'year'),
+    ('£30,000 to £35,000 a year', 30000, 35000, 'GBP', 'year'),
+    ('60k-80k USD', 60000, 80000, 'USD', 'year'),
+    ('$60-80k', 60000, 80000, 'USD', 'year'),
+    ('$45/hr', 45, 45, 'USD', 'hour'),
+    ('45 per hour', 45, 45, None, 'hour'),
+    ('3 years experience, $80k-100k', 80000, 100000, 'USD', 'year'),
+])
+def test_ranges_single_amounts_and_periods(text, low, high, currency, period):
+    result = parsed(text)
+    assert (result['salary_min'], result['salary_max']) == (low, high)
+    assert (result['salary_currency'] if isinstance(result['salary_currency'], str) else None) == currency
+    assert result['salary_period'] == period
+
+
+@pytest.mark.parametrize('text, low, high', [
+    ('€50.000 - €60.000 a year', 50000, 60000),
+    ('50.000,50 EUR', 50000.5, 50000.5),
+    ('€50,5k', 50500, 50500),
+    ('$1,234.50 per month', 1234.5, 1234.5),
+])
+def test_both_decimal_conventions(text, low, high):
+    result = parsed(text)
+    assert (result['salary_min'], result['salary_max']) == (low, high)
+
+
+def test_million_suffix_is_a_yearly_amount():
+    frame = parse_salaries(['$1.2M', '$1-1.5M'])
+    assert frame['salary_min'].tolist() == [1200000, 1000000]
+    assert frame['salary_max'].tolist() == [1200000, 1500000]
+    assert frame['salary_period'].tolist() == ['year', 'year']
+    assert annual_salary(frame).tolist() == [1200000, 1250000]
+
+
+def test_unreadable_separators_are_nan():
+    assert math.isnan(parsed('$1,2,3')['salary_min'])
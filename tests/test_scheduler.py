@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from scheduler import PriceCheckScheduler
+
+PRODUCT = {'name': 'iPhone 14'}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def scheduler_for(clock, **kwargs):
+    settings = dict(min_interval=10, max_interval=1000, jitter=0.1, seed=1, clock=clock, sleep=clock.sleep)
+    return PriceCheckScheduler(100, **{**settings, **kwargs})
+
+
+def next_delay(scheduler, clock, state, price):
+    scheduler.record(state, price)
+    when, state = scheduler.next_check()
+    delay, clock.now = when - clock.now, when
+    return delay, state
+
+
+def test_delays_stay_within_the_interval_bounds_and_jitter():
+    clock = Clock()
+    scheduler = scheduler_for(clock)
+    scheduler.add(PRODUCT, 'Amazon')
+    _, state = scheduler.next_check()
+
+    delays = []
+    for price in [100.0] * 30:
+        delay, state = next_delay(scheduler, clock, state, price)
+        delays.append(delay)
+    assert state.interval == 1000
+    assert all(10 * 0.9 <= delay <= 1000 * 1.1 for delay in delays)
+    assert delays[-1] >= 1000 * 0.9
+
+    for price in [150.0, 100.0] * 10:
+        delay, state = next_delay(scheduler, clock, state, price)
+    assert state.interval == 10
+    assert 10 * 0.9 <= delay <= 10 * 1.1
+
+
+def test_volatile_items_are_checked_sooner_than_stable_ones():
+    clock = Clock()
+    scheduler = scheduler_for(clock, jitter=0.0, min_change=50.0)
+    scheduler.add(PRODUCT, 'Amazon')
+    scheduler.add(PRODUCT, 'Walmart')
+    states = {state.site: state for state in scheduler.states.values()}
+
+    # Changes below min_change leave the interval alone but still raise volatility
+    for price in (100.0, 110.0, 100.0, 110.0):
+        scheduler.record(states['Amazon'], price)
+        scheduler.record(states['Walmart'], 100.0)
+    assert states['Amazon'].interval == states['Walmart'].interval
+    assert states['Amazon'].volatility > 5 and states['Walmart'].volatility == 0
+    # The latest check each item has scheduled
+    due = {key[1]: when for when, _, key in sorted(scheduler._heap, key=lambda entry: entry[1])}
+    assert due['Amazon'] - clock.now == pytest.approx(
+        states['Amazon'].interval / (1 + states['Amazon'].volatility / 5.0))
+    assert due['Amazon'] < due['Walmart']
+
+
+def test_site_spacing_defers_checks_on_the_same_site():
+    clock = Clock()
+    scheduler = scheduler_for(clock, jitter=0.0, site_spacing={'Amazon': 30})
+    for name in ('a', 'b', 'c'):
+        scheduler.add({'name': name}, 'Amazon', first_check=clock.now)
+    slots = [scheduler.next_check()[0] for _ in range(3)]
+    assert slots == [clock.now, clock.now + 30, clock.now + 60]
+
+
+def test_a_restored_schedule_keeps_intervals_volatility_and_due_times():
+    clock = Clock()
+    first = scheduler_for(clock)
+    for site in ('Amazon', 'Walmart'):
+        first.add(PRODUCT, site)
+    first.run(lambda product, site: 100.0 if site == 'Walmart' else 100.0 + clock.now % 40, max_checks=12)
+    saved = json.loads(json.dumps(first.snapshot()))
+
+    second = scheduler_for(clock, seed=2)
+    for site in ('Amazon', 'Walmart', 'Target'):
+        second.add(PRODUCT, site)
+    assert second.restore(saved) == 2
+
+    for key, state in first.states.items():
+        restored = second.states[key]
+        assert (restored.interval, restored.volatility, restored.last_price, restored.checks) == \
+               (state.interval, state.volatility, state.last_price, state.checks)
+    assert sorted(when for when, _, key in second._heap if key[1] != 'Target') == \
+           sorted(when for when, _, _ in first._heap)
+    assert second.states[('iPhone 14', 'Target')].checks == 0
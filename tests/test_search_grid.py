@@ -0,0 +1,77 @@
+import json
+
+from checkpoint import Checkpoint
+from job_scraper import JobScraper
+from query_planner import QueryPlan, QueryPlanner
+
+SITES = ['https://boarda.example', 'https://boardb.example']
+
+
+def job(title, description=''):
+    return {'title': title, 'company': 'Acme', 'location': 'Remote', 'description': description}
+
+
+def test_narrower_queries_are_answered_from_the_broader_search():
+    plan = QueryPlanner(SITES, subsume_narrower=True).plan(['python developer', 'python', 'Developer Python'],
+                                                            ['Remote'])
+    assert {fetch.keywords for fetch in plan.fetches} == {'python'}
+    assert plan.summary()['planned_requests'] == 2 and plan.summary()['naive_requests'] == 4
+
+    pages = {'https://boarda.example': [job('Python Developer'), job('Python Engineer')],
+             'https://boardb.example': [job('Senior Engineer', 'Python developers wanted')]}
+    results = plan.execute(lambda fetch: pages[fetch.site])
+    assert [j['title'] for j in results['python developer | Remote']] == ['Python Developer', 'Senior Engineer']
+    assert len(results['python | Remote']) == 3
+
+
+def test_without_subsumption_every_distinct_term_set_is_fetched():
+    plan = QueryPlanner(SITES).plan(['python developer', 'python', 'developer python'], ['remote', 'Remote'])
+    assert sorted({fetch.keywords for fetch in plan.fetches}) == ['python', 'python developer']
+    assert len(plan.fetches) == 4
+
+
+def test_terms_match_whole_words_only():
+    assert QueryPlan.matches(job('Java Developer'), frozenset({'java'}))
+    assert not QueryPlan.matches(job('JavaScript Developer'), frozenset({'java'}))
+    assert not QueryPlan.matches(job('Engineer at Google'), frozenset({'go'}))
+    assert QueryPlan.matches(job('C++ / Go engineer'), frozenset({'go', 'c++'}))
+    assert QueryPlan.matches(job('Engineer', 'Build APIs for developers'), frozenset({'developer', 'api'}))
+    assert not QueryPlan.matches(dict(job('Developer'), experience_level='Senior'), frozenset({'developer'}), 'Junior')
+
+
+def test_grid_checkpoint_stops_at_a_failed_fetch_and_resumes_from_it(tmp_path):
+    def scraper_that(fail=()):
+        scraper = JobScraper()
+        scraper.checkpoint = Checkpoint('job_scraper', str(tmp_path), every_records=1)
+        fetched = []
+
+        def scrape_listing_page(url, site=None):
+            fetched.append(url)
+            if url in fail:
+                raise ConnectionError('connection reset')
+            jobs = [job('Python Developer', url)]
+            scraper.scraped_jobs.extend(jobs)
+            return jobs
+
+        scraper.scrape_listing_page = scrape_listing_page
+        return scraper, fetched
+
+    grid = dict(keywords=['python'], locations=['remote'], experience_levels=[], pages_per_query=1)
+    planner = JobScraper()
+    urls = [planner.build_search_url(fetch) for fetch in planner.plan_search_grid(**grid).fetches]
+    first, first_fetched = scraper_that(fail={urls[2]})
+    first.run_search_grid(**grid)
+
+    # Later fetches still run, but the checkpoint stays at the failed one
+    assert first_fetched == urls
+    with open(tmp_path / 'job_scraper.checkpoint.json') as f:
+        saved = json.load(f)
+    assert saved['position'] == 2 and saved['records'] == 2
+    assert saved['state']['pages'] == [[0, 1], [1, 2]]
+
+    second, second_fetched = scraper_that()
+    second.resume = True
+    results = second.run_search_grid(**grid)
+    assert second_fetched == urls[2:]
+    assert [j['description'] for j in second.scraped_jobs] == urls
+    assert len(results['python | remote']) == len(urls)
@@ -0,0 +1,64 @@
+import pytest
+
+from skills import PatternAutomaton, SkillMatcher
+
+TAXONOMY = {
+    'Java': {'category': 'Languages'},
+    'JavaScript': {'category': 'Languages', 'synonyms': ['js', 'ecmascript']},
+    'Go': {'category': 'Languages', 'synonyms': ['golang'], 'case_sensitive': True},
+    'C++': {'category': 'Languages', 'synonyms': ['cpp']},
+    'Spring': {'category': 'Frameworks', 'case_sensitive': True},
+    'Spring Boot': {'category': 'Frameworks'},
+    'REST APIs': {'category': 'Web', 'synonyms': ['RESTful', {'term': 'REST', 'case_sensitive': True}]},
+}
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return SkillMatcher(TAXONOMY)
+
+
+def test_automaton_reports_every_overlapping_occurrence():
+    automaton = PatternAutomaton({'he': 1, 'she': 2, 'his': 3, 'hers': 4})
+    assert sorted(automaton.iter('ushers')) == [(3, 2, 1), (3, 3, 2), (5, 4, 4)]
+    assert list(PatternAutomaton({}).iter('anything')) == []
+
+
+@pytest.mark.parametrize('text, skills', [
+    ('Spring Boot microservices', ['Spring Boot']),
+    ('Spring, then Spring Boot', ['Spring', 'Spring Boot']),
+    ('JavaScript and Java', ['JavaScript', 'Java']),
+])
+def test_overlapping_matches_prefer_the_longest(matcher, text, skills):
+    assert matcher.find(text) == skills
+
+
+@pytest.mark.parametrize('text, skills', [
+    ('Java_Script, Javas, MyJava', []),
+    ('Good to go, Going places', []),
+    ('C++/Go (Java)', ['C++', 'Go', 'Java']),
+    ('cpp17 and cpp', ['C++']),
+])
+def test_matches_respect_word_boundaries(matcher, text, skills):
+    assert matcher.find(text) == skills
+
+
+@pytest.mark.parametrize('text, skills', [
+    ('GOLANG or Golang', ['Go']),
+    ('go see the spring sales', []),
+    ('ECMAScript, JS', ['JavaScript']),
+    ('RESTful services, take a rest', ['REST APIs']),
+    ('a REST backend', ['REST APIs']),
+])
+def test_synonyms_map_to_their_skill_with_their_own_case_rule(matcher, text, skills):
+    assert matcher.find(text) == skills
+
+
+def test_global_case_sensitivity_applies_to_synonyms_too():
+    matcher = SkillMatcher(TAXONOMY, case_sensitive=True)
+    assert matcher.find('golang, GOLANG, javascript') == ['Go']
+
+
+def test_count_counts_each_skill_once_per_text(matcher):
+    counts = matcher.count(['Java, Java and Go', 'golang', None])
+    assert counts == {'Java': 1, 'Go': 2}